@@ -0,0 +1,64 @@
+# actualizador_tasas.py
+# Hilo en segundo plano que mantiene al día las tasas USD→COP y USD→EUR.
+#
+# Cada `intervalo` segundos consulta el proveedor de tasas (proveedor_tasas.py), deja el
+# valor en su caché compartido y registra cada consulta nueva, con su fecha y hora, en el
+# repositorio (tabla historial_tasas). Las páginas leen el último valor sin esperar a la red.
+#
+# Este módulo no importa requests ni la base al cargarse: las dependencias se importan
+# dentro del hilo, de modo que iniciarlo desde app.py no retrasa el arranque.
+
+import threading
+from datetime import datetime
+
+INTERVALO_ACTUALIZACION_SEGUNDOS = 10 * 60
+MONEDAS_MONITOREADAS = ("COP", "EUR")
+
+_hilo = None
+_detener = threading.Event()
+_lock = threading.Lock()
+
+def _registrar_consulta(entrada):
+    """Oyente del proveedor: guarda en el repositorio cada consulta nueva de las monedas monitoreadas."""
+    from repositorio import registrar_tasas
+
+    tasas = {moneda: entrada['tasas'][moneda] for moneda in MONEDAS_MONITOREADAS if moneda in entrada['tasas']}
+    if tasas:
+        registrar_tasas(datetime.fromtimestamp(entrada['obtenido']), tasas)
+
+def _ciclo(intervalo):
+    from proveedor_tasas import obtener_tasas, registrar_oyente, ultimas_tasas
+
+    # Toda consulta del proceso (este hilo, refrescos manuales o revalidaciones) queda registrada
+    registrar_oyente(_registrar_consulta)
+
+    while not _detener.is_set():
+        try:
+            actual = ultimas_tasas(ttl=intervalo)
+            # Si otro proceso o un refresco manual ya trajo un valor reciente, no se consulta la fuente
+            if actual['obtenido'] is None or actual['obsoleto']:
+                obtener_tasas(ttl=intervalo, forzar=True)
+                espera = intervalo
+            else:
+                # Se despierta justo cuando el valor actual vence
+                espera = max(1.0, intervalo - actual['antiguedad_segundos'])
+        except Exception:
+            espera = intervalo  # Error de red o de base: se reintenta en el próximo ciclo
+        _detener.wait(espera)
+
+def iniciar_actualizador(intervalo=INTERVALO_ACTUALIZACION_SEGUNDOS):
+    """Inicia el hilo de actualización una sola vez por proceso (llamadas repetidas no hacen nada)."""
+    global _hilo
+    with _lock:
+        if _hilo is not None and _hilo.is_alive():
+            return
+        _detener.clear()
+        _hilo = threading.Thread(target=_ciclo, args=(intervalo,), name="actualizador-tasas", daemon=True)
+        _hilo.start()
+
+def detener_actualizador():
+    """Detiene el hilo de actualización (se puede volver a iniciar después)."""
+    _detener.set()
+
+def actualizador_activo():
+    return _hilo is not None and _hilo.is_alive()
@@ -0,0 +1,125 @@
+# amortizacion.py
+# Motor de amortización vectorizado para las modalidades de préstamo de evaluacion.py.
+#
+# Modalidades:
+# - "francesa":         cuota fija con interés sobre saldo (sistema francés)
+# - "capital_fijo":     abono a capital fijo + interés simple sobre el saldo pendiente
+# - "simple_fijo":      interés simple total sobre el monto inicial, repartido en cuotas iguales
+# - "capital_al_final": solo intereses cada mes y el capital completo en la última cuota
+#
+# Las tablas se construyen con arreglos de NumPy (sin recorrer mes a mes) y los
+# resúmenes aceptan arreglos de tasas y plazos, de modo que una grilla tasa × plazo
+# completa se calcula en una sola operación con broadcasting.
+
+import numpy as np
+import pandas as pd
+
+MODALIDADES = ("francesa", "capital_fijo", "simple_fijo", "capital_al_final")
+
+def _validar_modalidad(modalidad):
+    if modalidad not in MODALIDADES:
+        raise ValueError(f"Modalidad de amortización no soportada: {modalidad}. Opciones: {', '.join(MODALIDADES)}")
+
+def tabla_amortizacion(monto, tasa_mensual_porcentaje, plazo_meses, modalidad):
+    """
+    Devuelve la tabla de amortización como DataFrame con las columnas
+    mes, cuota, interes, capital, saldo (una fila por mes).
+    """
+    _validar_modalidad(modalidad)
+    n = int(plazo_meses)
+    if n <= 0:
+        return pd.DataFrame(columns=['mes', 'cuota', 'interes', 'capital', 'saldo'])
+
+    tasa = tasa_mensual_porcentaje / 100
+    meses = np.arange(1, n + 1)
+
+    if modalidad == "francesa":
+        cuota = float(resumen_amortizacion(monto, tasa_mensual_porcentaje, n, "francesa")['cuota_regular'])
+        if tasa == 0:
+            saldo = monto - cuota * meses
+        else:
+            factor = (1 + tasa) ** meses
+            saldo = monto * factor - cuota * (factor - 1) / tasa
+        saldo_anterior = np.concatenate(([monto], saldo[:-1]))
+        interes = saldo_anterior * tasa
+        capital = cuota - interes
+        cuotas = np.full(n, cuota)
+    elif modalidad == "capital_fijo":
+        capital = np.full(n, monto / n)
+        saldo = monto - capital * meses
+        saldo_anterior = saldo + capital
+        interes = saldo_anterior * tasa
+        cuotas = capital + interes
+    elif modalidad == "simple_fijo":
+        capital = np.full(n, monto / n)
+        interes = np.full(n, monto * tasa)
+        cuotas = capital + interes
+        saldo = monto - capital * meses
+    else:  # capital_al_final
+        interes = np.full(n, monto * tasa)
+        capital = np.zeros(n)
+        capital[-1] = monto
+        cuotas = interes + capital
+        saldo = np.full(n, float(monto))
+        saldo[-1] = 0.0
+
+    return pd.DataFrame({
+        'mes': meses,
+        'cuota': cuotas,
+        'interes': interes,
+        'capital': capital,
+        'saldo': np.maximum(saldo, 0.0),
+    })
+
+def resumen_amortizacion(monto, tasa_mensual_porcentaje, plazo_meses, modalidad):
+    """
+    Métricas agregadas de un préstamo en forma cerrada. `monto`, `tasa_mensual_porcentaje`
+    y `plazo_meses` pueden ser escalares o arreglos (se aplica broadcasting), p. ej.
+    tasas[:, None] y plazos[None, :] para una grilla completa.
+
+    Devuelve un diccionario de arreglos con:
+    - 'cuota_regular':  cuota de los meses normales (en capital_fijo, la primera cuota)
+    - 'cuota_final':    última cuota
+    - 'cuota_promedio': total pagado / plazo
+    - 'interes_total' y 'total_pagado'
+    Los plazos <= 0 producen NaN.
+    """
+    _validar_modalidad(modalidad)
+    monto, tasa_porcentaje, plazo = np.broadcast_arrays(
+        np.asarray(monto, dtype=float),
+        np.asarray(tasa_mensual_porcentaje, dtype=float),
+        np.asarray(plazo_meses, dtype=float),
+    )
+    tasa = tasa_porcentaje / 100
+    plazo_valido = plazo > 0
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if modalidad == "francesa":
+            cuota_con_tasa = monto * tasa / (1 - (1 + tasa) ** -plazo)
+            cuota_regular = np.where(tasa == 0, monto / plazo, cuota_con_tasa)
+            cuota_final = cuota_regular
+            interes_total = cuota_regular * plazo - monto
+        elif modalidad == "capital_fijo":
+            interes_total = monto * tasa * (plazo + 1) / 2
+            cuota_regular = monto / plazo + monto * tasa
+            cuota_final = monto / plazo * (1 + tasa)
+        elif modalidad == "simple_fijo":
+            interes_total = monto * tasa * plazo
+            cuota_regular = (monto + interes_total) / plazo
+            cuota_final = cuota_regular
+        else:  # capital_al_final
+            interes_total = monto * tasa * plazo
+            cuota_regular = monto * tasa
+            cuota_final = monto * tasa + monto
+
+        total_pagado = monto + interes_total
+        cuota_promedio = total_pagado / plazo
+
+    resumen = {
+        'cuota_regular': cuota_regular,
+        'cuota_final': cuota_final,
+        'cuota_promedio': cuota_promedio,
+        'interes_total': interes_total,
+        'total_pagado': total_pagado,
+    }
+    return {clave: np.where(plazo_valido, valor, np.nan) for clave, valor in resumen.items()}
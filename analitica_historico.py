@@ -0,0 +1,138 @@
+# analitica_historico.py
+# Analítica de series temporales sobre los snapshots diarios por activo.
+#
+# Los snapshots se pasan a matrices fechas x activos (valor y rendimiento mensual) y cada métrica
+# se calcula para todas las columnas a la vez con NumPy:
+# - Tendencia por mínimos cuadrados en forma cerrada (pendiente = cov(x, y) / var(x)).
+# - Descomposición del cambio de valor entre dos snapshots: el rendimiento es el 'Interes Mensual'
+#   del snapshot anterior prorrateado por los días transcurridos; el resto se atribuye a aportes
+#   o retiros netos.
+# - Rentabilidad ponderada por tiempo (encadenando los rendimientos de cada periodo) y ponderada
+#   por dinero (TIR anual de los aportes, resuelta por bisección vectorizada).
+#   Los snapshots no registran aportes ni precios de mercado: ambas rentabilidades parten del
+#   'Interes Mensual' declarado y cualquier cambio de valor de mercado cuenta como aporte, por lo
+#   que miden el rendimiento declarado del portafolio y no su desempeño real.
+# - Máxima caída desde el pico (con el máximo acumulado).
+
+import numpy as np
+import pandas as pd
+
+DIAS_POR_MES = 365.25 / 12
+DIAS_POR_ANIO = 365.25
+ITERACIONES_TIR = 60
+LIMITES_TIR = (-0.99, 10.0)
+
+def ajustar_tendencia(x, y):
+    """
+    Recta de mínimos cuadrados de cada columna de `y` (n x k, o vector) sobre `x` (n).
+    Devuelve (pendientes, interceptos); con menos de dos puntos la pendiente es 0.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    x_media = x.mean()
+    y_media = y.mean(axis=0)
+    dx = x - x_media
+    varianza = (dx ** 2).sum()
+    if varianza == 0:
+        return np.zeros_like(y_media), y_media
+    pendientes = np.tensordot(dx, y - y_media, axes=(0, 0)) / varianza
+    return pendientes, y_media - pendientes * x_media
+
+def _tir(tiempos, valor_inicial, flujos, valor_final):
+    """
+    TIR anual de cada columna: valor_inicial * (1 + r)^T + Σ flujo_t * (1 + r)^(T - t) = valor_final.
+    `tiempos` en años desde el primer snapshot. NaN si la ecuación no cambia de signo en LIMITES_TIR.
+    """
+    horizonte = tiempos[-1]
+    restantes = (horizonte - tiempos[1:])[:, None]
+
+    def error(r):
+        base = 1.0 + r
+        return valor_inicial * base ** horizonte + (flujos * base[None, :] ** restantes).sum(axis=0) - valor_final
+
+    bajo = np.full(valor_final.shape, LIMITES_TIR[0])
+    alto = np.full(valor_final.shape, LIMITES_TIR[1])
+    error_bajo = error(bajo)
+    valido = np.sign(error_bajo) != np.sign(error(alto))
+    for _ in range(ITERACIONES_TIR):
+        medio = (bajo + alto) / 2
+        error_medio = error(medio)
+        mismo_signo = np.sign(error_medio) == np.sign(error_bajo)
+        bajo = np.where(mismo_signo, medio, bajo)
+        error_bajo = np.where(mismo_signo, error_medio, error_bajo)
+        alto = np.where(mismo_signo, alto, medio)
+    return np.where(valido, (bajo + alto) / 2, np.nan)
+
+def analizar_series(fechas, valores, intereses):
+    """
+    Métricas de cada columna de `valores` (fechas x series) con su 'Interes Mensual' en `intereses`.
+    Devuelve un diccionario de arreglos con una posición por columna.
+
+    Las rentabilidades TWR y MWR se calculan con el rendimiento declarado ('Interes Mensual'): las
+    valorizaciones o pérdidas de mercado quedan en 'Aportes netos' y no cambian la rentabilidad.
+    """
+    valores = np.nan_to_num(np.asarray(valores, dtype=float))
+    intereses = np.nan_to_num(np.asarray(intereses, dtype=float))
+    dias = (pd.DatetimeIndex(fechas) - pd.Timestamp(fechas[0])).days.to_numpy(dtype=float)
+
+    inicial, final = valores[0], valores[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crecimiento = np.where(inicial > 0, (final - inicial) / inicial * 100, np.nan)
+
+    pendientes, _ = ajustar_tendencia(dias, valores)
+
+    # Descomposición por periodo: rendimiento devengado sobre el valor anterior y aportes netos
+    meses = np.diff(dias)[:, None] / DIAS_POR_MES
+    rendimientos = intereses[:-1] * meses
+    flujos = np.diff(valores, axis=0) - rendimientos
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tasas = np.where(valores[:-1] > 0, rendimientos / valores[:-1], 0.0)
+    ponderada_tiempo = (np.prod(1 + tasas, axis=0) - 1) * 100
+
+    if len(dias) > 1 and dias[-1] > 0:
+        ponderada_dinero = _tir(dias / DIAS_POR_ANIO, inicial, flujos, final) * 100
+    else:
+        ponderada_dinero = np.full(final.shape, np.nan)
+
+    picos = np.maximum.accumulate(valores, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        caidas = np.where(picos > 0, valores / picos - 1, 0.0)
+
+    return {
+        'Valor inicial': inicial,
+        'Valor final': final,
+        'Crecimiento (%)': crecimiento,
+        'Tendencia mensual': pendientes * DIAS_POR_MES,
+        'Aportes netos': flujos.sum(axis=0),
+        'Rendimiento acumulado': rendimientos.sum(axis=0),
+        'Rentabilidad TWR declarada (%)': ponderada_tiempo,
+        'Rentabilidad MWR declarada anual (%)': ponderada_dinero,
+        'Máxima caída (%)': caidas.min(axis=0) * 100,
+    }
+
+def _matrices(activos, columnas):
+    tabla = activos.pivot_table(index='Fecha', columns=columnas, values=['Dinero', 'Interes Mensual'],
+                                aggfunc='sum', fill_value=0.0).sort_index()
+    return tabla.index, tabla['Dinero'], tabla['Interes Mensual'].reindex(columns=tabla['Dinero'].columns, fill_value=0.0)
+
+def analizar_historial(activos):
+    """
+    Analítica de los snapshots por activo (columnas de leer_snapshots_activos). Devuelve un
+    diccionario con DataFrames 'activos' (por Items y Tipo de inversion), 'tipos' y 'portafolio'
+    (una fila con el total). Con menos de dos fechas distintas devuelve DataFrames vacíos.
+    """
+    if activos.empty or activos['Fecha'].nunique() < 2:
+        return {'activos': pd.DataFrame(), 'tipos': pd.DataFrame(), 'portafolio': pd.DataFrame()}
+
+    resultado = {}
+    for nombre, columnas in (('activos', ['Tipo de inversion', 'Items']), ('tipos', ['Tipo de inversion'])):
+        fechas, valores, intereses = _matrices(activos, columnas)
+        resultado[nombre] = pd.DataFrame(analizar_series(fechas, valores.to_numpy(), intereses.to_numpy()),
+                                         index=valores.columns)
+
+    totales = activos.groupby('Fecha')[['Dinero', 'Interes Mensual']].sum().sort_index()
+    resultado['portafolio'] = pd.DataFrame(
+        analizar_series(totales.index, totales[['Dinero']].to_numpy(), totales[['Interes Mensual']].to_numpy()),
+        index=['Portafolio']
+    )
+    return resultado
@@ -1,32 +1,24 @@
 # Este es el archivo app.py: punto de entrada principal de la aplicacion
+import importlib
+
 import streamlit as st
 import pandas as pd
 
-# Importaciones de modulos locales
-from cargador_archivos import cargar_datos
-from portafolio import analizar_portafolio, mostrar_kpis
-from simulador import simular_proyecciones
-from evaluacion import evaluar_prestamo
-from chat_financiero import chat_ia
-from generador_informe import generar_docx
-from inversiones_fisicas import gestionar_inversiones_fisicas
-from manual_ia import mostrar_manual_ia
-from fire import calculadora_fire
-from devaluacion import calcular_devaluacion
-
-from optimizador import mostrar_optimizacion_completa # Importar la funcion completa
-from historico import mostrar_historico, guardar_snapshot
-from balance_general import mostrar_balance_general
-# from rebalanceo import rebalanceo_inteligente # Esta línea ya no es necesaria y fue eliminada
-from divisas import mostrar_divisas, obtener_tasa_cambio
-from ruta_meta import ruta_hacia_meta, load_meta_params
-from gestion_gastos import mostrar_gestion_gastos
-from evaluacion_riesgo import mostrar_evaluacion_riesgo
-from seguimiento_metas import mostrar_seguimiento_metas
-from dashboard import mostrar_dashboard_interactivo
+from valoracion import MONEDAS_REPORTE, portafolio_en_pesos
+
+# Los modulos de cada pagina se importan de forma diferida: solo se carga el modulo
+# (y sus dependencias pesadas: plotly, matplotlib, reportlab, docx, fpdf, requests)
+# cuando su opcion se elige en el sidebar. Python los conserva en sys.modules despues.
+def cargar_funcion(modulo, funcion):
+    """Importa `modulo` la primera vez que se necesita y devuelve su `funcion`."""
+    return getattr(importlib.import_module(modulo), funcion)
 
 st.set_page_config(page_title="IA Financiera Analisis de Portafolio",page_icon="🏢", layout="wide")
 
+# Hilo que mantiene al dia las tasas de cambio (una sola vez por proceso; las paginas
+# solo leen el ultimo valor conocido y nunca esperan a la API)
+cargar_funcion("actualizador_tasas", "iniciar_actualizador")()
+
 st.sidebar.title("IA Financiera")
 opciones = st.sidebar.radio("Selecciona una opcion:", [
     "📥 Cargar Portafolio",
@@ -51,26 +43,35 @@ opciones = st.sidebar.radio("Selecciona una opcion:", [
     "📘 Manual de Usuario"
 ])
 
+# Moneda en la que se reportan capital e ingreso pasivo (Analisis, Inicio, Balance e Informe)
+st.sidebar.selectbox("Moneda de reporte:", MONEDAS_REPORTE, key="moneda_reporte")
+
 # --- Inicializacion de variables de sesion (para que sean "estaticas" en la sesion) ---
 # Es crucial inicializar estas variables al inicio de la aplicacion
 # para que siempre existan, incluso en la primera ejecucion o despues de una recarga.
 
-# DataFrame del portafolio: se inicializa a None si no existe
+# DataFrame del portafolio: se inicializa a None si no existe.
+# Es el portafolio canónico (columnas numéricas ya limpias en float64) y se trata como solo lectura.
 if "df" not in st.session_state:
     st.session_state.df = None
+if "portafolio_hash" not in st.session_state:
+    st.session_state.portafolio_hash = None
 
 # Cargar los parámetros de la meta desde el archivo JSON al inicio de la sesión
-initial_meta_params = load_meta_params()
+# (solo si faltan, para no leer el archivo ni importar ruta_meta en cada rerun)
+claves_meta = ["capital_meta_informe", "inversion_mensual_informe", "ingreso_pasivo_objetivo_informe"]
+if any(clave not in st.session_state for clave in claves_meta):
+    initial_meta_params = cargar_funcion("ruta_meta", "load_meta_params")()
 
-# Variables de la "Ruta hacia la meta" (usadas en generador_informe.py)
-if "capital_meta_informe" not in st.session_state:
-    st.session_state.capital_meta_informe = initial_meta_params["capital_meta"]
+    # Variables de la "Ruta hacia la meta" (usadas en generador_informe.py)
+    if "capital_meta_informe" not in st.session_state:
+        st.session_state.capital_meta_informe = initial_meta_params["capital_meta"]
 
-if "inversion_mensual_informe" not in st.session_state:
-    st.session_state.inversion_mensual_informe = initial_meta_params["inversion_mensual"]
+    if "inversion_mensual_informe" not in st.session_state:
+        st.session_state.inversion_mensual_informe = initial_meta_params["inversion_mensual"]
 
-if "ingreso_pasivo_objetivo_informe" not in st.session_state:
-    st.session_state.ingreso_pasivo_objetivo_informe = initial_meta_params["ingreso_pasivo_objetivo"]
+    if "ingreso_pasivo_objetivo_informe" not in st.session_state:
+        st.session_state.ingreso_pasivo_objetivo_informe = initial_meta_params["ingreso_pasivo_objetivo"]
 
 # Variables para el modulo "Devaluacion e Inflacion"
 if "inflacion_anual_input" not in st.session_state:
@@ -101,103 +102,111 @@ if 'financial_goals' not in st.session_state:
     st.session_state.financial_goals = []
 # -----------------------------------------------------------------------------
 
+# Las paginas que suman montos en pesos reciben el portafolio con las filas en USD/EUR
+# ya convertidas a COP; se valora una sola vez por ejecucion y solo en esas paginas
+PAGINAS_EN_PESOS = (
+    "📈 Proyecciones", "🎯 Meta y KPIs", "📉 Devaluacion e Inflacion", "🕒 Historico del Portafolio",
+    "🔥 Calculadora FIRE", "🛤️ Camino a tu meta", "🎯 Seguimiento de Metas",
+    "💬 Chat Financiero", "♻️ Rebalanceo", "🛡️ Evaluacion de Riesgo",
+)
+df_pesos = portafolio_en_pesos(st.session_state.df) if opciones in PAGINAS_EN_PESOS else None
+
 
 if opciones == "📥 Cargar Portafolio":
-    st.session_state.df = cargar_datos()
+    st.session_state.df = cargar_funcion("cargador_archivos", "cargar_datos")()
 
 elif opciones == "📊 Analisis del Portafolio":
     if st.session_state.df is not None:
-        analizar_portafolio(st.session_state.df)
+        cargar_funcion("portafolio", "analizar_portafolio")(st.session_state.df)
     else:
         st.warning("Primero debes cargar un archivo de portafolio.")
 
 elif opciones == "📈 Proyecciones":
-    if st.session_state.df is not None:
-        simular_proyecciones(st.session_state.df)
-    else:
+    if df_pesos is not None:
+        cargar_funcion("simulador", "simular_proyecciones")(df_pesos)
+    elif st.session_state.df is None:
         st.warning("Carga tu portafolio para ver proyecciones.")
 
 elif opciones == "🎯 Meta y KPIs":
-    if st.session_state.df is not None:
-        mostrar_kpis(st.session_state.df)
-    else:
+    if df_pesos is not None:
+        cargar_funcion("portafolio", "mostrar_kpis")(df_pesos)
+    elif st.session_state.df is None:
         st.warning("Carga tu portafolio para calcular KPIs.")
 
 elif opciones == "📘 Balance General":
     if st.session_state.df is not None:
-        mostrar_balance_general(st.session_state.df)
+        cargar_funcion("balance_general", "mostrar_balance_general")(st.session_state.df)
     else:
         st.warning("Carga tu portafolio antes de ver el balance general.")
 
 
 elif opciones == "📉 Devaluacion e Inflacion":
-    if st.session_state.df is not None:
-        df = st.session_state.df.copy()
-
-        # Limpieza
-        df['Dinero'] = df['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-        df['Interes Mensual'] = df['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
+    if df_pesos is not None:
+        # El portafolio en sesión ya está limpio (ver cargador_archivos.cargar_datos) y valorado en COP
+        df = df_pesos
 
         capital_productivo = df[df['Interes Mensual'] > 0]['Dinero'].sum()
         ingreso_pasivo_mensual = df['Interes Mensual'].sum()
 
-        calcular_devaluacion(capital_productivo, ingreso_pasivo_mensual)
-    else:
+        cargar_funcion("devaluacion", "calcular_devaluacion")(capital_productivo, ingreso_pasivo_mensual, df['Dinero'].sum())
+    elif st.session_state.df is None:
         st.warning("Carga tu portafolio primero.")
 
 
 elif opciones == "🕒 Historico del Portafolio":
-    if st.session_state.df is not None:
-        guardar_snapshot(st.session_state.df)
-    else:
+    if df_pesos is not None:
+        cargar_funcion("historico", "guardar_snapshot")(df_pesos)
+    elif st.session_state.df is None:
         st.warning("Primero debes cargar un portafolio valido.")
-    mostrar_historico()
+    cargar_funcion("historico", "mostrar_historico")()
 
 elif opciones == "📤 Generar Informe":
     if st.session_state.df is not None:
-        generar_docx(st.session_state.df)
+        cargar_funcion("generador_informe", "generar_docx")(st.session_state.df)
     else:
         st.warning("Carga tu portafolio antes de generar el informe.")
 
 elif opciones == "💬 Chat Financiero":
-    if st.session_state.df is not None:
-        chat_ia(st.session_state.df)
-    else:
+    if df_pesos is not None:
+        cargar_funcion("chat_financiero", "chat_ia")(df_pesos)
+    elif st.session_state.df is None:
         st.warning("Carga tu portafolio para usar el chat financiero.")
 
 elif opciones == "🧾 Evaluacion de Prestamo":
-    evaluar_prestamo()
+    cargar_funcion("evaluacion", "evaluar_prestamo")()
 
 elif opciones == "♻️ Rebalanceo":
-    if st.session_state.df is not None:
-        mostrar_optimizacion_completa(st.session_state.df) # LLAMADA CORREGIDA AQUÍ
-    else:
+    if df_pesos is not None:
+        cargar_funcion("optimizador", "mostrar_optimizacion_completa")(df_pesos) # LLAMADA CORREGIDA AQUÍ
+    elif st.session_state.df is None:
         st.warning("Carga tu portafolio para evaluar rebalanceo.")
 
 
 elif opciones == "🐄 Activos Fisicos":
-    gestionar_inversiones_fisicas()
+    cargar_funcion("inversiones_fisicas", "gestionar_inversiones_fisicas")()
     
 elif opciones == "📘 Manual de Usuario":
-    mostrar_manual_ia()
+    cargar_funcion("manual_ia", "mostrar_manual_ia")()
 
 elif opciones == "💱 Divisas":
-    mostrar_divisas()
+    cargar_funcion("divisas", "mostrar_divisas")()
 
 elif opciones == "💸 Gestion de Gastos":
-    mostrar_gestion_gastos()
+    cargar_funcion("gestion_gastos", "mostrar_gestion_gastos")()
 
 elif opciones == "🛡️ Evaluacion de Riesgo":
-    mostrar_evaluacion_riesgo(st.session_state.df)
+    # Estas dos paginas tambien funcionan sin portafolio; si hay uno pero no se pudo valorar
+    # en COP ya se mostro el error y no se dibujan con datos sin convertir
+    if df_pesos is not None or st.session_state.df is None:
+        cargar_funcion("evaluacion_riesgo", "mostrar_evaluacion_riesgo")(df_pesos)
 
 elif opciones == "🎯 Seguimiento de Metas":
-    mostrar_seguimiento_metas(st.session_state.df)
+    if df_pesos is not None or st.session_state.df is None:
+        cargar_funcion("seguimiento_metas", "mostrar_seguimiento_metas")(df_pesos)
     
 elif opciones == "🔥 Calculadora FIRE":
-    if st.session_state.df is not None:
-        df = st.session_state.df.copy()
-        df['Dinero'] = pd.to_numeric(df['Dinero'].replace('[\$,]', '', regex=True), errors='coerce')
-        df['Interes Mensual'] = pd.to_numeric(df['Interes Mensual'], errors='coerce').fillna(0)
+    if df_pesos is not None:
+        df = df_pesos
 
         # Corregido: Calcular el capital productivo (solo el que genera ingresos)
         capital_productivo = df[df['Interes Mensual'] > 0]['Dinero'].sum()
@@ -207,16 +216,14 @@ elif opciones == "🔥 Calculadora FIRE":
         rentabilidad_aproximada = ((ingreso_pasivo_mensual * 12) / capital_productivo) * 100 if capital_productivo > 0 else 0
 
         # Corregido: Pasar el capital_productivo a la funcion calculadora_fire
-        calculadora_fire(capital_productivo, ingreso_pasivo_mensual, rentabilidad_aproximada)
-    else:
+        cargar_funcion("fire", "calculadora_fire")(capital_productivo, ingreso_pasivo_mensual, rentabilidad_aproximada)
+    elif st.session_state.df is None:
         st.warning("Primero debes cargar tu portafolio para usar la calculadora FIRE.")
 
 
 elif opciones == "🛤️ Camino a tu meta":
-    if st.session_state.df is not None:
-        df = st.session_state.df.copy()
-        df['Dinero'] = pd.to_numeric(df['Dinero'].replace('[\$,]', '', regex=True), errors='coerce')
-        df['Interes Mensual'] = pd.to_numeric(df['Interes Mensual'].replace('[\$,]', '', regex=True), errors='coerce').fillna(0)
+    if df_pesos is not None:
+        df = df_pesos
 
         # Calcular la rentabilidad anual como en la Calculadora FIRE
         capital_total = df['Dinero'].sum()
@@ -227,21 +234,21 @@ elif opciones == "🛤️ Camino a tu meta":
         target_passive_income_default = st.session_state.ingreso_pasivo_objetivo_informe
         monthly_contribution_default = st.session_state.inversion_mensual_informe
 
-        ruta_hacia_meta(
+        cargar_funcion("ruta_meta", "ruta_hacia_meta")(
     df=df,
     capital_objetivo=target_capital_default,
     ingreso_pasivo_objetivo=target_passive_income_default,
     inversion_mensual=monthly_contribution_default
 )
 
-    else:
+    elif st.session_state.df is None:
         st.warning("Primero debes cargar tu portafolio.")
 
 
 elif opciones == "🏠 Inicio":
     
     if st.session_state.df is not None:
-        mostrar_dashboard_interactivo(st.session_state.df)
+        cargar_funcion("dashboard", "mostrar_dashboard_interactivo")(st.session_state.df)
     else:
         st.warning("Primero debes cargar tu portafolio.")
 
@@ -1,6 +1,5 @@
 import streamlit as st
 import pandas as pd
-import os
 from fpdf import FPDF
 import uuid
 from datetime import datetime
@@ -9,42 +8,32 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
 
-# Configuración de archivos
-RUTA_PASIVOS = "pasivos_guardados.xlsx"
-BACKUP_DIR = "backups"
-
-def crear_backup_directory():
-    """Crear directorio de backups si no existe."""
-    if not os.path.exists(BACKUP_DIR):
-        os.makedirs(BACKUP_DIR)
+from repositorio import eliminar_pasivo as eliminar_pasivo_repositorio
+from repositorio import guardar_pasivo, leer_pasivos, reemplazar_pasivos
+from utils import limpiar_moneda, limpiar_porcentaje
+from valoracion import MONEDA_BASE, SIMBOLOS_MONEDA, convertir_monto, portafolio_en_moneda_reporte, tasas_actuales
 
 def cargar_pasivos_guardados():
-    """Cargar pasivos desde archivo Excel con manejo de errores mejorado."""
+    """Cargar pasivos desde el repositorio con manejo de errores mejorado."""
     try:
-        if os.path.exists(RUTA_PASIVOS):
-            df = pd.read_excel(RUTA_PASIVOS)
-            
-            # Verificar columnas requeridas
-            columnas_requeridas = ["Descripcion", "Valor", "Tasa Anual"]
-            columnas_faltantes = [col for col in columnas_requeridas if col not in df.columns]
-            
-            if columnas_faltantes:
-                st.error(f"Archivo de pasivos corrupto. Columnas faltantes: {columnas_faltantes}")
-                return crear_dataframe_pasivos_vacio()
-            
-            # Agregar ID si no existe
-            if 'ID' not in df.columns:
-                df['ID'] = [str(uuid.uuid4()) for _ in range(len(df))]
-                guardar_pasivos_guardados(df)
-            
-            # Validar tipos de datos
-            df['Valor'] = pd.to_numeric(df['Valor'], errors='coerce').fillna(0)
-            df['Tasa Anual'] = pd.to_numeric(df['Tasa Anual'], errors='coerce').fillna(0)
-            
-            return df
-        else:
+        df = leer_pasivos()
+        if df.empty:
             return crear_dataframe_pasivos_vacio()
-            
+
+        # Verificar columnas requeridas
+        columnas_requeridas = ["Descripcion", "Valor", "Tasa Anual"]
+        columnas_faltantes = [col for col in columnas_requeridas if col not in df.columns]
+
+        if columnas_faltantes:
+            st.error(f"Pasivos guardados incompletos. Columnas faltantes: {columnas_faltantes}")
+            return crear_dataframe_pasivos_vacio()
+
+        # Validar tipos de datos
+        df['Valor'] = limpiar_moneda(df['Valor']).fillna(0)
+        df['Tasa Anual'] = limpiar_porcentaje(df['Tasa Anual']).fillna(0)
+
+        return df
+
     except Exception as e:
         st.error(f"Error al cargar pasivos: {e}")
         return crear_dataframe_pasivos_vacio()
@@ -54,37 +43,49 @@ def crear_dataframe_pasivos_vacio():
     return pd.DataFrame(columns=["ID", "Descripcion", "Valor", "Tasa Anual", "Fecha_Creacion"])
 
 def guardar_pasivos_guardados(df_pasivos):
-    """Guardar pasivos con backup automático."""
+    """Guardar todos los pasivos (reemplaza los existentes en una transacción)."""
     try:
-        # Crear backup antes de guardar
-        crear_backup_directory()
-        if os.path.exists(RUTA_PASIVOS):
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_path = os.path.join(BACKUP_DIR, f"pasivos_backup_{timestamp}.xlsx")
-            df_actual = pd.read_excel(RUTA_PASIVOS)
-            df_actual.to_excel(backup_path, index=False)
-        
         # Agregar timestamp si no existe
         if 'Fecha_Creacion' not in df_pasivos.columns:
             df_pasivos['Fecha_Creacion'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Guardar archivo principal
-        df_pasivos.to_excel(RUTA_PASIVOS, index=False)
-        
+
+        reemplazar_pasivos(df_pasivos)
+
     except Exception as e:
         st.error(f"Error al guardar pasivos: {e}")
 
+def agregar_pasivo(descripcion, valor, tasa):
+    """Guardar un pasivo nuevo (solo se escribe esa fila)."""
+    try:
+        guardar_pasivo({
+            "ID": str(uuid.uuid4()),
+            "Descripcion": descripcion,
+            "Valor": valor,
+            "Tasa Anual": tasa,
+            "Fecha_Creacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+        return True
+    except Exception as e:
+        st.error(f"Error al guardar pasivo: {e}")
+        return False
+
 def eliminar_pasivo(pasivo_id):
     """Eliminar pasivo con confirmación."""
     try:
-        df_pasivos = cargar_pasivos_guardados()
-        df_pasivos = df_pasivos[df_pasivos['ID'] != pasivo_id].reset_index(drop=True)
-        guardar_pasivos_guardados(df_pasivos)
+        eliminar_pasivo_repositorio(pasivo_id)
         return True
     except Exception as e:
         st.error(f"Error al eliminar pasivo: {e}")
         return False
 
+def valorar_pasivos(df_pasivos, moneda):
+    """Pasivos (registrados en COP) con 'Valor' expresado en la moneda de reporte."""
+    if moneda == MONEDA_BASE or df_pasivos.empty:
+        return df_pasivos
+    df_valorado = df_pasivos.copy()
+    df_valorado['Valor'] = convertir_monto(df_valorado['Valor'], MONEDA_BASE, moneda, tasas_actuales()['tasas'])
+    return df_valorado
+
 def formatear_moneda(valor, simbolo="$", decimales=2):
     """Formatear número como moneda con separadores de miles."""
     if pd.isna(valor) or valor == 0:
@@ -96,11 +97,7 @@ def formatear_moneda(valor, simbolo="$", decimales=2):
 def calcular_metricas_financieras(df_activos, df_pasivos):
     """Calcular métricas financieras principales."""
     try:
-        # Limpiar datos de activos
-        df_activos = df_activos.copy()
-        df_activos['Dinero'] = pd.to_numeric(df_activos['Dinero'].astype(str).str.replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
-        df_activos['Interes Mensual'] = pd.to_numeric(df_activos['Interes Mensual'].astype(str).str.replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
-        
+        # Los activos son el portafolio canónico: 'Dinero' e 'Interes Mensual' ya son numéricos
         capital_total = df_activos['Dinero'].sum()
         ingreso_pasivo_total = df_activos['Interes Mensual'].sum()
         
@@ -172,8 +169,10 @@ def crear_graficos_balance(df_activos, df_pasivos, metricas):
         st.error(f"Error al crear gráficos: {e}")
         return None, None, None
 
-def generar_pdf_resumen(df_activos, df_pasivos):
+def generar_pdf_resumen(df_activos, df_pasivos, moneda=MONEDA_BASE):
     """Generar PDF del balance general - versión original."""
+    # Los montos del PDF se expresan en la moneda de reporte ($ para COP, el código para las demás)
+    prefijo = "$" if moneda == MONEDA_BASE else moneda
     now = datetime.now()
     mes_anio = now.strftime("%B %Y").capitalize()
     fecha_completa = now.strftime("%d de %B de %Y").capitalize()
@@ -207,8 +206,8 @@ def generar_pdf_resumen(df_activos, df_pasivos):
     
     for _, row in resumen_pdf.iterrows():
         pdf.cell(60, 8, str(row['Tipo de inversion']), 1)
-        pdf.cell(60, 8, f"$ {row['Dinero']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
-        pdf.cell(60, 8, f"$ {row['Interes Mensual']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
+        pdf.cell(60, 8, f"{prefijo} {row['Dinero']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
+        pdf.cell(60, 8, f"{prefijo} {row['Interes Mensual']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
         pdf.ln()
 
     capital_total = df_activos['Dinero'].sum()
@@ -217,8 +216,8 @@ def generar_pdf_resumen(df_activos, df_pasivos):
     # --- Capital e ingreso ---
     pdf.ln(5)
     pdf.set_font("Arial", 'B', 10)
-    pdf.cell(0, 10, f"Capital Total: $ {capital_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
-    pdf.cell(0, 10, f"Ingreso Pasivo Mensual: $ {ingreso_pasivo_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
+    pdf.cell(0, 10, f"Capital Total: {prefijo} {capital_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
+    pdf.cell(0, 10, f"Ingreso Pasivo Mensual: {prefijo} {ingreso_pasivo_total:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
 
     # --- Tabla: Pasivos registrados ---
     pdf.ln(10)
@@ -226,7 +225,7 @@ def generar_pdf_resumen(df_activos, df_pasivos):
     pdf.cell(0, 10, "Pasivos Registrados", ln=True)
     pdf.set_font("Arial", 'B', 10)
     pdf.cell(80, 8, "Descripción", 1)
-    pdf.cell(40, 8, "Valor (COP)", 1)
+    pdf.cell(40, 8, f"Valor ({moneda})", 1)
     pdf.cell(30, 8, "Tasa Anual (%)", 1)
     pdf.cell(40, 8, "Pago Mensual Aprox.", 1)
     pdf.ln()
@@ -235,9 +234,9 @@ def generar_pdf_resumen(df_activos, df_pasivos):
     for _, row in df_pasivos.iterrows():
         mensual = (row['Valor'] * row['Tasa Anual'] / 12 / 100)
         pdf.cell(80, 8, str(row['Descripcion']), 1)
-        pdf.cell(40, 8, f"$ {row['Valor']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
+        pdf.cell(40, 8, f"{prefijo} {row['Valor']:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
         pdf.cell(30, 8, f"{row['Tasa Anual']:.2f}%", 1, 0, 'R')
-        pdf.cell(40, 8, f"$ {mensual:,.0f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
+        pdf.cell(40, 8, f"{prefijo} {mensual:,.0f}".replace(",", "X").replace(".", ",").replace("X", "."), 1, 0, 'R')
         pdf.ln()
 
     total_pasivos = df_pasivos['Valor'].sum()
@@ -251,9 +250,9 @@ def generar_pdf_resumen(df_activos, df_pasivos):
     pdf.set_font("Arial", 'B', 12)
     pdf.cell(0, 10, "Resumen Financiero", ln=True)
     pdf.set_font("Arial", '', 10)
-    pdf.cell(0, 10, f"Total Pasivos: $ {total_pasivos:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
-    pdf.cell(0, 10, f"Patrimonio Neto: $ {patrimonio:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
-    pdf.cell(0, 10, f"Pago Mensual de Intereses: $ {total_intereses_mensuales:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
+    pdf.cell(0, 10, f"Total Pasivos: {prefijo} {total_pasivos:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
+    pdf.cell(0, 10, f"Patrimonio Neto: {prefijo} {patrimonio:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
+    pdf.cell(0, 10, f"Pago Mensual de Intereses: {prefijo} {total_intereses_mensuales:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."), ln=True)
     pdf.cell(0, 10, f"Porcentaje de Pasivos sobre Activos: {porcentaje_pasivos:.2f}%", ln=True)
 
     # --- Consejos Financieros ---
@@ -273,21 +272,25 @@ def generar_pdf_resumen(df_activos, df_pasivos):
 def mostrar_balance_general(df):
     """Función principal para mostrar el balance general."""
     st.header("📊 Balance General del Portafolio")
+
+    # Inicializar session state (en el render, no al importar el módulo)
+    if 'show_form' not in st.session_state:
+        st.session_state.show_form = False
     
     try:
-        # Preparar datos de activos
-        df_clean = df.copy()
-        df_clean['Dinero'] = pd.to_numeric(df_clean['Dinero'].astype(str).str.replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
-        df_clean['Interes Mensual'] = pd.to_numeric(df_clean['Interes Mensual'].astype(str).str.replace(r'[\$,]', '', regex=True), errors='coerce').fillna(0)
+        # Datos de activos: portafolio canónico (ya limpio, solo lectura) en la moneda de reporte
+        df_clean, moneda = portafolio_en_moneda_reporte(df)
+        simbolo = SIMBOLOS_MONEDA.get(moneda, "$")
         
-        # Cargar datos de pasivos
+        # Cargar datos de pasivos (se registran en COP; los totales se llevan a la moneda de reporte)
         df_pasivos = cargar_pasivos_guardados()
+        df_pasivos_valorados = valorar_pasivos(df_pasivos, moneda)
         
         # Calcular métricas básicas
         capital_total = df_clean['Dinero'].sum()
         ingreso_pasivo_total = df_clean['Interes Mensual'].sum()
-        total_pasivos = df_pasivos['Valor'].sum() if not df_pasivos.empty else 0
-        intereses_mensuales = ((df_pasivos['Valor'] * df_pasivos['Tasa Anual'] / 100) / 12).sum() if not df_pasivos.empty else 0
+        total_pasivos = df_pasivos_valorados['Valor'].sum() if not df_pasivos.empty else 0
+        intereses_mensuales = ((df_pasivos_valorados['Valor'] * df_pasivos_valorados['Tasa Anual'] / 100) / 12).sum() if not df_pasivos.empty else 0
         patrimonio = capital_total - total_pasivos
         porcentaje_pasivos = (total_pasivos / capital_total * 100) if capital_total > 0 else 0
 
@@ -295,13 +298,13 @@ def mostrar_balance_general(df):
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("💰 Capital Total", formatear_moneda(capital_total))
+            st.metric("💰 Capital Total", formatear_moneda(capital_total, simbolo))
         
         with col2:
-            st.metric("📈 Ingreso Pasivo Mensual", formatear_moneda(ingreso_pasivo_total))
+            st.metric("📈 Ingreso Pasivo Mensual", formatear_moneda(ingreso_pasivo_total, simbolo))
         
         with col3:
-            st.metric("💎 Patrimonio Neto", formatear_moneda(patrimonio))
+            st.metric("💎 Patrimonio Neto", formatear_moneda(patrimonio, simbolo))
         
         with col4:
             color = "inverse" if porcentaje_pasivos > 30 else "normal"
@@ -352,12 +355,9 @@ def mostrar_balance_general(df):
                 enviar = st.form_submit_button("Guardar")
 
             if enviar and descripcion and valor > 0:
-                new_id = str(uuid.uuid4())
-                nuevo = pd.DataFrame([[new_id, descripcion, valor, tasa]], columns=["ID", "Descripcion", "Valor", "Tasa Anual"])
-                df_pasivos = pd.concat([df_pasivos, nuevo], ignore_index=True)
-                guardar_pasivos_guardados(df_pasivos)
-                st.success("✅ Pasivo guardado correctamente.")
-                st.rerun()
+                if agregar_pasivo(descripcion, valor, tasa):
+                    st.success("✅ Pasivo guardado correctamente.")
+                    st.rerun()
             elif enviar:
                 st.warning("Por favor, introduce una descripción y un valor válido para el pasivo.")
 
@@ -368,19 +368,19 @@ def mostrar_balance_general(df):
         with col1:
             st.metric(
                 "Total Pasivos", 
-                formatear_moneda(total_pasivos),
+                formatear_moneda(total_pasivos, simbolo),
                 help="Suma total de tus deudas. Idealmente no debería superar el 30% de tus activos totales."
             )
             st.metric(
                 "Patrimonio Neto", 
-                formatear_moneda(patrimonio),
+                formatear_moneda(patrimonio, simbolo),
                 help="Diferencia entre tus activos y pasivos. A mayor patrimonio, mejor salud financiera."
             )
         
         with col2:
             st.metric(
                 "Pago Mensual de Intereses", 
-                formatear_moneda(intereses_mensuales),
+                formatear_moneda(intereses_mensuales, simbolo),
                 help="Monto que pagas mensualmente por intereses. Considera refinanciar si es muy alto."
             )
 
@@ -401,7 +401,7 @@ def mostrar_balance_general(df):
         if not df_pasivos.empty:
             st.write("---")
             st.subheader("📄 Descargar Balance General en PDF")
-            pdf_bytes = generar_pdf_resumen(df_clean, df_pasivos)
+            pdf_bytes = generar_pdf_resumen(df_clean, df_pasivos_valorados, moneda)
             now = datetime.now()
             nombre_archivo = f"Balance General - {now.strftime('%B %Y').capitalize()}.pdf"
             st.download_button(
@@ -414,7 +414,3 @@ def mostrar_balance_general(df):
     except Exception as e:
         st.error(f"Error general en el balance: {e}")
         st.error("Por favor, verifica que tu archivo de portafolio tenga el formato correcto.")
-
-# Inicializar session state
-if 'show_form' not in st.session_state:
-    st.session_state.show_form = False
\ No newline at end of file
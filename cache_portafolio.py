@@ -0,0 +1,135 @@
+# cache_portafolio.py
+# Caché en disco de portafolios ya procesados, en formato columnar (Arrow/Feather).
+# Cuando se vuelve a subir el mismo libro, se lee del caché en lugar de parsear el Excel.
+
+import os
+import time
+import pickle
+
+# Arrow es opcional: si no está instalado se usa pickle como respaldo
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+CACHE_DIR = "cache_portafolios"
+CACHE_MAX_DIAS = 30                     # Entradas sin usar por más de esto se eliminan
+CACHE_MAX_BYTES = 200 * 1024 * 1024     # Tamaño total máximo del directorio de caché
+
+# Subir este número invalida todas las entradas si cambia la forma de limpiar el portafolio
+VERSION_CACHE = 2
+EXTENSIONES_CACHE = (".arrow", ".pkl")
+
+def _ruta_cache(clave, extension):
+    return os.path.join(CACHE_DIR, f"v{VERSION_CACHE}_{clave}{extension}")
+
+def _entradas_cache():
+    """Lista (ruta, tamaño, última modificación) de los archivos del caché."""
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entradas = []
+    for nombre in os.listdir(CACHE_DIR):
+        if not nombre.endswith(EXTENSIONES_CACHE) and not nombre.endswith(".tmp"):
+            continue
+        ruta = os.path.join(CACHE_DIR, nombre)
+        try:
+            info = os.stat(ruta)
+        except OSError:
+            continue
+        entradas.append((ruta, info.st_size, info.st_mtime))
+    return entradas
+
+def leer_cache(clave):
+    """
+    Devuelve el portafolio guardado bajo la clave (hash del archivo) o None.
+    Con Arrow el archivo se abre con memory-map; al leer se actualiza su fecha de uso.
+    """
+    for extension in EXTENSIONES_CACHE:
+        ruta = _ruta_cache(clave, extension)
+        if not os.path.exists(ruta):
+            continue
+        try:
+            if extension == ".arrow":
+                if not PYARROW_AVAILABLE:
+                    continue
+                df = feather.read_table(ruta, memory_map=True).to_pandas()
+            else:
+                with open(ruta, "rb") as f:
+                    df = pickle.load(f)
+            os.utime(ruta, None)
+            return df
+        except Exception:
+            # Entrada corrupta o incompatible: se descarta y se vuelve a parsear el Excel
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+    return None
+
+def guardar_cache(clave, df):
+    """Guarda el portafolio procesado bajo la clave y aplica la política de limpieza."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df = df.reset_index(drop=True)
+    df.columns = [str(col) for col in df.columns]
+
+    guardado = False
+    if PYARROW_AVAILABLE:
+        ruta = _ruta_cache(clave, ".arrow")
+        temporal = ruta + ".tmp"
+        try:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            feather.write_feather(tabla, temporal, compression="uncompressed")
+            os.replace(temporal, ruta)
+            guardado = True
+        except Exception:
+            # Columnas con tipos mezclados que Arrow no acepta: se usa pickle
+            if os.path.exists(temporal):
+                os.remove(temporal)
+
+    if not guardado:
+        ruta = _ruta_cache(clave, ".pkl")
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+
+    limpiar_cache()
+
+def limpiar_cache(max_dias=CACHE_MAX_DIAS, max_bytes=CACHE_MAX_BYTES):
+    """
+    Política de invalidación del caché:
+    1. Elimina las entradas que no se han usado en más de `max_dias` días.
+    2. Si el total sigue superando `max_bytes`, elimina las menos usadas recientemente.
+    """
+    limite = time.time() - max_dias * 24 * 3600
+    prefijo_vigente = f"v{VERSION_CACHE}_"
+    vigentes = []
+    for ruta, tamano, modificado in _entradas_cache():
+        # También se eliminan las entradas de versiones anteriores y temporales huérfanos
+        if modificado < limite or not os.path.basename(ruta).startswith(prefijo_vigente) or ruta.endswith(".tmp"):
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        else:
+            vigentes.append((ruta, tamano, modificado))
+
+    total = sum(tamano for _, tamano, _ in vigentes)
+    for ruta, tamano, _ in sorted(vigentes, key=lambda entrada: entrada[2]):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(ruta)
+            total -= tamano
+        except OSError:
+            pass
+
+def vaciar_cache():
+    """Elimina todas las entradas del caché."""
+    for ruta, _, _ in _entradas_cache():
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
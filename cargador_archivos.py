@@ -5,10 +5,102 @@
 import streamlit as st
 import pandas as pd
 
+from cache_portafolio import guardar_cache, leer_cache, vaciar_cache
+from utils import COLUMNAS_NUMERICAS_PORTAFOLIO, hash_contenido, limpiar_columna, preparar_portafolio
+
+# Columnas del portafolio que usa la app; en lectura por streaming se ignora el resto
+COLUMNAS_PORTAFOLIO = [
+    'Personas', 'Tipo de inversion', 'Items', 'Dinero', 'Interes Mensual',
+    'Interes anual (%)', 'Porcentaje', 'Ingreso Mensual Necesario', 'Moneda'
+]
+FILAS_POR_BLOQUE = 5000
+
+def _convertir_bloque(filas, columnas):
+    """Arma un DataFrame con un bloque de filas y convierte sus columnas numéricas."""
+    bloque = pd.DataFrame(filas, columns=columnas)
+    for col in columnas:
+        if col in COLUMNAS_NUMERICAS_PORTAFOLIO:
+            bloque[col] = limpiar_columna(bloque[col], col)
+    return bloque
+
+def leer_excel_streaming(archivo, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Lee la primera hoja de un .xlsx con openpyxl en modo solo lectura (iter_rows),
+    tomando únicamente las columnas de COLUMNAS_PORTAFOLIO.
+
+    Las filas se procesan por bloques: cada bloque se convierte a tipos numéricos
+    apenas se lee, y se muestra el progreso de la carga.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        hoja = libro.worksheets[0]
+        filas = hoja.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return pd.DataFrame(columns=COLUMNAS_PORTAFOLIO)
+
+        encabezado = [str(valor).strip() if valor is not None else "" for valor in encabezado]
+        indices = [(encabezado.index(col), col) for col in COLUMNAS_PORTAFOLIO if col in encabezado]
+        columnas = [col for _, col in indices]
+
+        total_filas = max((hoja.max_row or 1) - 1, 1)
+        barra = st.progress(0.0, text="Leyendo portafolio...")
+
+        bloques = []
+        pendientes = []
+        leidas = 0
+        for fila in filas:
+            # Se descartan filas completamente vacías (formato residual al final de la hoja)
+            valores = [fila[i] if i < len(fila) else None for i, _ in indices]
+            if all(valor is None for valor in valores):
+                continue
+            pendientes.append(valores)
+            leidas += 1
+            if len(pendientes) >= filas_por_bloque:
+                bloques.append(_convertir_bloque(pendientes, columnas))
+                pendientes = []
+                barra.progress(min(leidas / total_filas, 1.0), text=f"Leyendo portafolio... {leidas:,} filas")
+        if pendientes:
+            bloques.append(_convertir_bloque(pendientes, columnas))
+
+        barra.progress(1.0, text=f"Portafolio leído: {leidas:,} filas")
+    finally:
+        libro.close()
+
+    if not bloques:
+        return pd.DataFrame(columns=columnas)
+    return pd.concat(bloques, ignore_index=True)
+
 def cargar_datos():
     # Aceptar ambos tipos de archivos Excel: .xls (antiguo) y .xlsx (moderno)
     archivo = st.file_uploader("Sube tu archivo Excel (.xls o .xlsx)", type=["xls", "xlsx"])
+    lectura_streaming = st.checkbox(
+        "Lectura rápida para libros grandes (solo columnas del portafolio)",
+        value=True,
+        help="Lee el .xlsx fila por fila en modo solo lectura y conserva únicamente las columnas que usa la app."
+    )
+    if st.button("🗑️ Vaciar caché de portafolios"):
+        vaciar_cache()
+        st.session_state.portafolio_hash = None
+        st.info("Caché de portafolios eliminado.")
     if archivo is not None:
+        # Clave del portafolio: hash del contenido + modo de lectura (el streaming descarta columnas)
+        modo = "streaming" if lectura_streaming and archivo.name.endswith('.xlsx') else "completo"
+        hash_archivo = f"{hash_contenido(archivo.getvalue())}_{modo}"
+
+        # Si el mismo archivo ya fue procesado en esta sesión, se reutiliza el portafolio canónico
+        if st.session_state.get("portafolio_hash") == hash_archivo and st.session_state.get("df") is not None:
+            st.success("Archivo cargado correctamente.")
+            return st.session_state.df
+
+        # Si ya fue procesado en una sesión anterior, se lee del caché en disco
+        df = leer_cache(hash_archivo)
+        if df is not None:
+            st.session_state.portafolio_hash = hash_archivo
+            st.success("Archivo cargado correctamente (desde caché).")
+            return df
         try:
             # Determinar el motor de lectura basado en la extensión del archivo
             if archivo.name.endswith('.xls'):
@@ -16,13 +108,24 @@ def cargar_datos():
                 # Si 'xlrd' no está instalado, pandas lo indicará.
                 df = pd.read_excel(archivo, engine='xlrd')
             elif archivo.name.endswith('.xlsx'):
-                # Para archivos .xlsx, el motor por defecto o 'openpyxl' es adecuado.
-                # 'openpyxl' también puede leer .xls en algunas versiones, pero es mejor ser explícito.
-                df = pd.read_excel(archivo, engine='openpyxl')
+                # Para archivos .xlsx se usa openpyxl. Por defecto se lee en streaming
+                # (solo lectura, solo las columnas que usa la app) para libros grandes.
+                if lectura_streaming:
+                    df = leer_excel_streaming(archivo)
+                else:
+                    df = pd.read_excel(archivo, engine='openpyxl')
             else:
                 st.error("Formato de archivo no soportado. Por favor, sube un archivo .xls o .xlsx.")
                 return None
-            
+
+            # Portafolio canónico: se limpia una sola vez y todas las páginas lo leen
+            df = preparar_portafolio(df)
+            st.session_state.portafolio_hash = hash_archivo
+            try:
+                guardar_cache(hash_archivo, df)
+            except OSError as e:
+                st.warning(f"No se pudo guardar el portafolio en caché: {e}")
+
             st.success("Archivo cargado correctamente.")
             return df
         except ImportError as ie:
@@ -31,4 +134,4 @@ def cargar_datos():
         except Exception as e:
             st.error(f"Error al leer el archivo: {e}. Asegúrate de que el formato sea correcto y que las columnas estén bien.")
             return None
-    return None
\ No newline at end of file
+    return None
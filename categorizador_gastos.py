@@ -0,0 +1,100 @@
+# categorizador_gastos.py
+# Motor de reglas para categorizar gastos por palabras clave de la descripción.
+#
+# Las reglas están en reglas_gastos.json, en orden de prioridad, y se compilan una sola vez por
+# proceso (se vuelven a compilar solo si el archivo cambia):
+# - Todas las palabras clave forman una única expresión regular. La búsqueda anticipada (?=(...))
+#   encuentra en cada posición la palabra más larga que empieza allí, y una tabla precalculada
+#   agrega las palabras contenidas en ella: el resultado equivale a revisar cada palabra con `in`.
+# - Cada regla queda como máscaras de bits sobre las palabras; la categoría es la de la primera
+#   regla cuyas máscaras coinciden con las palabras presentes en la descripción.
+# - Una columna completa se categoriza en una pasada sobre sus descripciones únicas.
+
+import json
+import os
+import re
+import threading
+
+import pandas as pd
+
+REGLAS_GASTOS_FILE = "reglas_gastos.json"
+
+# Motor compilado: {'firma': (mtime, tamaño) del archivo, 'patron', 'contenidas', 'reglas'}
+_motor = {}
+_lock = threading.Lock()
+
+def _aplanar_reglas(datos):
+    """
+    Convierte las reglas del archivo en una lista de (grupos, tipo, categoria) en orden de prioridad.
+    Una regla coincide si cada grupo tiene al menos una palabra en la descripción; sin grupos
+    coincide siempre. Las subreglas van antes que la categoría por defecto de su regla.
+    """
+    hojas = []
+    for regla in datos['reglas']:
+        grupos = [] if regla.get('siempre') else [regla['palabras']]
+        for subregla in regla.get('subreglas', []):
+            hojas.append((grupos + [subregla['palabras']], subregla['tipo'], subregla['categoria']))
+        hojas.append((grupos, regla['tipo'], regla['categoria']))
+    sin_clasificar = datos['sin_clasificar']
+    hojas.append(([], sin_clasificar['tipo'], sin_clasificar['categoria']))
+    return hojas
+
+def _compilar(datos):
+    hojas = _aplanar_reglas(datos)
+    # Las palabras más largas van primero para que la alternativa que gana sea la más larga
+    palabras = sorted({palabra.lower() for grupos, _, _ in hojas for grupo in grupos for palabra in grupo},
+                      key=lambda palabra: (-len(palabra), palabra))
+    bits = {palabra: 1 << i for i, palabra in enumerate(palabras)}
+    return {
+        'patron': re.compile("(?=(" + "|".join(map(re.escape, palabras)) + "))") if palabras else None,
+        # Palabras contenidas en cada palabra (incluida ella misma) como máscara de bits
+        'contenidas': {palabra: sum(bits[otra] for otra in palabras if otra in palabra) for palabra in palabras},
+        'reglas': [
+            ([sum(bits[palabra.lower()] for palabra in grupo) for grupo in grupos], tipo, categoria)
+            for grupos, tipo, categoria in hojas
+        ],
+    }
+
+def _obtener_motor():
+    """Motor compilado de las reglas vigentes (se recompila si el archivo de reglas cambió)."""
+    info = os.stat(REGLAS_GASTOS_FILE)
+    firma = (info.st_mtime_ns, info.st_size)
+    with _lock:
+        if _motor.get('firma') != firma:
+            with open(REGLAS_GASTOS_FILE, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            _motor.clear()
+            _motor.update(_compilar(datos), firma=firma)
+        return dict(_motor)
+
+def _clasificar(motor, encontradas):
+    presentes = 0
+    for palabra in encontradas:
+        presentes |= motor['contenidas'][palabra]
+    for mascaras, tipo, categoria in motor['reglas']:
+        if all(presentes & mascara for mascara in mascaras):
+            return tipo, categoria
+
+def _buscar(motor, texto):
+    return motor['patron'].findall(texto) if motor['patron'] is not None else []
+
+def categorizar_texto(descripcion):
+    """Devuelve (tipo, categoría) de una descripción según reglas_gastos.json."""
+    motor = _obtener_motor()
+    return _clasificar(motor, _buscar(motor, str(descripcion).lower()))
+
+def categorizar_columna(descripciones):
+    """
+    Categoriza una columna completa de descripciones. Devuelve un DataFrame con el mismo índice
+    y las columnas 'tipo' y 'categoria'. Cada descripción distinta se evalúa una sola vez.
+    """
+    motor = _obtener_motor()
+    codigos, unicas = pd.factorize(descripciones.fillna("").astype(str).str.lower())
+    if motor['patron'] is not None:
+        encontradas = pd.Series(unicas, dtype=object).str.findall(motor['patron'])
+    else:
+        encontradas = [[]] * len(unicas)
+    clasificadas = pd.DataFrame([_clasificar(motor, lista) for lista in encontradas], columns=['tipo', 'categoria'])
+    resultado = clasificadas.take(codigos)
+    resultado.index = descripciones.index
+    return resultado
@@ -49,9 +49,8 @@ def chat_ia(df):
                 respuesta = "Por favor, carga tu portafolio primero para que pueda analizar tus datos."
             else:
                 try:
-                    df_cleaned = df.copy()
-                    df_cleaned['Dinero'] = pd.to_numeric(df_cleaned['Dinero'].replace('[\$,]', '', regex=True), errors='coerce').fillna(0)
-                    df_cleaned['Interes Mensual'] = pd.to_numeric(df_cleaned['Interes Mensual'], errors='coerce').fillna(0)
+                    # Portafolio canónico (ya limpio, solo lectura)
+                    df_cleaned = df
 
                     pregunta_lower = pregunta.lower()
 
@@ -8,9 +8,13 @@ from utils import (
     formato_porcentaje,
     formatear_columnas_para_vista,
 )
+from valoracion import SIMBOLOS_MONEDA, portafolio_en_moneda_reporte
 
 def mostrar_dashboard_interactivo(df):
     df_cleaned = clean_df_for_analysis(df)
+    # Capital e ingreso en la moneda de reporte elegida en el sidebar
+    df_cleaned, moneda = portafolio_en_moneda_reporte(df_cleaned)
+    simbolo = SIMBOLOS_MONEDA.get(moneda, "$")
     df_mostrar = df_cleaned.copy()
 
     # --- Estilo CSS mejorado con modo oscuro y animaciones ---
@@ -185,12 +189,12 @@ def mostrar_dashboard_interactivo(df):
         <div class="kpi-card card-1">
             <div class="metric-icon">$</div>
             <div class="metric-label">Capital Total</div>
-            <div class="metric-value">{formato_pesos(total)}</div>
+            <div class="metric-value">{formato_pesos(total, simbolo)}</div>
         </div>
         <div class="kpi-card card-2">
             <div class="metric-icon">+</div>
             <div class="metric-label">Ingreso Mensual</div>
-            <div class="metric-value">{formato_pesos(ingreso)}</div>
+            <div class="metric-value">{formato_pesos(ingreso, simbolo)}</div>
         </div>
         <div class="kpi-card card-3">
             <div class="metric-icon">%</div>
@@ -246,7 +250,7 @@ def mostrar_dashboard_interactivo(df):
     st.markdown('<h3 class="section-title">Detalle del Portafolio</h3>', unsafe_allow_html=True)
     
     columnas_a_formatear = ['Dinero', 'Interes Mensual', 'Ingreso Mensual Necesario']
-    df_formateado = formatear_columnas_para_vista(df_filtrado, columnas_a_formatear)
+    df_formateado = formatear_columnas_para_vista(df_filtrado, columnas_a_formatear, simbolo)
 
     if 'Porcentaje' in df_formateado.columns:
         df_formateado['Porcentaje'] = df_filtrado['Porcentaje'].apply(lambda x: f"{x * 100:.2f}%")
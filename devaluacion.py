@@ -7,7 +7,7 @@ def formato_pesos(val):
     """Formatea el numero con separador de miles como '.' y decimal como ','"""
     return f"${val:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
-def calcular_devaluacion(capital_productivo, ingreso_pasivo_mensual):
+def calcular_devaluacion(capital_productivo, ingreso_pasivo_mensual, capital_total=None):
     st.markdown("""
     <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
                 padding: 20px; border-radius: 15px; margin-bottom: 20px;'>
@@ -17,12 +17,8 @@ def calcular_devaluacion(capital_productivo, ingreso_pasivo_mensual):
     </div>
     """, unsafe_allow_html=True)
 
-    # Obtener el capital total del DataFrame si está disponible
-    capital_inicial_real = capital_productivo
-    if 'df' in st.session_state and st.session_state.df is not None:
-        df_temp = st.session_state.df.copy()
-        df_temp['Dinero'] = df_temp['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-        capital_inicial_real = df_temp['Dinero'].sum()
+    # Capital total del portafolio (valorado en COP por quien llama); sin él, el productivo
+    capital_inicial_real = capital_productivo if capital_total is None else capital_total
 
     # Mostrar información del capital con diseño mejorado y colores
     st.markdown("""
@@ -1,42 +1,62 @@
 import streamlit as st
 import pandas as pd
-import requests
 from datetime import datetime, timedelta
 import time
 import plotly.graph_objects as go
 import plotly.express as px
-import json
-import os
 import numpy as np
+import threading
+
+from actualizador_tasas import iniciar_actualizador
+from proveedor_tasas import obtener_tasas, ultimas_tasas
+from repositorio import leer_historial_capital, registrar_capital_del_dia, reemplazar_historial_capital, version_tabla
+from valoracion import MONEDA_BASE, valorar_portafolio
+from serie_capital import FRECUENCIAS, actualizar_serie, construir_serie, estadisticas_rango, rango_fechas, serie_a_dataframe
+
+# Vista en memoria del historial de capital, válida mientras no cambie la versión de la tabla:
+# {'version', 'historial' (registros ordenados por fecha), 'por_dia' (último registro válido de cada día),
+#  'series' (serie diaria, semanal y mensual de serie_capital.py)}
+_cache_capital = {}
+_lock_capital = threading.Lock()
+
+# Períodos de análisis del capital: nombre -> días hacia atrás desde hoy ("Todos" no filtra)
+PERIODOS_CAPITAL = {
+    "7 días": 7,
+    "30 días": 30,
+    "90 días": 90,
+    "1 año": 365
+}
+# Agrupación de los registros en el gráfico: etiqueta -> frecuencia de serie_capital
+AGRUPACIONES_CAPITAL = {"Día": "diaria", "Semana": "semanal", "Mes": "mensual"}
 
 def cargar_historial_capital():
     """
-    Carga el historial de capital desde un archivo JSON
+    Carga el historial de capital desde el repositorio.
+    Se reutiliza la vista en memoria mientras la tabla no cambie (no modificar el resultado).
     """
     try:
-        if os.path.exists('historial_capital.json'):
-            with open('historial_capital.json', 'r') as f:
-                data = json.load(f)
-                df = pd.DataFrame(data)
-                df['fecha'] = pd.to_datetime(df['fecha'])
-                return df
-        else:
-            return pd.DataFrame(columns=['fecha', 'capital_cop', 'capital_usd', 'tasa_cop'])
+        version = version_tabla("historial_capital")
+        with _lock_capital:
+            if _cache_capital.get("version") != version:
+                historial = leer_historial_capital()
+                por_dia = _calcular_ultimo_registro_por_dia(historial)
+                _cache_capital.update(
+                    version=version,
+                    historial=historial,
+                    por_dia=por_dia,
+                    series=_construir_series(por_dia)
+                )
+            return _cache_capital["historial"]
     except Exception as e:
         st.error(f"Error cargando historial: {e}")
         return pd.DataFrame(columns=['fecha', 'capital_cop', 'capital_usd', 'tasa_cop'])
 
 def guardar_historial_capital(df):
     """
-    Guarda el historial de capital en un archivo JSON
+    Guarda el historial de capital en el repositorio
     """
     try:
-        # Convertir timestamps a string para JSON
-        df_to_save = df.copy()
-        df_to_save['fecha'] = df_to_save['fecha'].dt.strftime('%Y-%m-%d %H:%M:%S')
-        
-        with open('historial_capital.json', 'w') as f:
-            json.dump(df_to_save.to_dict('records'), f, indent=2)
+        reemplazar_historial_capital(df)
         return True
     except Exception as e:
         st.error(f"Error guardando historial: {e}")
@@ -45,124 +65,118 @@ def guardar_historial_capital(df):
 def agregar_registro_capital(capital_cop, capital_usd, tasa_cop):
     """
     Agrega un nuevo registro al historial de capital
-    SOLO mantiene el último registro del día
+    SOLO mantiene el último registro del día (upsert por día en el repositorio)
     """
-    df_historial = cargar_historial_capital()
-    
-    # Obtener la fecha de hoy (sin hora)
-    hoy = datetime.now().date()
-    
-    if not df_historial.empty:
-        # Eliminar TODOS los registros del día de hoy
-        df_historial = df_historial[df_historial['fecha'].dt.date != hoy]
-    
-    # Agregar NUEVO registro (solo uno por día)
-    nuevo_registro = pd.DataFrame({
-        'fecha': [datetime.now()],
-        'capital_cop': [capital_cop],
-        'capital_usd': [capital_usd],
-        'tasa_cop': [tasa_cop]
-    })
-    
-    df_historial = pd.concat([df_historial, nuevo_registro], ignore_index=True)
-    
-    # Ordenar por fecha
-    df_historial = df_historial.sort_values('fecha')
-    
-    # Guardar en archivo
-    if guardar_historial_capital(df_historial):
-        return df_historial
-    else:
+    ahora = datetime.now()
+    try:
+        version = registrar_capital_del_dia(ahora, capital_cop, capital_usd, tasa_cop)
+    except Exception as e:
+        st.error(f"Error guardando historial: {e}")
         return None
 
-def obtener_ultimo_registro_por_dia(df_historial):
+    with _lock_capital:
+        if _cache_capital.get("version") == version - 1:
+            # La vista en memoria estaba al día: se reemplaza solo el registro de hoy
+            nuevo_registro = pd.DataFrame({
+                'fecha': [pd.Timestamp(ahora.replace(microsecond=0))],
+                'capital_cop': [float(capital_cop)],
+                'capital_usd': [float(capital_usd)],
+                'tasa_cop': [float(tasa_cop)]
+            })
+            hoy = pd.Timestamp(ahora).normalize()
+            historial = _cache_capital["historial"]
+            por_dia = _cache_capital["por_dia"]
+            historial = pd.concat([historial[historial['fecha'].dt.normalize() != hoy], nuevo_registro], ignore_index=True)
+            if por_dia is not None and not por_dia.empty:
+                por_dia = por_dia[por_dia['fecha'].dt.normalize() != hoy]
+            registro_valido = _calcular_ultimo_registro_por_dia(nuevo_registro)
+            por_dia = pd.concat([por_dia, registro_valido], ignore_index=True)
+
+            # Las series se actualizan en el lugar (solo el último día/semana/mes); si el registro
+            # no es válido o no es el más reciente, se reconstruyen desde la vista por día
+            series = _cache_capital["series"]
+            for frecuencia in FRECUENCIAS:
+                if registro_valido.empty or not actualizar_serie(series[frecuencia], nuevo_registro['fecha'].iloc[0], nuevo_registro.iloc[0]):
+                    series = _construir_series(por_dia)
+                    break
+            _cache_capital.update(version=version, historial=historial, por_dia=por_dia, series=series)
+        else:
+            _cache_capital.clear()
+
+    return cargar_historial_capital()
+
+def _calcular_ultimo_registro_por_dia(df_historial):
     """
-    Retorna el DataFrame con solo el último registro VÁLIDO de cada día
-    Elimina días con valores nulos, cero o inválidos
+    Último registro válido de cada día (sin nulos ni ceros), ordenado por fecha.
     """
     if df_historial is None or df_historial.empty:
         return df_historial
     
-    # Crear copia y limpiar datos
-    df = df_historial.copy()
-    
     # Eliminar registros con valores nulos o inválidos
-    df = df.dropna(subset=['capital_usd', 'capital_cop'])
+    df = df_historial.dropna(subset=['capital_usd', 'capital_cop'])
     df = df[(df['capital_usd'] > 0) & (df['capital_cop'] > 0)]
     
     if df.empty:
         return df
     
-    # Crear columna de fecha sin hora
-    df['fecha_dia'] = df['fecha'].dt.date
-    
-    # Obtener el último registro válido de cada día
-    ultimo_por_dia = df.sort_values('fecha').groupby('fecha_dia').last().reset_index()
-    ultimo_por_dia = ultimo_por_dia.drop('fecha_dia', axis=1)
+    # Último registro válido de cada día: se ordena por fecha y se conserva el último de cada día
+    df = df.sort_values('fecha', kind='stable')
+    dias = df['fecha'].dt.normalize()
+    ultimo_por_dia = df[~dias.duplicated(keep='last')]
     
-    # Ordenar por fecha final
-    ultimo_por_dia = ultimo_por_dia.sort_values('fecha')
-    
-    return ultimo_por_dia
+    return ultimo_por_dia.reset_index(drop=True)
+
+def _construir_series(por_dia):
+    """Serie diaria, semanal y mensual del historial (ver serie_capital.py)."""
+    return {frecuencia: construir_serie(por_dia, frecuencia) for frecuencia in FRECUENCIAS}
+
+def consultar_periodo_capital(df_historial, periodo="Todos", frecuencia="diaria", columna='capital_usd'):
+    """
+    Registros del período (últimos N días de PERIODOS_CAPITAL, o "Todos") en la frecuencia indicada
+    y las estadísticas de `columna` en ese período. Devuelve (DataFrame, estadisticas); las
+    estadísticas son None si el período no tiene registros.
+    Con el historial en caché se usan las series precalculadas: el período se ubica con búsqueda
+    binaria y mínimo, máximo, promedio y cambio no recorren los datos.
+    """
+    desde = datetime.now() - timedelta(days=PERIODOS_CAPITAL[periodo]) if periodo in PERIODOS_CAPITAL else None
+    with _lock_capital:
+        if df_historial is not None and df_historial is _cache_capital.get("historial"):
+            serie = _cache_capital["series"][frecuencia]
+        else:
+            serie = construir_serie(_calcular_ultimo_registro_por_dia(df_historial), frecuencia)
+        i, j = rango_fechas(serie, desde)
+        return serie_a_dataframe(serie, i, j), estadisticas_rango(serie, columna, i, j)
+
+def obtener_ultimo_registro_por_dia(df_historial):
+    """
+    Retorna el DataFrame con solo el último registro VÁLIDO de cada día
+    Elimina días con valores nulos, cero o inválidos
+    Si recibe el historial en caché, devuelve la vista por día ya calculada.
+    """
+    if df_historial is not None and df_historial is _cache_capital.get("historial"):
+        return _cache_capital["por_dia"]
+    return _calcular_ultimo_registro_por_dia(df_historial)
 
-def crear_grafico_capital_usd(df_historial, periodo="Todos"):
+def crear_grafico_capital_usd(df_historial, periodo="Todos", frecuencia="diaria"):
     """
     Crea un gráfico moderno y mejorado del capital en USD
     """
     if df_historial is None or df_historial.empty:
         return None
     
-    # Obtener solo el último registro válido de cada día
-    df_completo = obtener_ultimo_registro_por_dia(df_historial)
-    
-    # Eliminar registros con valores nulos o cero
-    df_completo = df_completo.dropna(subset=['capital_usd'])
-    df_completo = df_completo[df_completo['capital_usd'] > 0]
-    
-    # Filtrar datos según el período seleccionado
-    ahora = datetime.now()
+    # Registros del período (último válido de cada día/semana/mes) y sus métricas de rendimiento,
+    # tomados de la serie precalculada: no se reordena ni se filtra el historial completo
+    df_filtrado, estadisticas = consultar_periodo_capital(df_historial, periodo, frecuencia)
     
-    periodos = {
-        "7 días": 7,
-        "30 días": 30,
-        "90 días": 90,
-        "1 año": 365
-    }
-    
-    # IMPORTANTE: Aplicar filtro de período ANTES de calcular métricas
-    if periodo in periodos:
-        fecha_limite = ahora - timedelta(days=periodos[periodo])
-        df_filtrado = df_completo[df_completo['fecha'] >= fecha_limite].copy()
-    else:
-        df_filtrado = df_completo.copy()
-    
-    if df_filtrado.empty or len(df_filtrado) < 1:
+    if estadisticas is None:
         return None
     
-    # Ordenar por fecha para asegurar continuidad
-    df_filtrado = df_filtrado.sort_values('fecha').reset_index(drop=True)
-    
-    # Cálculo de métricas de rendimiento SOLO con datos del período filtrado
-    if len(df_filtrado) > 1:
-        valor_inicial = float(df_filtrado['capital_usd'].iloc[0])
-        valor_final = float(df_filtrado['capital_usd'].iloc[-1])
-        cambio_absoluto = valor_final - valor_inicial
-        
-        if valor_inicial != 0:
-            cambio_porcentual = (cambio_absoluto / valor_inicial) * 100
-        else:
-            cambio_porcentual = 0
-            
-        valor_max = float(df_filtrado['capital_usd'].max())
-        valor_min = float(df_filtrado['capital_usd'].min())
-        
-    else:
-        valor_inicial = float(df_filtrado['capital_usd'].iloc[0])
-        valor_final = valor_inicial
-        cambio_porcentual = 0.0
-        cambio_absoluto = 0.0
-        valor_max = valor_inicial
-        valor_min = valor_inicial
+    valor_inicial = estadisticas['inicio']
+    valor_final = estadisticas['fin']
+    cambio_absoluto = estadisticas['cambio']
+    cambio_porcentual = estadisticas['cambio_pct']
+    valor_max = estadisticas['maximo']
+    valor_min = estadisticas['minimo']
     
     # Calcular rango dinámico para mejor visualización de caídas
     rango_datos = valor_max - valor_min
@@ -353,7 +367,7 @@ def crear_grafico_capital_usd(df_historial, periodo="Todos"):
         if variacion_relativa > 0.02:  # Solo si hay más de 2% de variación
             # Punto mínimo con indicador más visible
             if len(df_filtrado) > 1:
-                fecha_min = df_filtrado[df_filtrado['capital_usd'] == valor_min]['fecha'].iloc[0]
+                fecha_min = estadisticas['fecha_minimo']
                 
                 # Marcador grande en el punto mínimo
                 fig.add_trace(go.Scatter(
@@ -391,7 +405,7 @@ def crear_grafico_capital_usd(df_historial, periodo="Todos"):
             
             # Punto máximo (solo si no es el valor final ni inicial)
             if valor_max != valor_final and valor_max != valor_inicial:
-                fecha_max = df_filtrado[df_filtrado['capital_usd'] == valor_max]['fecha'].iloc[0]
+                fecha_max = estadisticas['fecha_maximo']
                 
                 # Marcador en el punto máximo
                 fig.add_trace(go.Scatter(
@@ -428,25 +442,22 @@ def crear_grafico_capital_usd(df_historial, periodo="Todos"):
     
     return fig
 
-def obtener_tasa_cambio():
+def obtener_tasa_cambio(forzar=False):
     """
-    Retorna las tasas de cambio USD-COP y USD-EUR usando una API pública.
+    Retorna las tasas de cambio USD-COP y USD-EUR, la fecha de la consulta y su antigüedad en segundos.
+    Lee el último valor que dejó el actualizador en segundo plano (actualizador_tasas.py) sin esperar
+    a la red; solo consulta la fuente de forma sincrónica si aún no hay ningún valor o si forzar=True.
     """
-    try:
-        url = "https://api.exchangerate-api.com/v4/latest/USD"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            tasa_cop = data['rates'].get('COP')
-            tasa_eur = data['rates'].get('EUR')
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return tasa_cop, tasa_eur, timestamp
+    resultado = ultimas_tasas()
+    if forzar or not resultado['tasas']:
+        resultado = obtener_tasas(forzar=forzar)
+    if resultado['error']:
+        if resultado['tasas']:
+            st.warning(f"No se pudieron actualizar las tasas ({resultado['error']}). Se usan las últimas conocidas.")
         else:
-            st.error(f"Error al obtener tasas de cambio: Código {response.status_code}")
-            return None, None, None
-    except Exception as e:
-        st.error(f"Error de conexión: {e}")
-        return None, None, None
+            st.error(f"Error de conexión: {resultado['error']}")
+    tasas = resultado['tasas']
+    return tasas.get('COP'), tasas.get('EUR'), resultado['timestamp'], resultado['antiguedad_segundos']
 
 def formatear_moneda(valor, simbolo="$"):
     """Formatea un número como moneda con separadores de miles."""
@@ -620,7 +631,7 @@ def mostrar_evolucion_capital(tasa_cop):
             st.markdown("### 📅 Seleccionar Período de Análisis")
         
         with col2:
-            periodo_opciones = ["Todos", "7 días", "30 días", "90 días", "1 año"]
+            periodo_opciones = ["Todos", *PERIODOS_CAPITAL]
             periodo_seleccionado = st.selectbox(
                 "Período:", 
                 periodo_opciones, 
@@ -628,31 +639,25 @@ def mostrar_evolucion_capital(tasa_cop):
                 key="periodo_select",
                 label_visibility="collapsed"
             )
+            agrupacion = st.selectbox(
+                "Agrupar por:",
+                list(AGRUPACIONES_CAPITAL),
+                index=0,
+                key="agrupacion_capital_select"
+            )
+        frecuencia = AGRUPACIONES_CAPITAL[agrupacion]
         
-        # Calcular estadísticas según el período seleccionado
-        df_periodo = obtener_ultimo_registro_por_dia(df_historial)
-        
-        # Filtrar por período ANTES de calcular métricas
-        periodos = {
-            "7 días": 7,
-            "30 días": 30,
-            "90 días": 90,
-            "1 año": 365
-        }
-        
-        if periodo_seleccionado in periodos:
-            ahora = datetime.now()
-            fecha_limite = ahora - timedelta(days=periodos[periodo_seleccionado])
-            df_periodo = df_periodo[df_periodo['fecha'] >= fecha_limite]
+        # Registros y estadísticas del período seleccionado (serie precalculada, sin reagrupar el historial)
+        _, estadisticas = consultar_periodo_capital(df_historial, periodo_seleccionado, frecuencia)
         
-        if not df_periodo.empty and len(df_periodo) > 1:
-            capital_actual = df_periodo['capital_usd'].iloc[-1]
-            capital_inicial = df_periodo['capital_usd'].iloc[0]
-            cambio_total = capital_actual - capital_inicial
+        if estadisticas is not None and estadisticas['registros'] > 1:
+            capital_actual = estadisticas['fin']
+            capital_inicial = estadisticas['inicio']
+            cambio_total = estadisticas['cambio']
             cambio_pct = (cambio_total / capital_inicial * 100) if capital_inicial > 0 else 0
-            dias_registrados = (df_periodo['fecha'].iloc[-1] - df_periodo['fecha'].iloc[0]).days
-            max_capital = df_periodo['capital_usd'].max()
-            min_capital = df_periodo['capital_usd'].min()
+            dias_registrados = estadisticas['dias']
+            max_capital = estadisticas['maximo']
+            min_capital = estadisticas['minimo']
             
             # Tarjetas de métricas clave del período seleccionado
             st.markdown(f"### 📊 Resumen del Período: **{periodo_seleccionado}**")
@@ -671,7 +676,7 @@ def mostrar_evolucion_capital(tasa_cop):
                 st.metric(
                     label="📅 Días en Período",
                     value=f"{dias_registrados}",
-                    delta=f"{len(df_periodo)} registros"
+                    delta=f"{estadisticas['registros']} registros"
                 )
             
             with col3:
@@ -697,7 +702,7 @@ def mostrar_evolucion_capital(tasa_cop):
             st.markdown("<br>", unsafe_allow_html=True)
         
         # Crear y mostrar gráfico
-        fig = crear_grafico_capital_usd(df_historial, periodo_seleccionado)
+        fig = crear_grafico_capital_usd(df_historial, periodo_seleccionado, frecuencia)
         if fig:
             # Contenedor con borde elegante para el gráfico
             st.markdown("""
@@ -715,15 +720,15 @@ def mostrar_evolucion_capital(tasa_cop):
             st.plotly_chart(fig, use_container_width=True)
             
             # Estadísticas adicionales del período seleccionado
-            if not df_periodo.empty and len(df_periodo) > 1:
+            if estadisticas is not None and estadisticas['registros'] > 1:
                 st.markdown("---")
                 st.markdown(f"### 📈 Análisis Detallado: {periodo_seleccionado}")
                 
                 col1, col2, col3, col4, col5 = st.columns(5)
                 
-                inicio_periodo = df_periodo['capital_usd'].iloc[0]
-                fin_periodo = df_periodo['capital_usd'].iloc[-1]
-                cambio_periodo = fin_periodo - inicio_periodo
+                inicio_periodo = estadisticas['inicio']
+                fin_periodo = estadisticas['fin']
+                cambio_periodo = estadisticas['cambio']
                 cambio_pct_periodo = (cambio_periodo / inicio_periodo * 100) if inicio_periodo > 0 else 0
                 
                 with col1:
@@ -759,7 +764,7 @@ def mostrar_evolucion_capital(tasa_cop):
                 
                 with col5:
                     # Calcular promedio del período
-                    promedio = df_periodo['capital_usd'].mean()
+                    promedio = estadisticas['promedio']
                     st.metric(
                         "Promedio",
                         f"${promedio:,.0f}"
@@ -815,36 +820,17 @@ def mostrar_evolucion_capital(tasa_cop):
         """, unsafe_allow_html=True)
 
 def mostrar_divisas():
-    st.set_page_config(
-        page_title="Consulta de Divisas - Histórico Capital",
-        page_icon="💱",
-        layout="wide"
-    )
-    
     st.title("💱 Consulta de Divisas y Evolución del Capital")
     
-    # Cache para evitar llamadas excesivas a la API
-    if 'last_api_call' not in st.session_state:
-        st.session_state.last_api_call = 0
-    if 'cached_rates' not in st.session_state:
-        st.session_state.cached_rates = (None, None, None)
-    
-    # Llamar a la API solo si han pasado más de 60 segundos
-    current_time = time.time()
-    if current_time - st.session_state.last_api_call > 60:
-        api_tasa_cop, api_tasa_eur, timestamp = obtener_tasa_cambio()
-        st.session_state.cached_rates = (api_tasa_cop, api_tasa_eur, timestamp)
-        st.session_state.last_api_call = current_time
-    else:
-        api_tasa_cop, api_tasa_eur, timestamp = st.session_state.cached_rates
+    # Las tasas las mantiene al día un hilo en segundo plano; aquí solo se lee el último valor
+    iniciar_actualizador()
+    api_tasa_cop, api_tasa_eur, timestamp, antiguedad = obtener_tasa_cambio()
 
     # Botón para refrescar tasas
     col1, col2 = st.columns([1, 4])
     with col1:
         if st.button("🔄 Actualizar Tasas", use_container_width=True):
-            api_tasa_cop, api_tasa_eur, timestamp = obtener_tasa_cambio()
-            st.session_state.cached_rates = (api_tasa_cop, api_tasa_eur, timestamp)
-            st.session_state.last_api_call = current_time
+            obtener_tasa_cambio(forzar=True)
             st.rerun()
 
     tasa_actual_cop = api_tasa_cop
@@ -852,7 +838,9 @@ def mostrar_divisas():
 
     # Mostrar información de las tasas de la API
     if timestamp:
-        st.info(f"📅 Tasas actualizadas: {timestamp}")
+        minutos = int(antiguedad // 60)
+        hace = "hace menos de 1 min" if minutos < 1 else f"hace {minutos} min"
+        st.info(f"📅 Tasas actualizadas: {timestamp} ({hace})")
 
     # Sección de tasas manuales - CORREGIDO
     with st.expander("⚙️ Configuración Manual de Tasas", expanded=False):
@@ -906,14 +894,12 @@ def mostrar_divisas():
         
         try:
             if 'df' in st.session_state and st.session_state.df is not None and not st.session_state.df.empty:
-                df = st.session_state.df.copy()
+                # Portafolio canónico: 'Dinero' ya es numérico; las filas en USD/EUR se llevan a COP
+                # con las mismas tasas (base USD) que muestra esta página, incluidas las manuales
+                df = valorar_portafolio(st.session_state.df, MONEDA_BASE,
+                                        {"COP": tasa_actual_cop, "EUR": tasa_actual_eur})
                 
-                # Limpiar y convertir la columna de dinero
                 if 'Dinero' in df.columns:
-                    df['Dinero'] = df['Dinero'].astype(str).str.replace(r'[\$,]', '', regex=True)
-                    df['Dinero'] = pd.to_numeric(df['Dinero'], errors='coerce')
-                    df = df.dropna(subset=['Dinero'])
-                    
                     capital_total_cop = df['Dinero'].sum()
                     capital_total_usd = capital_total_cop / tasa_actual_cop
                     capital_total_eur = capital_total_usd * tasa_actual_eur if validar_tasa(tasa_actual_eur, "EUR") else 0
@@ -972,5 +958,11 @@ def mostrar_divisas():
         st.error("❌ No hay tasas de cambio válidas disponibles.")
 
 # Para ejecutar la aplicación
+# (la configuración de página solo aplica al ejecutar este módulo por separado)
 if __name__ == "__main__":
+    st.set_page_config(
+        page_title="Consulta de Divisas - Histórico Capital",
+        page_icon="💱",
+        layout="wide"
+    )
     mostrar_divisas()
\ No newline at end of file
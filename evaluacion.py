@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
-import os
+import io
 import math
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 
+from utils import limpiar_moneda, limpiar_porcentaje
+from valoracion import portafolio_en_pesos
+from amortizacion import resumen_amortizacion, tabla_amortizacion
+from historial_prestamos import COLUMNAS_HISTORIAL, anexar_evaluaciones, buscar_evaluaciones, cargar_historial
+
 # --- Funciones Auxiliares Generales ---
 
 def formato_pesos(valor):
@@ -36,18 +42,8 @@ def clean_df_for_analysis(df):
     
     for col in cols_to_clean:
         if col in df_cleaned.columns:
-            # Primero, elimina símbolos de moneda, espacios y espacios no separadores
-            cleaned_series = df_cleaned[col].astype(str) \
-                                          .str.replace('$', '', regex=False) \
-                                          .str.replace(' ', '', regex=False) \
-                                          .str.replace('\xa0', '', regex=False) # Elimina el espacio no separador
-            
-            # Ahora, maneja los separadores de miles y decimales según el formato de entrada (coma para miles, punto para decimales)
-            # Elimina los separadores de miles (comas)
-            cleaned_series = cleaned_series.str.replace(',', '', regex=False)
-            # El punto ya es el separador decimal, no es necesario reemplazarlo.
-            
-            df_cleaned[col] = pd.to_numeric(cleaned_series, errors='coerce').fillna(0.0) # Convierte a numérico, rellena NaNs con 0
+            # Parser común (formato estadounidense y colombiano); NaNs se rellenan con 0
+            df_cleaned[col] = limpiar_moneda(df_cleaned[col]).fillna(0.0)
             
     return df_cleaned
 
@@ -109,25 +105,7 @@ def calcular_cuota_capital_fijo(monto, tasa_mensual_porcentaje, plazo_meses):
     """
     if plazo_meses <= 0:
         return None
-    
-    cuotas = []
-    saldo_pendiente = monto
-    capital_fijo_mensual = monto / plazo_meses
-    
-    for mes in range(1, int(plazo_meses) + 1):
-        interes_mensual = saldo_pendiente * (tasa_mensual_porcentaje / 100)
-        cuota_total = capital_fijo_mensual + interes_mensual
-        saldo_pendiente -= capital_fijo_mensual
-        
-        cuotas.append({
-            'mes': mes,
-            'cuota': cuota_total,
-            'interes': interes_mensual,
-            'capital': capital_fijo_mensual,
-            'saldo': max(0, saldo_pendiente)
-        })
-    
-    return cuotas
+    return tabla_amortizacion(monto, tasa_mensual_porcentaje, plazo_meses, "capital_fijo").to_dict('records')
 
 def calcular_cuota_capital_al_final(monto, tasa_mensual_porcentaje, plazo_meses):
     """
@@ -136,66 +114,132 @@ def calcular_cuota_capital_al_final(monto, tasa_mensual_porcentaje, plazo_meses)
     """
     if plazo_meses <= 0:
         return None
-    
-    cuotas = []
-    interes_mensual = monto * (tasa_mensual_porcentaje / 100)
-    
-    # Cuotas 1 a n-1: solo intereses
-    for mes in range(1, int(plazo_meses)):
-        cuotas.append({
-            'mes': mes,
-            'cuota': interes_mensual,
-            'interes': interes_mensual,
-            'capital': 0,
-            'saldo': monto
-        })
-    
-    # Última cuota: interés + capital total
-    cuota_final = interes_mensual + monto
-    cuotas.append({
-        'mes': int(plazo_meses),
-        'cuota': cuota_final,
-        'interes': interes_mensual,
-        'capital': monto,
-        'saldo': 0
-    })
-    
-    return cuotas
+    return tabla_amortizacion(monto, tasa_mensual_porcentaje, plazo_meses, "capital_al_final").to_dict('records')
+
+RIESGOS_ACTIVIDAD = {
+    "Empleado": "Bajo",
+    "Independiente": "Medio",
+    "Informal": "Alto",
+    "Desempleado": "Crítico",
+    "Otro": "Desconocido"
+}
 
 def riesgo_por_actividad(actividad):
     """
     Asigna un nivel de riesgo a una actividad económica.
     """
-    riesgos = {
-        "Empleado": "Bajo",
-        "Independiente": "Medio",
-        "Informal": "Alto",
-        "Desempleado": "Crítico",
-        "Otro": "Desconocido"
-    }
-    return riesgos.get(actividad, "Desconocido")
+    return RIESGOS_ACTIVIDAD.get(actividad, "Desconocido")
+
+# Rangos de endeudamiento: (límite superior en %, evaluación, recomendación)
+RANGOS_ENDEUDAMIENTO = [
+    (20, "**Aprobado**", "Salud financiera óptima."),
+    (40, "**Aprobado con precaución**", "Riesgo moderado de sobreendeudamiento. Considera tus límites."),
+    (60, "**Riesgo alto**", "Podrías enfrentar dificultades para cumplir con los pagos. Reevalúa."),
+    (math.inf, "**Riesgo crítico**", "Tu capacidad de pago está muy comprometida. No se recomienda otorgar el préstamo."),
+]
+MENSAJE_SIN_INGRESOS = "No se puede evaluar sin ingresos."
+
+def clasificar_endeudamiento(ingresos_totales, total_cuotas):
+    """
+    Clasifica una solicitud según el porcentaje del ingreso destinado a cuotas.
+    """
+    if ingresos_totales <= 0:
+        return MENSAJE_SIN_INGRESOS
+
+    porcentaje = (total_cuotas / ingresos_totales) * 100
+    for limite, evaluacion, recomendacion in RANGOS_ENDEUDAMIENTO:
+        if porcentaje <= limite:
+            return f"{evaluacion} ({porcentaje:.2f}%): {recomendacion}"
+
+# --- Evaluación por lote (CSV de solicitantes) ---
+
+FILAS_POR_BLOQUE_LOTE = 5000
+# Columnas que debe traer el CSV de solicitantes
+COLUMNAS_LOTE = ["Nombre", "Ingresos", "Deudas Actuales", "Monto Prestamo", "Tasa (%)", "Plazo (meses)", "Actividad"]
+# Solo los montos pasan por limpiar_moneda: "1.125" en "Tasa (%)" es 1,125 % y no 1125 %
+COLUMNAS_MONETARIAS_LOTE = ["Ingresos", "Deudas Actuales", "Monto Prestamo"]
+
+def evaluar_solicitudes_lote(df_solicitudes):
+    """
+    Evalúa todas las solicitudes de un DataFrame en una sola pasada vectorizada,
+    con las mismas reglas que la evaluación individual: cuota francesa, % de
+    endeudamiento (RANGOS_ENDEUDAMIENTO) y riesgo por actividad.
+    Devuelve un DataFrame con las columnas del historial (sin 'Fecha', que se asigna al guardar).
+    """
+    df = df_solicitudes.copy()
+    for col in COLUMNAS_MONETARIAS_LOTE:
+        df[col] = limpiar_moneda(df[col]).fillna(0.0)
+    df["Tasa (%)"] = limpiar_porcentaje(df["Tasa (%)"]).fillna(0.0)
+    df["Plazo (meses)"] = pd.to_numeric(df["Plazo (meses)"].astype(str).str.strip(), errors='coerce').fillna(0.0)
+
+    ingresos = df["Ingresos"].to_numpy(dtype=float)
+    monto = df["Monto Prestamo"].to_numpy(dtype=float)
+    plazo = df["Plazo (meses)"].to_numpy(dtype=float)
+    datos_validos = (monto > 0) & (plazo > 0)
+
+    cuota = resumen_amortizacion(monto, df["Tasa (%)"].to_numpy(dtype=float), plazo, "francesa")['cuota_regular']
+    total_cuotas = df["Deudas Actuales"].to_numpy(dtype=float) + np.nan_to_num(cuota)
+    con_ingresos = ingresos > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        porcentaje = np.where(con_ingresos, total_cuotas / ingresos * 100, 0.0)
+
+    # Texto del resultado: se elige el rango con np.select y se arma la cadena por columnas
+    condiciones = [porcentaje <= limite for limite, _, _ in RANGOS_ENDEUDAMIENTO]
+    evaluaciones = np.select(condiciones, [evaluacion for _, evaluacion, _ in RANGOS_ENDEUDAMIENTO], default="")
+    recomendaciones = np.select(condiciones, [recomendacion for _, _, recomendacion in RANGOS_ENDEUDAMIENTO], default="")
+    porcentaje_texto = pd.Series(porcentaje).map("{:.2f}".format)
+    resultado = pd.Series(evaluaciones) + " (" + porcentaje_texto + "%): " + pd.Series(recomendaciones)
+    resultado = np.where(con_ingresos, resultado.to_numpy(dtype=object), MENSAJE_SIN_INGRESOS)
+    resultado = np.where(datos_validos, resultado, "Datos inválidos: el monto y el plazo deben ser mayores a 0.")
+
+    return pd.DataFrame({
+        "Nombre": df["Nombre"].fillna("").astype(str).str.strip().to_numpy(),
+        "Ingresos": ingresos,
+        "Deudas Actuales": df["Deudas Actuales"].to_numpy(dtype=float),
+        "Monto Prestamo": monto,
+        "Tasa (%)": df["Tasa (%)"].to_numpy(dtype=float),
+        "Plazo (meses)": plazo,
+        "Cuota Estimada": np.where(datos_validos, cuota, np.nan),
+        "% Endeudamiento": np.where(datos_validos, porcentaje, np.nan),
+        "Resultado": resultado,
+        "Riesgo Actividad": df["Actividad"].map(RIESGOS_ACTIVIDAD).fillna("Desconocido").to_numpy(),
+    })
+
+def leer_solicitudes_csv(contenido, filas_por_bloque=FILAS_POR_BLOQUE_LOTE):
+    """
+    Lee y evalúa un CSV de solicitantes por bloques, mostrando el progreso.
+    Lanza ValueError si faltan columnas obligatorias.
+    """
+    total_filas = max(contenido.count(b"\n") - 1, 1)
+    barra = st.progress(0.0, text="Evaluando solicitudes...")
+    bloques = []
+    leidas = 0
+    for bloque in pd.read_csv(io.BytesIO(contenido), chunksize=filas_por_bloque, dtype=str):
+        bloque.columns = [str(col).strip() for col in bloque.columns]
+        faltantes = [col for col in COLUMNAS_LOTE if col not in bloque.columns]
+        if faltantes:
+            barra.empty()
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltantes)}")
+        bloques.append(evaluar_solicitudes_lote(bloque[COLUMNAS_LOTE]))
+        leidas += len(bloque)
+        barra.progress(min(leidas / total_filas, 1.0), text=f"Evaluando solicitudes... {leidas:,} filas")
+    barra.progress(1.0, text=f"Solicitudes evaluadas: {leidas:,}")
+
+    if not bloques:
+        return pd.DataFrame(columns=COLUMNAS_HISTORIAL)
+    return pd.concat(bloques, ignore_index=True)
 
 def guardar_evaluacion(datos):
     """
-    Guarda una evaluación de préstamo en un archivo CSV.
+    Guarda una evaluación de préstamo en el historial (anexándola al CSV).
     """
-    archivo = "historial_prestamos.csv"
-    if os.path.exists(archivo):
-        df_existente = pd.read_csv(archivo)
-        df = pd.concat([df_existente, pd.DataFrame([datos])], ignore_index=True)
-    else:
-        df = pd.DataFrame([datos])
-    df.to_csv(archivo, index=False)
+    anexar_evaluaciones(pd.DataFrame([datos]))
 
 def cargar_evaluaciones_guardadas():
     """
-    Carga el historial de evaluaciones de préstamos desde un archivo CSV.
+    Carga el historial de evaluaciones de préstamos (en caché mientras el archivo no cambie).
     """
-    archivo = "historial_prestamos.csv"
-    if os.path.exists(archivo):
-        return pd.read_csv(archivo)
-    else:
-        return pd.DataFrame()
+    return cargar_historial()
 
 # --- Función para la Evaluación General de Préstamos ---
 def mostrar_evaluacion_general():
@@ -217,21 +261,6 @@ def mostrar_evaluacion_general():
     st.markdown("---")
 
     # --- Lógica de Evaluación ---
-    def clasificar_endeudamiento(ingresos_totales, total_cuotas):
-        if ingresos_totales <= 0:
-            return "No se puede evaluar sin ingresos."
-
-        porcentaje = (total_cuotas / ingresos_totales) * 100
-
-        if porcentaje <= 20:
-            return f"**Aprobado** ({porcentaje:.2f}%): Salud financiera óptima."
-        elif porcentaje <= 40:
-            return f"**Aprobado con precaución** ({porcentaje:.2f}%): Riesgo moderado de sobreendeudamiento. Considera tus límites."
-        elif porcentaje <= 60:
-            return f"**Riesgo alto** ({porcentaje:.2f}%): Podrías enfrentar dificultades para cumplir con los pagos. Reevalúa."
-        else:
-            return f"**Riesgo crítico** ({porcentaje:.2f}%): Tu capacidad de pago está muy comprometida. No se recomienda otorgar el préstamo."
-
     if st.button("🔍 Evaluar Solicitud de Préstamo", key="evaluar_btn_gen"):
         if monto_prestamo <= 0 or plazo <= 0:
             st.error("Por favor, ingresa un monto de préstamo y un plazo válidos (> 0).")
@@ -306,6 +335,18 @@ def mostrar_evaluacion_general():
         if df_historial.empty:
             st.info("No hay evaluaciones registradas aún. ¡Realiza una para empezar!")
         else:
+            col_filtro1, col_filtro2 = st.columns(2)
+            with col_filtro1:
+                nombre_filtro = st.text_input("Filtrar por nombre", key="filtro_nombre_historial")
+            with col_filtro2:
+                rango_fechas = st.date_input("Filtrar por fecha", value=(), key="filtro_fecha_historial")
+
+            desde = rango_fechas[0] if len(rango_fechas) > 0 else None
+            hasta = rango_fechas[1] if len(rango_fechas) > 1 else desde
+            if nombre_filtro or desde is not None:
+                df_historial = buscar_evaluaciones(nombre=nombre_filtro, desde=desde, hasta=hasta)
+            st.caption(f"{len(df_historial):,} evaluaciones")
+
             df_display = df_historial.copy() 
 
             columnas_moneda = ["Ingresos", "Deudas Actuales", "Monto Prestamo", "Cuota Estimada"]
@@ -320,7 +361,72 @@ def mostrar_evaluacion_general():
             
             st.dataframe(df_display)
 
+# --- Función para la Evaluación por Lote de Préstamos ---
+def mostrar_evaluacion_lote():
+    st.header("📑 Evaluación de Préstamos por Lote")
+    st.markdown(f"""
+    Sube un CSV con una fila por solicitante y las columnas:
+    `{"`, `".join(COLUMNAS_LOTE)}`.
+    Todas las solicitudes se evalúan con las mismas reglas de la evaluación general
+    (cuota francesa, % de endeudamiento y riesgo por actividad).
+    """)
+
+    archivo = st.file_uploader("Sube el CSV de solicitantes", type=["csv"], key="csv_lote_prestamos")
+    if archivo is not None and st.button("🔍 Evaluar Solicitudes", key="evaluar_lote_btn"):
+        try:
+            st.session_state.resultados_lote = leer_solicitudes_csv(archivo.getvalue())
+        except ValueError as e:
+            st.error(str(e))
+            st.session_state.resultados_lote = None
+        except Exception as e:
+            st.error(f"Error al leer el CSV: {e}")
+            st.session_state.resultados_lote = None
+
+    resultados = st.session_state.get("resultados_lote")
+    if resultados is None:
+        return
+    if resultados.empty:
+        st.info("El CSV no contiene solicitudes.")
+        return
+
+    st.subheader("✅ Resultados del Lote")
+    evaluaciones = resultados["Resultado"].str.extract(r"^\*\*(.+?)\*\*", expand=False).fillna("Sin evaluar")
+    conteo = evaluaciones.value_counts()
+    columnas_metricas = st.columns(max(len(conteo), 1))
+    for col, (evaluacion, cantidad) in zip(columnas_metricas, conteo.items()):
+        col.metric(evaluacion, f"{cantidad:,}")
+
+    df_display = resultados.copy()
+    for col in ["Ingresos", "Deudas Actuales", "Monto Prestamo", "Cuota Estimada"]:
+        df_display[col] = df_display[col].apply(formato_pesos)
+    for col in ["Tasa (%)", "% Endeudamiento"]:
+        df_display[col] = df_display[col].apply(formato_porcentaje)
+    st.dataframe(df_display, use_container_width=True)
+
+    st.download_button(
+        "📥 Descargar resultados (CSV)",
+        resultados.to_csv(index=False).encode("utf-8"),
+        file_name="evaluacion_lote_prestamos.csv",
+        mime="text/csv"
+    )
+
+    con_nombre = resultados["Nombre"] != ""
+    if st.button("💾 Guardar en el historial", key="guardar_lote_btn"):
+        anexar_evaluaciones(resultados[con_nombre])
+        st.success(f"{int(con_nombre.sum()):,} evaluaciones guardadas en el historial.")
+        if not con_nombre.all():
+            st.warning(f"🚨 {int((~con_nombre).sum()):,} solicitudes sin nombre no se guardaron.")
+        st.session_state.resultados_lote = None
+
+# Modalidades del análisis detallado: (modalidad del motor de amortización, cuota que se reporta)
+MODALIDADES_DETALLE = {
+    "Cuota Fija (Interés Simple Total)": ("simple_fijo", 'cuota_regular'),
+    "Cuota Variable (Capital Fijo + Interés s/Saldo)": ("capital_fijo", 'cuota_promedio'),
+    "Capital al Final (Solo Intereses + Capital Final)": ("capital_al_final", 'cuota_regular'),
+}
+
 # --- Función MEJORADA para el Análisis Detallado de Préstamos (INTERÉS SIMPLE) ---
+
 def mostrar_analisis_detalle():
     st.header("🔍 Análisis Detallado de Préstamo - Interés Simple")
     st.markdown("""
@@ -379,86 +485,24 @@ def mostrar_analisis_detalle():
         )
 
     # --- Cálculos de Interés Simple ---
-    if tipo_amortizacion == "Cuota Fija (Interés Simple Total)":
-        # Modalidad 1: Interés simple total calculado al inicio
-        interes_total = monto_prestado * (tasa_interes_mensual_porcentaje / 100) * plazo_meses
-        cuota_mensual = (monto_prestado + interes_total) / plazo_meses
-        
-        # Tabla de amortización con cuota fija
-        tabla_amortizacion = []
-        capital_mensual = monto_prestado / plazo_meses
-        interes_mensual = interes_total / plazo_meses
-        saldo_restante = monto_prestado
-        capital_acumulado = 0
-        
-        for mes in range(1, int(plazo_meses) + 1):
-            saldo_restante = max(0, saldo_restante - capital_mensual)
-            capital_acumulado += capital_mensual
-            porcentaje_capital = (capital_acumulado / monto_prestado) * 100
-            
-            tabla_amortizacion.append({
-                "Mes": mes,
-                "Cuota": round(cuota_mensual, 0),
-                "Interés": round(interes_mensual, 0),
-                "Capital": round(capital_mensual, 0),
-                "Saldo": round(saldo_restante, 0),
-                "Capital Acum.": round(capital_acumulado, 0),
-                "% Capital": round(porcentaje_capital, 1)
-            })
-    
-    elif tipo_amortizacion == "Cuota Variable (Capital Fijo + Interés s/Saldo)":
-        # Modalidad 2: Capital fijo + interés simple sobre saldo pendiente
-        cuotas_detalle = calcular_cuota_capital_fijo(monto_prestado, tasa_interes_mensual_porcentaje, plazo_meses)
-        
-        tabla_amortizacion = []
-        interes_total = 0
-        capital_acumulado = 0
-        
-        for detalle in cuotas_detalle:
-            interes_total += detalle['interes']
-            capital_acumulado += detalle['capital']
-            porcentaje_capital = (capital_acumulado / monto_prestado) * 100
-            
-            tabla_amortizacion.append({
-                "Mes": detalle['mes'],
-                "Cuota": round(detalle['cuota'], 0),
-                "Interés": round(detalle['interes'], 0),
-                "Capital": round(detalle['capital'], 0),
-                "Saldo": round(detalle['saldo'], 0),
-                "Capital Acum.": round(capital_acumulado, 0),
-                "% Capital": round(porcentaje_capital, 1)
-            })
-        
-        # Para esta modalidad, calculamos cuota promedio para métricas
-        cuota_mensual = sum(detalle['cuota'] for detalle in cuotas_detalle) / len(cuotas_detalle)
-    
-    else:  # Capital al Final
-        # Modalidad 3: Solo intereses + capital al final
-        cuotas_detalle = calcular_cuota_capital_al_final(monto_prestado, tasa_interes_mensual_porcentaje, plazo_meses)
-        
-        tabla_amortizacion = []
-        interes_total = 0
-        capital_acumulado = 0
-        
-        for detalle in cuotas_detalle:
-            interes_total += detalle['interes']
-            capital_acumulado += detalle['capital']
-            porcentaje_capital = (capital_acumulado / monto_prestado) * 100
-            
-            tabla_amortizacion.append({
-                "Mes": detalle['mes'],
-                "Cuota": round(detalle['cuota'], 0),
-                "Interés": round(detalle['interes'], 0),
-                "Capital": round(detalle['capital'], 0),
-                "Saldo": round(detalle['saldo'], 0),
-                "Capital Acum.": round(capital_acumulado, 0),
-                "% Capital": round(porcentaje_capital, 1)
-            })
-        
-        # Para esta modalidad, la cuota regular es solo interés
-        cuota_mensual = monto_prestado * (tasa_interes_mensual_porcentaje / 100)
-
-    df_amortizacion = pd.DataFrame(tabla_amortizacion)
+    # Tabla completa en una sola operación vectorizada (motor de amortizacion.py)
+    modalidad, clave_cuota = MODALIDADES_DETALLE[tipo_amortizacion]
+    tabla = tabla_amortizacion(monto_prestado, tasa_interes_mensual_porcentaje, plazo_meses, modalidad)
+    resumen = resumen_amortizacion(monto_prestado, tasa_interes_mensual_porcentaje, plazo_meses, modalidad)
+    interes_total = float(tabla['interes'].sum())
+    # Cuota Fija y Capital al Final muestran la cuota regular; Cuota Variable, la cuota promedio
+    cuota_mensual = float(resumen[clave_cuota])
+
+    capital_acumulado = tabla['capital'].cumsum()
+    df_amortizacion = pd.DataFrame({
+        "Mes": tabla['mes'],
+        "Cuota": tabla['cuota'].round(0),
+        "Interés": tabla['interes'].round(0),
+        "Capital": tabla['capital'].round(0),
+        "Saldo": tabla['saldo'].round(0),
+        "Capital Acum.": capital_acumulado.round(0),
+        "% Capital": (capital_acumulado / monto_prestado * 100).round(1),
+    })
 
     # --- Cálculos Finales (Solo Interés Simple) ---
     total_pagado = monto_prestado + interes_total
@@ -642,43 +686,21 @@ def mostrar_analisis_detalle():
         plazo_max = st.number_input("Plazo máximo (meses)", value=int(plazo_meses + 12), step=6, format="%d")
 
     if st.button("🔄 Ejecutar Simulación", key="simular_escenarios"):
-        # Simulación de tasas
-        tasas_sim = [tasa_min + i * 0.25 for i in range(int((tasa_max - tasa_min) / 0.25) + 1)]
-        plazos_sim = list(range(plazo_min, plazo_max + 6, 6))
-        
-        # Crear tabla de simulación
-        simulaciones = []
-        
-        for tasa in tasas_sim:
-            for plazo in plazos_sim:
-                if tipo_amortizacion == "Cuota Fija (Interés Simple Total)":
-                    interes_sim = monto_prestado * (tasa / 100) * plazo
-                    cuota_sim = (monto_prestado + interes_sim) / plazo
-                elif tipo_amortizacion == "Capital al Final (Solo Intereses + Capital Final)":
-                    # Solo intereses mensuales, capital al final
-                    interes_sim = monto_prestado * (tasa / 100) * plazo
-                    cuota_sim = monto_prestado * (tasa / 100)  # Cuota regular (solo interés)
-                else:
-                    # Capital fijo + interés sobre saldo
-                    cuotas_sim = calcular_cuota_capital_fijo(monto_prestado, tasa, plazo)
-                    if cuotas_sim:
-                        cuota_sim = sum(c['cuota'] for c in cuotas_sim) / len(cuotas_sim)
-                        interes_sim = sum(c['interes'] for c in cuotas_sim)
-                    else:
-                        cuota_sim = 0
-                        interes_sim = 0
-                
-                total_sim = monto_prestado + interes_sim
-                
-                simulaciones.append({
-                    "Tasa (%)": tasa,
-                    "Plazo": plazo,
-                    "Cuota": cuota_sim,
-                    "Total": total_sim,
-                    "Intereses": interes_sim
-                })
-        
-        df_sim = pd.DataFrame(simulaciones)
+        # Grilla tasa × plazo: se evalúa completa con broadcasting (sin doble bucle)
+        tasas_sim = tasa_min + 0.25 * np.arange(int((tasa_max - tasa_min) / 0.25) + 1)
+        plazos_sim = np.arange(plazo_min, plazo_max + 6, 6)
+        tasas_grilla, plazos_grilla = np.meshgrid(tasas_sim, plazos_sim, indexing='ij')
+
+        resumen_sim = resumen_amortizacion(monto_prestado, tasas_grilla, plazos_grilla, modalidad)
+        interes_sim = np.nan_to_num(resumen_sim['interes_total'])
+
+        df_sim = pd.DataFrame({
+            "Tasa (%)": tasas_grilla.ravel(),
+            "Plazo": plazos_grilla.ravel(),
+            "Cuota": np.nan_to_num(resumen_sim[clave_cuota]).ravel(),
+            "Total": (monto_prestado + interes_sim).ravel(),
+            "Intereses": interes_sim.ravel(),
+        })
         
         # Mapa de calor para visualizar cuotas
         pivot_cuotas = df_sim.pivot(index="Tasa (%)", columns="Plazo", values="Cuota")
@@ -706,9 +728,9 @@ def mostrar_analisis_detalle():
     rentabilidad_portafolio = 0.0
     capital_disponible = 0.0
 
-    # Calcular rentabilidad del portafolio
-    if 'df' in st.session_state and st.session_state.df is not None:
-        df_portafolio_cleaned = clean_df_for_analysis(st.session_state.df)
+    # Calcular rentabilidad del portafolio (valorado en COP; None si no hay portafolio o falta una tasa)
+    df_portafolio_cleaned = portafolio_en_pesos(st.session_state.get('df'))
+    if df_portafolio_cleaned is not None:
         capital_total_portafolio = df_portafolio_cleaned['Dinero'].sum()
         ingreso_pasivo_mensual_portafolio = df_portafolio_cleaned['Interes Mensual'].sum()
 
@@ -721,7 +743,7 @@ def mostrar_analisis_detalle():
                 rentabilidad_portafolio = min(rentabilidad_portafolio, 500.0)
         else:
             st.info("El capital total de tu portafolio es cero, no se puede calcular la rentabilidad.")
-    else:
+    elif st.session_state.get('df') is None:
         st.info("💡 Para comparar, carga tu portafolio en la sección '📥 Cargar Portafolio'.")
 
     # Rentabilidad del préstamo (interés simple anualizado)
@@ -853,17 +875,8 @@ def mostrar_analisis_detalle():
         tasa_equilibrio_anual = rentabilidad_portafolio
         tasa_equilibrio_mensual = tasa_equilibrio_anual / 12
         
-        if tipo_amortizacion == "Cuota Fija (Interés Simple Total)":
-            interes_equilibrio = monto_prestado * (tasa_equilibrio_mensual / 100) * plazo_meses
-            cuota_equilibrio = (monto_prestado + interes_equilibrio) / plazo_meses
-        elif tipo_amortizacion == "Capital al Final (Solo Intereses + Capital Final)":
-            cuota_equilibrio = monto_prestado * (tasa_equilibrio_mensual / 100)
-        else:
-            cuotas_equilibrio = calcular_cuota_capital_fijo(monto_prestado, tasa_equilibrio_mensual, plazo_meses)
-            if cuotas_equilibrio:
-                cuota_equilibrio = sum(c['cuota'] for c in cuotas_equilibrio) / len(cuotas_equilibrio)
-            else:
-                cuota_equilibrio = 0
+        resumen_equilibrio = resumen_amortizacion(monto_prestado, tasa_equilibrio_mensual, plazo_meses, modalidad)
+        cuota_equilibrio = float(np.nan_to_num(resumen_equilibrio[clave_cuota]))
         
         col_eq1, col_eq2, col_eq3 = st.columns(3)
         
@@ -1000,12 +1013,14 @@ def evaluar_prestamo():
 
     opcion_evaluacion = st.radio(
         "Elige una opción:",
-        ["Evaluación General de Préstamo", "Análisis Detallado de Préstamo"],
+        ["Evaluación General de Préstamo", "Evaluación por Lote (CSV)", "Análisis Detallado de Préstamo"],
         key="opcion_evaluacion_radio"
     )
 
     if opcion_evaluacion == "Evaluación General de Préstamo":
         mostrar_evaluacion_general()
+    elif opcion_evaluacion == "Evaluación por Lote (CSV)":
+        mostrar_evaluacion_lote()
     elif opcion_evaluacion == "Análisis Detallado de Préstamo":
         mostrar_analisis_detalle()
 
@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import json
-import os # Importar el módulo os para verificar la existencia del archivo
 
-# Define el nombre del archivo para guardar los niveles de riesgo
-RISK_LEVELS_FILE = "user_risk_levels.json"
+from repositorio import guardar_parametros, leer_parametros
+
+# Grupo de parámetros con los niveles de riesgo en el repositorio
+RISK_LEVELS_GRUPO = "niveles_riesgo"
 
 # Function to format currency in Colombian Pesos
 def formato_pesos(valor):
@@ -17,24 +17,16 @@ def formato_pesos(valor):
 
 def load_user_risk_levels():
     """
-    Carga los niveles de riesgo definidos por el usuario desde un archivo JSON.
-    Retorna un diccionario vacío si el file no existe o está vacío.
+    Carga los niveles de riesgo definidos por el usuario desde el repositorio.
+    Retorna un diccionario vacío si aún no se han guardado.
     """
-    if os.path.exists(RISK_LEVELS_FILE):
-        with open(RISK_LEVELS_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                # Manejar archivo JSON vacío o mal formado
-                return {}
-    return {}
+    return leer_parametros(RISK_LEVELS_GRUPO)
 
 def save_user_risk_levels(risk_levels_dict):
     """
-    Guarda los niveles de riesgo definidos por el usuario en un archivo JSON.
+    Guarda los niveles de riesgo definidos por el usuario en el repositorio.
     """
-    with open(RISK_LEVELS_FILE, 'w') as f:
-        json.dump(risk_levels_dict, f, indent=4)
+    guardar_parametros(RISK_LEVELS_GRUPO, risk_levels_dict)
 
 def mostrar_evaluacion_riesgo(df):
     """
@@ -222,9 +214,8 @@ def mostrar_evaluacion_riesgo(df):
         st.warning("Por favor, carga tu portafolio en la sección '📥 Cargar Portafolio' para realizar los análisis de sensibilidad y ponderación de riesgo.")
         return
 
-    # Clean and convert 'Dinero' column to numeric
+    # The canonical portfolio already has a numeric 'Dinero' column; copy only because a helper column is added below
     df_cleaned = df.copy()
-    df_cleaned['Dinero'] = pd.to_numeric(df_cleaned['Dinero'].replace('[\$,]', '', regex=True), errors='coerce').fillna(0)
     capital_total = df_cleaned['Dinero'].sum()
 
     if capital_total == 0:
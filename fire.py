@@ -4,6 +4,8 @@ import math
 import numpy as np
 from datetime import datetime, timedelta
 
+from solver_metas import meses_para_meta
+
 # Función de utilidad para formato de moneda
 def formato_pesos(valor):
     """Formatea el número con separador de miles como '.' y decimal como ','"""
@@ -48,12 +50,8 @@ def calcular_tiempo_fire_simple(capital_inicial, capital_objetivo, rentabilidad_
     if capital_inicial >= capital_objetivo:
         return 0
     
-    # Calcular años necesarios con interés simple
-    factor_crecimiento_necesario = capital_objetivo / capital_inicial
-    años_necesarios = (factor_crecimiento_necesario - 1) / (rentabilidad_anual / 100)
-    
-    # Convertir a meses
-    meses_necesarios = años_necesarios * 12
+    # Solver compartido (interés simple, sin aportes): meses = (objetivo/inicial - 1) / tasa mensual
+    meses_necesarios = meses_para_meta(capital_inicial, capital_objetivo, rentabilidad_anual, compuesto=False)
     
     return round(meses_necesarios)
 
@@ -278,13 +276,9 @@ def calculadora_fire(capital, ingreso_pasivo, rentabilidad):
     # Comparación con interés compuesto
     if st.checkbox("🔍 ¿Quieres ver la diferencia con interés compuesto?"):
         if capital > 0 and capital_objetivo != float('inf') and rentabilidad > 0:
-            # Cálculo con interés compuesto
-            rentabilidad_mensual_comp = rentabilidad / 100 / 12
-            if capital < capital_objetivo:
-                meses_compuesto = math.log(capital_objetivo / capital) / math.log(1 + rentabilidad_mensual_comp)
-                meses_compuesto = round(meses_compuesto)
-            else:
-                meses_compuesto = 0
+            # Cálculo con interés compuesto (solver compartido, sin aportes)
+            meses_compuesto = meses_para_meta(capital, capital_objetivo, rentabilidad)
+            meses_compuesto = round(meses_compuesto) if meses_compuesto != float('inf') else meses_compuesto
             
             # Comparación
             diferencia_meses = meses_estimados - meses_compuesto
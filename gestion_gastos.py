@@ -1,12 +1,32 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
+import threading
 from datetime import datetime
-import json
-import os
 
-# Define el nombre del archivo para guardar los gastos y presupuestos
-GASTOS_PRESUPUESTOS_FILE = "gastos_presupuestos.json"
+from categorizador_gastos import categorizar_columna, categorizar_texto
+from pronostico_gastos import detectar_anomalias, pronosticar_gastos
+from repositorio import agregar_gastos, filtrar_gastos_nuevos, guardar_presupuestos, leer_gastos, leer_presupuestos, leer_resumen_gastos, reemplazar_gastos, version_tabla
+from utils import hash_contenido, limpiar_moneda
+
+# Importación de extractos: filas por bloque al leer el CSV y columnas requeridas
+FILAS_POR_BLOQUE_CSV = 20000
+COLUMNAS_CSV_GASTOS = ['Fecha', 'Descripcion', 'Monto']
+
+# Tipos de categoría (parte antes de " - ") que cuentan como gasto o como ingreso
+TIPOS_GASTO = ["Gasto", "Financiero", "Retiros en efectivo", "Comisión bancaria", "Otros"]
+TIPOS_INGRESO = ["Ingreso", "Financiero"]
+
+class ColumnasCSVFaltantes(ValueError):
+    """El extracto CSV no tiene las columnas de COLUMNAS_CSV_GASTOS."""
+
+# Caché del resumen mensual por categoría: {'version', 'df'}
+_cache_resumen = {}
+_lock_resumen = threading.Lock()
+
+# Caché del pronóstico y las anomalías: {'clave': (versión de gastos, mes actual), 'pronostico', 'anomalias'}
+_cache_analisis = {}
+_lock_analisis = threading.Lock()
 
 # Función para formatear valores monetarios en pesos colombianos (miles con punto, decimales con coma)
 def formato_pesos(valor):
@@ -17,140 +37,116 @@ def formato_pesos(valor):
 
 def load_gastos_presupuestos():
     """
-    Carga los gastos y presupuestos desde un archivo JSON.
-    Retorna un diccionario con los datos o valores por defecto si el archivo no existe o está vacío.
+    Carga los gastos y presupuestos desde el repositorio.
+    Retorna un diccionario con el DataFrame de gastos y el diccionario de presupuestos.
     """
-    if os.path.exists(GASTOS_PRESUPUESTOS_FILE):
-        with open(GASTOS_PRESUPUESTOS_FILE, 'r') as f:
-            try:
-                data = json.load(f)
-                # Convertir la lista de diccionarios de gastos a DataFrame
-                if 'gastos_df' in data and isinstance(data['gastos_df'], list):
-                    df = pd.DataFrame(data['gastos_df'])
-                    if not df.empty:
-                        # Asegurarse de que la columna 'Fecha' se convierta a datetime
-                        df['Fecha'] = pd.to_datetime(df['Fecha'])
-                    data['gastos_df'] = df
-                else:
-                    data['gastos_df'] = pd.DataFrame(columns=['Fecha', 'Descripcion', 'Monto', 'Categoria'])
-                
-                if 'presupuestos' not in data:
-                    data['presupuestos'] = {}
-
-                return data
-            except json.JSONDecodeError:
-                # Si el archivo está vacío o mal formado, retornar valores por defecto
-                return {
-                    "gastos_df": pd.DataFrame(columns=['Fecha', 'Descripcion', 'Monto', 'Categoria']),
-                    "presupuestos": {}
-                }
-    # Si el archivo no existe, retornar valores por defecto
     return {
-        "gastos_df": pd.DataFrame(columns=['Fecha', 'Descripcion', 'Monto', 'Categoria']),
-        "presupuestos": {}
+        "gastos_df": leer_gastos(),
+        "presupuestos": leer_presupuestos()
     }
 
 def save_gastos_presupuestos(data_dict):
     """
-    Guarda los gastos y presupuestos en un archivo JSON.
-    Convierte el DataFrame de gastos a formato de lista para JSON.
+    Guarda los gastos y presupuestos en el repositorio.
+    Reemplaza todas las transacciones; para agregar nuevas usar `agregar_gastos`.
     """
-    data_to_save = data_dict.copy()
-    if isinstance(data_to_save['gastos_df'], pd.DataFrame):
-        # Convertir la columna 'Fecha' a string antes de guardar para evitar TypeError
-        temp_df = data_to_save['gastos_df'].copy()
-        if 'Fecha' in temp_df.columns and not temp_df['Fecha'].empty:
-            temp_df['Fecha'] = temp_df['Fecha'].dt.strftime('%Y-%m-%d')
-        data_to_save['gastos_df'] = temp_df.to_dict(orient='records')
-    
-    with open(GASTOS_PRESUPUESTOS_FILE, 'w') as f:
-        json.dump(data_to_save, f, indent=4)
-
-
-# Función para categorizar gastos (basada en reglas simples)
+    if isinstance(data_dict.get('gastos_df'), pd.DataFrame):
+        reemplazar_gastos(data_dict['gastos_df'])
+    guardar_presupuestos(data_dict.get('presupuestos', {}))
+
+
+# Función para categorizar gastos (reglas por palabras clave en reglas_gastos.json, ver categorizador_gastos.py)
 def categorizar_gasto(descripcion):
-    desc = descripcion.lower()
-
-    # INGRESOS
-    if "tesoro naci" in desc or "interbanc dir" in desc or "nomina" in desc or "salario" in desc:
-        return ("Ingreso", "Salario / Tesorería")
-    if "transferencia desde nequi" in desc or "transf qr keyner" in desc or "pago de cliente" in desc or "honorarios" in desc:
-        return ("Ingreso", "Transferencia / Honorarios")
-    if "consignacion" in desc or "deposito" in desc:
-        return ("Ingreso", "Consignación / Depósito")
-    if "abono intereses" in desc or "rendimientos" in desc:
-        return ("Financiero", "Intereses ganados")
-    if "bono" in desc or "regalo" in desc:
-        return ("Ingreso", "Bonos / Regalos")
-    if "reembolso" in desc or "devolucion" in desc:
-        return ("Ingreso", "Reembolso / Devolución")
-    if "venta" in desc or "ingreso extra" in desc:
-        return ("Ingreso", "Ventas / Ingresos Extra")
-
-    # GASTOS
-    if "transferencia a nequi" in desc or "transf qr nequi" in desc or "pago a proveedor" in desc:
-        return ("Gasto", "Transferencia a terceros")
-    if "retiro cajero" in desc or "retiro corresponsal" in desc or "efectivo" in desc:
-        return ("Gasto", "Retiros en efectivo")
-    if "pago suc virt tc" in desc or "mora tarjeta" in desc or "cuota tarjeta" in desc:
-        return ("Gasto", "Pago de tarjeta de crédito")
-    if "cuota manejo" in desc or "comision bancaria" in desc or "gmf" in desc:
-        return ("Financiero", "Comisión bancaria")
-    if "pago pse" in desc or "compra en" in desc or "pago qr" in desc or "adquisicion" in desc:
-        if any(keyword in desc for keyword in ["supermercado", "alimentos", "mercado", "d1", "exito", "jumbo", "tiendas ar", "tienda d1", "exito maga", "fruver", "carniceria", "panaderia", "farmatodo", "la rebaja"]):
-            return ("Gasto", "Alimentos y Compras")
-        elif any(keyword in desc for keyword in ["restaurante", "cafe", "bar", "comida rapida", "crepes de la villa", "pollos crock", "cali pollos", "pizzeria", "sushi", "domicilios", "rappipay"]):
-            return ("Gasto", "Comida Fuera")
-        elif any(keyword in desc for keyword in ["ropa", "zapatos", "moda", "boutique", "tienda de ropa", "falabella", "arturo calle"]):
-            return ("Gasto", "Vestimenta")
-        elif any(keyword in desc for keyword in ["cine", "concierto", "teatro", "ocio", "entretenimiento", "viaje", "bold*event", "parque", "museo", "vacaciones", "hotel", "tiquetes", "netflix", "spotify", "disney+"]):
-            return ("Gasto", "Ocio y Entretenimiento")
-        elif any(keyword in desc for keyword in ["salud", "medico", "farmacia", "hospital", "seguro medico", "odontologo", "terapia", "medicamentos", "drogueria", "eps"]):
-            return ("Gasto", "Salud")
-        elif any(keyword in desc for keyword in ["educacion", "curso", "universidad", "libros", "matricula", "diplomado", "taller", "colegio", "academia"]):
-            return ("Gasto", "Educación")
-        elif any(keyword in desc for keyword in ["gimnasio", "deporte", "entrenamiento", "suplementos", "sportlife", "smartfit"]):
-            return ("Gasto", "Deporte y Bienestar")
-        elif any(keyword in desc for keyword in ["mascota", "veterinaria", "alimento mascotas", "petshop"]):
-            return ("Gasto", "Mascotas")
-        elif any(keyword in desc for keyword in ["electronicos", "tecnologia", "celular", "computador", "gadget", "alkosto", "falabella tecnologia"]):
-            return ("Gasto", "Tecnología")
-        elif any(keyword in desc for keyword in ["muebles", "hogar", "decoracion", "electrodomesticos", "reparacion hogar", "ferreteria", "homecenter", "construccion"]):
-            return ("Gasto", "Hogar y Mantenimiento")
-        else:
-            return ("Gasto", "Compras y Pagos Varios")
-    
-    if "transf a comunicacion" in desc or "pago celular" in desc or "recarga" in desc or "claro" in desc or "tigo" in desc or "movistar":
-        return ("Gasto", "Comunicación")
-    if any(keyword in desc for keyword in ["arriendo", "hipoteca", "servicios", "luz", "agua", "gas", "internet", "administracion", "impuestos predial", "alquiler"]):
-        return ("Gasto", "Vivienda y Servicios")
-    if any(keyword in desc for keyword in ["transporte", "gasolina", "bus", "taxi", "uber", "metro", "peajes", "mantenimiento vehiculo", "parqueadero", "transmilenio"]):
-        return ("Gasto", "Transporte")
-    if any(keyword in desc for keyword in ["seguros", "poliza", "seguro vida", "seguro auto", "seguro hogar"]):
-        return ("Gasto", "Seguros")
-    if any(keyword in desc for keyword in ["impuestos", "dian", "renta", "iva"]):
-        return ("Gasto", "Impuestos")
-    if any(keyword in desc for keyword in ["donacion", "caridad", "fundacion"]):
-        return ("Gasto", "Donaciones")
-    if any(keyword in desc for keyword in ["belleza", "peluqueria", "estetica", "spa", "cosmeticos"]):
-        return ("Gasto", "Cuidado Personal")
-    if any(keyword in desc for keyword in ["regalo", "celebracion", "fiesta", "evento"]):
-        return ("Gasto", "Regalos y Celebraciones")
-
-    # INVERSIÓN
-    if "apertura inv" in desc or "compra acciones" in desc or "fondo de inversion" in desc or "cdt" in desc or "bolsa" in desc or "broker":
-        return ("Inversión", "Inversión en Mercados")
-    if "pago pse lulo bank" in desc or "nu colombia" in desc or "daviplata" in desc or "banco digital" in desc or "tyba" in desc or "afin" in desc:
-        return ("Inversión", "Neobancos / Plataformas Digitales")
-    if "compra cripto" in desc or "binance" in desc or "exchange cripto" in desc or "coinbase" in desc:
-        return ("Inversión", "Criptomonedas")
-
-    # TRANSFERENCIAS INTERNAS (entre cuentas propias, no son gasto ni ingreso real)
-    if "cta suc virtual" in desc or "suc virtual" in desc or "keyner andres" in desc or "transferencia entre cuentas" in desc or "mis cuentas":
-        return ("Transferencia Interna", "Entre cuentas propias")
-
-    # OTROS
-    return ("Otros", "Sin clasificar")
+    return categorizar_texto(descripcion)
+
+def etiquetar_categorias(descripciones):
+    """Categoría "Tipo - Subcategoría" de una columna completa de descripciones, en una sola pasada."""
+    categorias = categorizar_columna(descripciones)
+    return categorias['tipo'] + " - " + categorias['categoria']
+
+def resumen_mensual_gastos():
+    """
+    Totales por mes y categoría (Mes, Categoria, Tipo, Ingresos, Egresos, Transacciones), de solo
+    lectura. La base los mantiene al insertar o borrar transacciones; aquí se reutiliza la versión
+    en memoria mientras la tabla de gastos no cambie.
+    """
+    version = version_tabla("gastos")
+    with _lock_resumen:
+        if _cache_resumen.get("version") != version:
+            df = leer_resumen_gastos()
+            df['Tipo'] = df['Categoria'].str.split(' - ').str[0]
+            _cache_resumen["df"] = df
+            _cache_resumen["version"] = version
+        return _cache_resumen["df"]
+
+def totales_de_gastos(resumen):
+    """Monto mensual (valor absoluto de los movimientos) de cada categoría de gasto: Mes, Categoria, Monto."""
+    resumen_gastos = resumen[resumen['Tipo'].isin(TIPOS_GASTO)]
+    return pd.DataFrame({
+        'Mes': resumen_gastos['Mes'],
+        'Categoria': resumen_gastos['Categoria'],
+        'Monto': resumen_gastos['Ingresos'] + resumen_gastos['Egresos'],
+    })
+
+def analizar_gastos(df_gastos, mes_actual):
+    """
+    Pronóstico del mes actual por categoría (con los meses cerrados) y transacciones atípicas.
+    Se recalcula solo cuando cambia la tabla de gastos (p. ej. después de una importación) o el mes.
+    """
+    clave = (version_tabla("gastos"), mes_actual)
+    with _lock_analisis:
+        if _cache_analisis.get("clave") != clave:
+            _cache_analisis["pronostico"] = pronosticar_gastos(totales_de_gastos(resumen_mensual_gastos()), hasta=mes_actual - 1)
+            _cache_analisis["anomalias"] = detectar_anomalias(df_gastos, tipos=TIPOS_GASTO)
+            _cache_analisis["clave"] = clave
+        return _cache_analisis["pronostico"], _cache_analisis["anomalias"]
+
+def importar_gastos_csv(archivo, filas_por_bloque=FILAS_POR_BLOQUE_CSV):
+    """
+    Importa un extracto CSV por bloques. Cada bloque se limpia, se descartan las transacciones
+    que ya están guardadas (índice de huellas del repositorio), se categorizan las nuevas en bloque
+    y solo esas se escriben.
+
+    Devuelve un diccionario con 'nuevos' (DataFrame de las transacciones guardadas), 'leidas',
+    'insertadas', 'repetidas' e 'invalidas'. Lanza ColumnasCSVFaltantes si faltan columnas; si
+    falla un bloque posterior al primero, los bloques anteriores ya quedaron guardados.
+    """
+    total_bytes = getattr(archivo, 'size', None)
+    barra = st.progress(0.0, text="Importando transacciones...")
+    nuevos = []
+    leidas = insertadas = invalidas = 0
+
+    for bloque in pd.read_csv(archivo, chunksize=filas_por_bloque):
+        if not all(col in bloque.columns for col in COLUMNAS_CSV_GASTOS):
+            raise ColumnasCSVFaltantes("El archivo CSV debe contener las columnas 'Fecha', 'Descripcion' y 'Monto'.")
+        leidas += len(bloque)
+
+        # Limpiar y convertir tipos
+        bloque = bloque[COLUMNAS_CSV_GASTOS].assign(
+            Fecha=pd.to_datetime(bloque['Fecha'], errors='coerce'),
+            Monto=limpiar_moneda(bloque['Monto'])
+        )
+        validas = bloque.dropna(subset=['Fecha', 'Monto'])
+        invalidas += len(bloque) - len(validas)
+
+        # Solo las transacciones que no están guardadas se categorizan y se escriben
+        bloque_nuevo = filtrar_gastos_nuevos(validas)
+        if not bloque_nuevo.empty:
+            bloque_nuevo = bloque_nuevo.assign(Categoria=etiquetar_categorias(bloque_nuevo['Descripcion']))
+            insertadas += agregar_gastos(bloque_nuevo)
+            nuevos.append(bloque_nuevo)
+
+        if total_bytes:
+            barra.progress(min(archivo.tell() / total_bytes, 1.0), text=f"Importando transacciones... {leidas:,} filas")
+
+    barra.progress(1.0, text=f"Importación terminada: {leidas:,} filas leídas")
+    return {
+        'nuevos': pd.concat(nuevos, ignore_index=True) if nuevos else pd.DataFrame(columns=COLUMNAS_CSV_GASTOS + ['Categoria']),
+        'leidas': leidas,
+        'insertadas': insertadas,
+        'repetidas': leidas - invalidas - insertadas,
+        'invalidas': invalidas,
+    }
 
 # --- Función principal del módulo ---
 def mostrar_gestion_gastos():
@@ -174,35 +170,35 @@ def mostrar_gestion_gastos():
     uploaded_file = st.file_uploader("Sube tu archivo CSV de transacciones", type=["csv"])
 
     if uploaded_file is not None:
-        with st.spinner("Cargando y categorizando gastos desde CSV..."): # Spinner para carga CSV
+        # El mismo archivo no se vuelve a importar en cada rerun mientras siga seleccionado
+        hash_csv = hash_contenido(uploaded_file.getvalue())
+        if st.session_state.get("gastos_csv_hash") != hash_csv:
+            version_antes = version_tabla("gastos")
             try:
-                df_csv = pd.read_csv(uploaded_file)
-                # Validar columnas
-                if not all(col in df_csv.columns for col in ['Fecha', 'Descripcion', 'Monto']):
-                    st.error("El archivo CSV debe contener las columnas 'Fecha', 'Descripcion' y 'Monto'.")
-                    return
-
-                # Limpiar y convertir tipos
-                df_csv['Fecha'] = pd.to_datetime(df_csv['Fecha'], errors='coerce')
-                df_csv['Monto'] = pd.to_numeric(df_csv['Monto'], errors='coerce')
-                df_csv = df_csv.dropna(subset=['Fecha', 'Monto']) # Eliminar filas con valores nulos después de la conversión
-
-                # Categorizar los gastos del CSV y almacenar como "Categoría - Subcategoría"
-                df_csv['Categoria'] = df_csv['Descripcion'].apply(lambda x: f"{categorizar_gasto(x)[0]} - {categorizar_gasto(x)[1]}")
-
-                # Concatenar con los gastos existentes
-                st.session_state.gastos_df = pd.concat([st.session_state.gastos_df, df_csv], ignore_index=True)
-                st.session_state.gastos_df = st.session_state.gastos_df.drop_duplicates(subset=['Fecha', 'Descripcion', 'Monto']) # Evitar duplicados
-                
-                # Guardar los datos actualizados
-                save_gastos_presupuestos({
-                    "gastos_df": st.session_state.gastos_df,
-                    "presupuestos": st.session_state.presupuestos
-                })
-                st.success("Gastos cargados y categorizados correctamente desde CSV.")
-                st.rerun() # Recargar para mostrar los datos actualizados
+                resumen = importar_gastos_csv(uploaded_file)
+            except ColumnasCSVFaltantes as e:
+                st.error(str(e))
             except Exception as e:
                 st.error(f"Error al leer el archivo CSV: {e}")
+                # Los bloques leídos antes del error ya se guardaron: la sesión se recarga desde el
+                # repositorio. El hash no se registra, así que volver a subir el archivo completa la
+                # importación (las transacciones ya guardadas se descartan).
+                if version_tabla("gastos") != version_antes:
+                    total_antes = len(st.session_state.gastos_df)
+                    st.session_state.gastos_df = leer_gastos()
+                    st.warning(
+                        f"Importación parcial: se guardaron {len(st.session_state.gastos_df) - total_antes:,} "
+                        "transacciones antes del error. Corrige el archivo y vuelve a subirlo para importar el resto."
+                    )
+            else:
+                st.session_state.gastos_csv_hash = hash_csv
+                # Solo se agregan a la sesión las transacciones nuevas (sin deduplicar todo el historial)
+                if resumen['insertadas']:
+                    st.session_state.gastos_df = pd.concat([st.session_state.gastos_df, resumen['nuevos']], ignore_index=True)
+                st.success(
+                    f"Gastos cargados y categorizados correctamente desde CSV: {resumen['insertadas']:,} nuevas, "
+                    f"{resumen['repetidas']:,} ya registradas, {resumen['invalidas']:,} con fecha o monto inválido."
+                )
 
     # --- Añadir gasto manualmente ---
     st.subheader("➕ Añadir Transacción Manualmente") # Changed title
@@ -254,11 +250,8 @@ def mostrar_gestion_gastos():
                 st.session_state.gastos_df = pd.concat([st.session_state.gastos_df, nuevo_gasto], ignore_index=True)
                 st.session_state.gastos_df = st.session_state.gastos_df.drop_duplicates(subset=['Fecha', 'Descripcion', 'Monto'])
                 
-                # Guardar los datos actualizados
-                save_gastos_presupuestos({
-                    "gastos_df": st.session_state.gastos_df,
-                    "presupuestos": st.session_state.presupuestos
-                })
+                # Guardar solo la transacción nueva
+                agregar_gastos(nuevo_gasto)
                 st.success("✅ Transacción añadida y categorizada correctamente.") # Changed label
                 st.rerun() # Recargar para mostrar los datos actualizados
             except Exception as e:
@@ -266,12 +259,13 @@ def mostrar_gestion_gastos():
 
     # --- Mostrar y Analizar Gastos ---
     if not st.session_state.gastos_df.empty:
-        df_gastos = st.session_state.gastos_df.copy()
-        df_gastos['Mes'] = df_gastos['Fecha'].dt.to_period('M') # Columna para agrupar por mes
+        df_gastos = st.session_state.gastos_df
+        # Totales por mes y categoría mantenidos por la base (no se reagrupa todo el historial)
+        resumen = resumen_mensual_gastos()
 
         st.subheader("📋 Resumen de Transacciones") # Changed title
         # Ordenar por fecha para mejor visualización
-        df_gastos_display = df_gastos.sort_values(by='Fecha', ascending=False).copy()
+        df_gastos_display = df_gastos.sort_values(by='Fecha', ascending=False)
         df_gastos_display['Monto'] = df_gastos_display['Monto'].apply(formato_pesos)
         df_gastos_display['Fecha'] = df_gastos_display['Fecha'].dt.strftime('%Y-%m-%d') # Formato de fecha para display
         st.dataframe(df_gastos_display[['Fecha', 'Descripcion', 'Monto', 'Categoria']], use_container_width=True)
@@ -279,10 +273,10 @@ def mostrar_gestion_gastos():
         st.subheader("📊 Resumen Mensual de Flujos")
         # Filtrar por mes actual para el resumen
         mes_actual = pd.Period(datetime.now().strftime('%Y-%m'), freq='M')
-        df_mes_actual = df_gastos[df_gastos['Mes'] == mes_actual]
+        resumen_mes_actual = resumen[resumen['Mes'] == mes_actual]
 
-        total_ingresos_mes = df_mes_actual[df_mes_actual['Monto'] > 0]['Monto'].sum()
-        total_gastos_mes = df_mes_actual[df_mes_actual['Monto'] < 0]['Monto'].abs().sum()
+        total_ingresos_mes = resumen_mes_actual['Ingresos'].sum()
+        total_gastos_mes = resumen_mes_actual['Egresos'].sum()
         balance_mes = total_ingresos_mes - total_gastos_mes
 
         col_inc, col_exp, col_bal = st.columns(3)
@@ -299,12 +293,10 @@ def mostrar_gestion_gastos():
 
         # Gasto por categoría (Pie Chart)
         # Agrupar por la categoría completa (principal - subcategoría)
-        df_solo_gastos = df_gastos[
-            df_gastos['Categoria'].apply(lambda x: x.split(' - ')[0] in ["Gasto", "Financiero", "Retiros en efectivo", "Comisión bancaria", "Otros"])
-        ].copy()
-        df_solo_gastos['Monto_Abs'] = df_solo_gastos['Monto'].abs() 
+        # Se suma el valor absoluto de todos los movimientos de las categorías de gasto
+        totales_gastos = totales_de_gastos(resumen)
 
-        gastos_por_categoria = df_solo_gastos.groupby('Categoria')['Monto_Abs'].sum().sort_values(ascending=False)
+        gastos_por_categoria = totales_gastos.groupby('Categoria')['Monto'].sum().sort_values(ascending=False)
         if not gastos_por_categoria.empty and gastos_por_categoria.sum() > 0: # Añadir check para evitar pie chart con suma 0
             fig1, ax1 = plt.subplots(figsize=(8, 8))
             ax1.pie(gastos_por_categoria, labels=gastos_por_categoria.index, autopct='%1.1f%%', startangle=90, pctdistance=0.85)
@@ -316,7 +308,7 @@ def mostrar_gestion_gastos():
             st.info("No hay gastos válidos para mostrar la distribución por categoría.")
 
         # Gasto mensual (Bar Chart)
-        gastos_mensuales = df_solo_gastos.groupby('Mes')['Monto_Abs'].sum().sort_index()
+        gastos_mensuales = totales_gastos.groupby('Mes')['Monto'].sum().sort_index()
         if not gastos_mensuales.empty and gastos_mensuales.sum() > 0: # Añadir check para evitar bar chart con suma 0
             fig2, ax2 = plt.subplots(figsize=(10, 6))
             bars = ax2.bar(gastos_mensuales.index.astype(str), gastos_mensuales.values, color='lightcoral')
@@ -339,12 +331,9 @@ def mostrar_gestion_gastos():
             st.info("No hay gastos válidos para mostrar el total mensual.")
         
         # NUEVO: Gráfico de Ingresos Mensuales (Bar Chart)
-        # Se asegura que las condiciones booleanas se combinen correctamente con '&' y paréntesis
-        df_solo_ingresos = df_gastos[
-            (df_gastos['Categoria'].apply(lambda x: x.split(' - ')[0] in ["Ingreso", "Financiero"])) & (df_gastos['Monto'] > 0)
-        ].copy()
-        
-        ingresos_mensuales = df_solo_ingresos.groupby('Mes')['Monto'].sum().sort_index()
+        # Solo los montos positivos de las categorías de ingreso
+        resumen_ingresos = resumen[resumen['Tipo'].isin(TIPOS_INGRESO)]
+        ingresos_mensuales = resumen_ingresos.groupby('Mes')['Ingresos'].sum().sort_index()
         if not ingresos_mensuales.empty and ingresos_mensuales.sum() > 0:
             fig3, ax3 = plt.subplots(figsize=(10, 6))
             bars = ax3.bar(ingresos_mensuales.index.astype(str), ingresos_mensuales.values, color='lightgreen')
@@ -366,19 +355,45 @@ def mostrar_gestion_gastos():
         else:
             st.info("No hay ingresos válidos para mostrar el total mensual.")
 
+        # --- Pronóstico y Anomalías ---
+        st.subheader("🔮 Pronóstico y Transacciones Atípicas")
+        try:
+            pronostico, anomalias = analizar_gastos(df_gastos, mes_actual)
+        except Exception as e:
+            st.error(f"No se pudo calcular el pronóstico de gastos: {e}")
+        else:
+            if pronostico.empty:
+                st.info("Se necesita al menos un mes cerrado de gastos para proyectar el mes actual.")
+            else:
+                st.markdown(f"Proyección de gastos para **{pronostico.attrs['mes_proyectado']}** "
+                            f"(promedio de los últimos meses ajustado por estacionalidad):")
+                gasto_a_la_fecha = totales_gastos[totales_gastos['Mes'] == mes_actual].groupby('Categoria')['Monto'].sum()
+                df_pronostico = pronostico.assign(**{'Gasto a la fecha': gasto_a_la_fecha.reindex(pronostico.index, fill_value=0.0)})
+                columnas_monto = ['Último mes', 'Promedio móvil', 'Base estacional', 'Proyección', 'Gasto a la fecha']
+                df_pronostico[columnas_monto] = df_pronostico[columnas_monto].apply(
+                    lambda columna: columna.map(lambda valor: formato_pesos(valor) if pd.notna(valor) else "-")
+                )
+                df_pronostico['Índice estacional'] = df_pronostico['Índice estacional'].map("{:.2f}".format)
+                st.dataframe(df_pronostico, use_container_width=True)
+                st.metric("Gasto Total Proyectado", formato_pesos(pronostico['Proyección'].sum()))
+
+            if anomalias.empty:
+                st.success("No se detectaron transacciones atípicas en las categorías de gasto.")
+            else:
+                st.warning(f"Se detectaron {len(anomalias)} transacciones atípicas (montos muy alejados de lo habitual en su categoría).")
+                df_anomalias = anomalias.sort_values('Fecha', ascending=False)
+                df_anomalias['Monto'] = df_anomalias['Monto'].apply(formato_pesos)
+                df_anomalias['Fecha'] = df_anomalias['Fecha'].dt.strftime('%Y-%m-%d')
+                df_anomalias['Puntaje'] = df_anomalias['Puntaje'].round(1)
+                st.dataframe(df_anomalias[['Fecha', 'Descripcion', 'Monto', 'Categoria', 'Puntaje']], use_container_width=True)
+
 
         # --- Presupuesto y Alertas ---
         st.subheader("💰 Presupuesto por Categoría y Alertas")
 
         # Usar solo las categorías que son consideradas "gastos" para el presupuesto
         # Se extrae la categoría principal de las categorías ya combinadas
-        categorias_para_presupuesto_set = set()
-        for cat_completa in df_gastos['Categoria'].unique():
-            cat_principal = cat_completa.split(' - ')[0]
-            if cat_principal in ["Gasto", "Financiero", "Retiros en efectivo", "Comisión bancaria", "Otros"]: # "Otros" también puede ser un gasto
-                categorias_para_presupuesto_set.add(cat_completa)
-        
-        categorias_para_presupuesto = sorted(list(categorias_para_presupuesto_set))
+        categorias_para_presupuesto = sorted(totales_gastos['Categoria'].unique())
         alertas_activas = False
 
         st.markdown("Establece tu presupuesto mensual para cada categoría:")
@@ -399,16 +414,12 @@ def mostrar_gestion_gastos():
             
             # Botón para guardar presupuestos manualmente
             if st.button("Guardar Presupuestos"):
-                save_gastos_presupuestos({
-                    "gastos_df": st.session_state.gastos_df,
-                    "presupuestos": st.session_state.presupuestos
-                })
+                guardar_presupuestos(st.session_state.presupuestos)
                 st.success("Presupuestos guardados correctamente.")
                 st.rerun()
 
             # Calcular gastos actuales por categoría para el mes actual (solo gastos)
-            mes_actual = pd.Period(datetime.now().strftime('%Y-%m'), freq='M')
-            gastos_mes_actual_filtrados = df_solo_gastos[df_solo_gastos['Mes'] == mes_actual].groupby('Categoria')['Monto_Abs'].sum()
+            gastos_mes_actual_filtrados = totales_gastos[totales_gastos['Mes'] == mes_actual].groupby('Categoria')['Monto'].sum()
 
             st.markdown("---")
             st.markdown("### 🔔 Alertas de Presupuesto (Mes Actual)")
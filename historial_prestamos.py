@@ -0,0 +1,53 @@
+# historial_prestamos.py
+# Historial de evaluaciones de préstamos, guardado en la tabla 'prestamos' del repositorio.
+#
+# - Escritura solo por anexado: cada evaluación se inserta como una fila nueva.
+# - Lectura en caché: el historial se vuelve a leer solo si la tabla cambió.
+# - Consultas por Nombre y por rango de Fecha resueltas con los índices de la base.
+
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from repositorio import anexar_prestamos, leer_prestamos, version_tabla
+
+COLUMNAS_HISTORIAL = [
+    "Nombre", "Ingresos", "Deudas Actuales", "Monto Prestamo", "Tasa (%)", "Plazo (meses)",
+    "Cuota Estimada", "% Endeudamiento", "Resultado", "Riesgo Actividad", "Fecha"
+]
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+# Caché del historial completo: {'version', 'df'}
+_cache_historial = {}
+_lock_historial = threading.Lock()
+
+def anexar_evaluaciones(df_nuevos):
+    """Agrega evaluaciones al historial en una sola transacción. Las filas sin 'Fecha' reciben la fecha actual."""
+    if df_nuevos.empty:
+        return
+    df_nuevos = df_nuevos.copy()
+    if "Fecha" not in df_nuevos.columns:
+        df_nuevos["Fecha"] = datetime.now().strftime(FORMATO_FECHA)
+    anexar_prestamos(df_nuevos)
+
+def cargar_historial():
+    """
+    Devuelve el historial como DataFrame (de solo lectura: no modificarlo en el lugar).
+    Se reutiliza la versión en memoria mientras la tabla no cambie.
+    """
+    version = version_tabla("prestamos")
+    with _lock_historial:
+        if _cache_historial.get("version") != version:
+            _cache_historial["df"] = leer_prestamos()
+            _cache_historial["version"] = version
+        return _cache_historial["df"]
+
+def buscar_evaluaciones(nombre=None, desde=None, hasta=None):
+    """
+    Consulta el historial por Nombre (sin distinguir mayúsculas) y/o por rango
+    de fechas [desde, hasta]; 'hasta' incluye el día completo.
+    """
+    if not nombre and desde is None and hasta is None:
+        return cargar_historial()
+    return leer_prestamos(nombre=nombre, desde=desde, hasta=hasta)
@@ -1,13 +1,58 @@
 import pandas as pd
 import streamlit as st
-import os
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
-import numpy as np
-from sklearn.linear_model import LinearRegression
-
-RUTA_HISTORIAL = "historial_snapshots.csv"
+import threading
+
+from analitica_historico import analizar_historial
+from modelos_pronostico import MODELOS, pronosticar
+from repositorio import (
+    borrar_snapshots, guardar_snapshot_diario, leer_snapshots, leer_snapshots_activos,
+    leer_totales_snapshots_activos, version_tabla
+)
+
+# Rango del detalle diario -> días hacia atrás (None: todo el historial)
+RANGOS_DETALLE = {"30 días": 30, "90 días": 90, "1 año": 365, "Todo": None}
+MESES_PROYECCION = 6
+MODELO_AUTOMATICO = "Automático (mejor backtest)"
+
+# Cachés hasta que llegue un snapshot nuevo: proyección {'version', 'meses', 'capital', 'ingreso'} y
+# analítica por rango {(version, rango, día): resultado}
+_cache_proyeccion = {}
+_cache_analitica = {}
+_lock_cache = threading.Lock()
+
+def proyectar_historial(historial, meses=MESES_PROYECCION):
+    """
+    Pronósticos de Capital Total e Ingreso Pasivo con todos los modelos de modelos_pronostico y su
+    backtest (ver `pronosticar`). El capital usa el ingreso pasivo como rendimiento del modelo con aportes.
+    """
+    version = version_tabla("snapshots")
+    with _lock_cache:
+        if _cache_proyeccion.get("version") != version or _cache_proyeccion.get("meses") != meses:
+            ingreso = historial["Ingreso Pasivo"].to_numpy()
+            _cache_proyeccion.update(
+                version=version,
+                meses=meses,
+                capital=pronosticar(historial["Capital Total"].to_numpy(), meses, ingreso=ingreso),
+                ingreso=pronosticar(ingreso, meses),
+            )
+        return _cache_proyeccion["capital"], _cache_proyeccion["ingreso"]
+
+def _elegir_pronostico(resultado, modelo):
+    nombre = resultado['mejor'] if modelo == MODELO_AUTOMATICO else modelo
+    return nombre, resultado['pronosticos'][nombre]
+
+def analitica_por_rango(rango, desde):
+    """Snapshots por activo del rango y su analítica, reutilizados mientras no haya un snapshot nuevo."""
+    clave = (version_tabla("snapshots_activos"), rango, pd.Timestamp.today().normalize())
+    with _lock_cache:
+        if clave not in _cache_analitica:
+            _cache_analitica.clear()  # Solo se conserva la versión vigente
+            activos = leer_snapshots_activos(desde=desde)
+            _cache_analitica[clave] = (activos, analizar_historial(activos))
+        return _cache_analitica[clave]
 
 def formato_pesos(valor):
     """Formatea valores numéricos como moneda colombiana"""
@@ -15,33 +60,92 @@ def formato_pesos(valor):
 
 # Función para guardar snapshot
 def guardar_snapshot(df):
-    hoy = datetime.today().strftime("%Y-%m")
-    capital_total = df['Dinero'].replace('[\$,]', '', regex=True).astype(float).sum()
-    ingreso_pasivo = df['Interes Mensual'].replace('[\$,]', '', regex=True).astype(float).sum()
-
-    nuevo = pd.DataFrame([{
-        "Fecha": hoy,
-        "Capital Total": capital_total,
-        "Ingreso Pasivo": ingreso_pasivo
-    }])
-
-    if os.path.exists(RUTA_HISTORIAL):
-        historial = pd.read_csv(RUTA_HISTORIAL)
-        historial = historial[historial["Fecha"] != hoy]
-        historial = pd.concat([historial, nuevo], ignore_index=True)
-    else:
-        historial = nuevo
+    hoy = datetime.today().strftime("%Y-%m-%d")
+    # Un registro por activo; solo se escriben las filas del día que cambiaron (y los totales del mes)
+    por_activo = df.groupby(['Items', 'Tipo de inversion'], as_index=False)[['Dinero', 'Interes Mensual']].sum()
+    try:
+        hubo_cambios = guardar_snapshot_diario(hoy, por_activo.itertuples(index=False, name=None))
+    except Exception as e:
+        st.error(f"Error al guardar el snapshot del día: {e}")
+        return
 
-    historial.to_csv(RUTA_HISTORIAL, index=False)
-    
+    mensaje = "Snapshot diario guardado correctamente" if hubo_cambios else "El snapshot del día ya estaba al día"
     st.markdown("""
         <div style='background: linear-gradient(135deg, #a8edea 0%, #fed6e3 100%); 
                     padding: 1rem; border-radius: 10px; margin: 1rem 0;'>
             <p style='margin: 0; color: #333; font-weight: 600;'>
-                ✅ Snapshot mensual guardado correctamente para {hoy}
+                ✅ {mensaje} para {hoy}
             </p>
         </div>
-    """.format(hoy=hoy), unsafe_allow_html=True)
+    """.format(mensaje=mensaje, hoy=hoy), unsafe_allow_html=True)
+
+def mostrar_detalle_diario():
+    """Evolución diaria del capital por tipo de inversión en el rango elegido (consultado en la base)."""
+    st.markdown("### 🗓️ Detalle Diario por Activo")
+    rango = st.selectbox("Rango:", list(RANGOS_DETALLE), index=1, key="rango_detalle_historico")
+    dias = RANGOS_DETALLE[rango]
+    desde = pd.Timestamp.today().normalize() - pd.Timedelta(days=dias) if dias is not None else None
+
+    activos, analitica = analitica_por_rango(rango, desde)
+    if activos.empty:
+        st.info("Aún no hay snapshots diarios en este rango. Se guardan al visitar esta página con un portafolio cargado.")
+        return
+
+    totales = leer_totales_snapshots_activos(desde=desde)
+    por_tipo = activos.groupby(['Fecha', 'Tipo de inversion'], as_index=False)['Dinero'].sum()
+    fig = px.area(por_tipo, x='Fecha', y='Dinero', color='Tipo de inversion',
+                  title='Capital por Tipo de Inversión', labels={'Dinero': 'Capital (COP)'})
+    fig.add_trace(go.Scatter(x=totales['Fecha'], y=totales['Capital Total'], name='Capital Total',
+                             line=dict(color='#000', width=2, dash='dot'), mode='lines'))
+    fig.update_layout(height=450, plot_bgcolor='white', paper_bgcolor='white', yaxis=dict(tickformat='$,.0f'))
+    st.plotly_chart(fig, use_container_width=True)
+
+    ultimo_dia = activos[activos['Fecha'] == activos['Fecha'].max()].sort_values('Dinero', ascending=False)
+    tabla = ultimo_dia[['Items', 'Tipo de inversion', 'Dinero', 'Interes Mensual']].copy()
+    tabla['Dinero'] = tabla['Dinero'].apply(formato_pesos)
+    tabla['Interes Mensual'] = tabla['Interes Mensual'].apply(formato_pesos)
+    st.caption(f"Activos al {activos['Fecha'].max():%Y-%m-%d} (los meses antiguos se conservan con su último día registrado).")
+    st.dataframe(tabla, use_container_width=True, hide_index=True)
+
+    mostrar_analitica(analitica)
+
+def _formatear_analitica(df):
+    tabla = df.copy()
+    for columna in ['Valor inicial', 'Valor final', 'Tendencia mensual', 'Aportes netos', 'Rendimiento acumulado']:
+        tabla[columna] = tabla[columna].apply(formato_pesos)
+    for columna in ['Crecimiento (%)', 'Rentabilidad TWR declarada (%)', 'Rentabilidad MWR declarada anual (%)', 'Máxima caída (%)']:
+        tabla[columna] = tabla[columna].map(lambda valor: f"{valor:.2f}%" if pd.notna(valor) else "-")
+    return tabla
+
+def mostrar_analitica(analitica):
+    """Crecimiento, rentabilidades, caídas y descomposición aportes/rendimiento del rango."""
+    st.markdown("### 🧮 Analítica por Activo")
+    if analitica['portafolio'].empty:
+        st.info("Se necesitan snapshots de al menos dos días distintos en el rango para calcular la analítica.")
+        return
+
+    st.caption("El rendimiento de cada periodo es el 'Interes Mensual' del snapshot anterior prorrateado por días; "
+               "el resto del cambio de valor (incluidas valorizaciones o pérdidas de mercado) se atribuye a aportes "
+               "o retiros netos. Por eso las rentabilidades TWR y MWR reflejan el rendimiento declarado, no el de mercado.")
+    portafolio = analitica['portafolio'].iloc[0]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Rentabilidad TWR (declarada)", f"{portafolio['Rentabilidad TWR declarada (%)']:.2f}%")
+    col2.metric("Rentabilidad MWR anual (declarada)",
+                f"{portafolio['Rentabilidad MWR declarada anual (%)']:.2f}%" if pd.notna(portafolio['Rentabilidad MWR declarada anual (%)']) else "-")
+    col3.metric("Máxima caída", f"{portafolio['Máxima caída (%)']:.2f}%")
+    col4.metric("Aportes netos", formato_pesos(portafolio['Aportes netos']))
+
+    descomposicion = analitica['tipos'][['Aportes netos', 'Rendimiento acumulado']].reset_index()
+    fig = px.bar(descomposicion, x='Tipo de inversion', y=['Aportes netos', 'Rendimiento acumulado'],
+                 barmode='relative', title='Cambio de Capital: Aportes vs Rendimiento por Tipo')
+    fig.update_layout(height=400, plot_bgcolor='white', paper_bgcolor='white', yaxis=dict(tickformat='$,.0f'))
+    st.plotly_chart(fig, use_container_width=True)
+
+    tab_tipos, tab_activos = st.tabs(["Por tipo de inversión", "Por activo"])
+    with tab_tipos:
+        st.dataframe(_formatear_analitica(analitica['tipos']), use_container_width=True)
+    with tab_activos:
+        st.dataframe(_formatear_analitica(analitica['activos']), use_container_width=True)
 
 # Función para mostrar histórico y predicción
 def mostrar_historico():
@@ -58,7 +162,8 @@ def mostrar_historico():
         </div>
     """, unsafe_allow_html=True)
 
-    if not os.path.exists(RUTA_HISTORIAL):
+    historial = leer_snapshots()
+    if historial.empty:
         st.markdown("""
             <div style='background: linear-gradient(135deg, #a1c4fd 0%, #c2e9fb 100%); 
                         padding: 2rem; border-radius: 12px; text-align: center;'>
@@ -70,8 +175,6 @@ def mostrar_historico():
         """, unsafe_allow_html=True)
         return
 
-    historial = pd.read_csv(RUTA_HISTORIAL)
-
     # Indicadores de crecimiento
     if len(historial) > 1:
         capital_actual = historial["Capital Total"].iloc[-1]
@@ -152,20 +255,26 @@ def mostrar_historico():
     # Predicción para los próximos 6 meses
     st.markdown("### 🔮 Proyección a 6 Meses")
 
-    meses_pred = 6
+    meses_pred = MESES_PROYECCION
     fechas_existentes = list(historial["Fecha"])
-    X = np.arange(len(fechas_existentes)).reshape(-1, 1)
 
-    # Capital Total
-    y_capital = historial["Capital Total"].values
-    modelo_capital = LinearRegression().fit(X, y_capital)
-    X_pred = np.arange(len(fechas_existentes), len(fechas_existentes) + meses_pred).reshape(-1, 1)
-    capital_pred = modelo_capital.predict(X_pred)
-
-    # Ingreso Pasivo
-    y_ingreso = historial["Ingreso Pasivo"].values
-    modelo_ingreso = LinearRegression().fit(X, y_ingreso)
-    ingreso_pred = modelo_ingreso.predict(X_pred)
+    # Capital Total e Ingreso Pasivo: todos los modelos se evalúan con backtest de origen móvil
+    modelo = st.selectbox("Modelo de proyección:", [MODELO_AUTOMATICO, *MODELOS], key="modelo_proyeccion_historico")
+    pronostico_capital, pronostico_ingreso = proyectar_historial(historial, meses_pred)
+    modelo_capital, capital_pred = _elegir_pronostico(pronostico_capital, modelo)
+    modelo_ingreso, ingreso_pred = _elegir_pronostico(pronostico_ingreso, modelo)
+    st.caption(f"Modelo usado: capital → **{modelo_capital}**, ingreso pasivo → **{modelo_ingreso}**.")
+
+    with st.expander("📏 Error de cada modelo en el historial (backtest con origen móvil)"):
+        st.markdown("Cada modelo se ajusta con los meses disponibles hasta cada punto del historial y se "
+                    "compara su pronóstico con lo que realmente ocurrió después.")
+        col_capital, col_ingreso = st.columns(2)
+        with col_capital:
+            st.markdown("**Capital Total**")
+            st.dataframe(pronostico_capital['evaluacion'].round(2), use_container_width=True)
+        with col_ingreso:
+            st.markdown("**Ingreso Pasivo**")
+            st.dataframe(pronostico_ingreso['evaluacion'].round(2), use_container_width=True)
 
     # Fechas futuras
     ult_fecha = datetime.strptime(fechas_existentes[-1], "%Y-%m")
@@ -345,6 +454,8 @@ def mostrar_historico():
 
         st.plotly_chart(fig2, use_container_width=True)
 
+    mostrar_detalle_diario()
+
     # Tabla de predicción
     st.markdown("### 📈 Tabla de Proyección (6 meses)")
     
@@ -398,7 +509,7 @@ def mostrar_historico():
     # Confirmación para eliminar
     if st.checkbox("⚠️ Confirmo que deseo eliminar el historial completo"):
         if st.button("🗑️ Eliminar Historial", type="primary", use_container_width=True):
-            os.remove(RUTA_HISTORIAL)
+            borrar_snapshots()
             st.markdown("""
                 <div style='background: linear-gradient(135deg, #ff9a9e 0%, #fecfef 100%); 
                             padding: 1rem; border-radius: 10px; margin: 1rem 0;'>
@@ -2,17 +2,11 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime, date
-import json
-import os
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-# Configuración de la página
-st.set_page_config(page_title="Gestión de Activos Físicos", page_icon="🏢", layout="wide")
-
-# Define el nombre del archivo para guardar los activos físicos
-PHYSICAL_ASSETS_FILE = "physical_assets.json"
+from repositorio import guardar_activo_fisico, leer_activos_fisicos, sincronizar_activos_fisicos
 
 # --- Parámetros Agronómicos para Arroz (Valores de Referencia) ---
 PH_ARROZ_MIN = 5.5
@@ -37,19 +31,12 @@ def formato_pesos(valor):
     return f"${valor:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 def load_physical_assets():
-    """Carga los activos físicos desde un archivo JSON"""
-    if os.path.exists(PHYSICAL_ASSETS_FILE):
-        with open(PHYSICAL_ASSETS_FILE, 'r', encoding='utf-8') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return []
-    return []
+    """Carga los activos físicos desde el repositorio"""
+    return leer_activos_fisicos()
 
 def save_physical_assets(assets_list):
-    """Guarda los activos físicos en un archivo JSON"""
-    with open(PHYSICAL_ASSETS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(assets_list, f, indent=4, ensure_ascii=False)
+    """Sincroniza la lista de activos con el repositorio (solo escribe los que cambiaron)"""
+    sincronizar_activos_fisicos(assets_list)
 
 def calcular_depreciacion(valor_adquisicion, vida_util_anos, anos_transcurridos):
     """Calcula la depreciación lineal de un activo"""
@@ -385,7 +372,7 @@ def tab_ventas_ganaderas():
                             st.session_state.activos_fisicos[i] = activo_actualizado
                             break
                     
-                    save_physical_assets(st.session_state.activos_fisicos)
+                    guardar_activo_fisico(activo_actualizado)
                     st.success("✅ Venta registrada correctamente!")
                     st.rerun()
             
@@ -743,7 +730,7 @@ def gestionar_inversiones_fisicas():
                 
                 # Crear nuevo activo con campos específicos
                 nuevo_activo = {
-                    "ID": len(st.session_state.activos_fisicos) + 1,
+                    "ID": max((a.get("ID", 0) for a in st.session_state.activos_fisicos), default=0) + 1,
                     "Tipo": tipo_activo,
                     "Descripción": descripcion,
                     "Ubicación": ubicacion,
@@ -823,7 +810,7 @@ def gestionar_inversiones_fisicas():
                     })
                 
                 st.session_state.activos_fisicos.append(nuevo_activo)
-                save_physical_assets(st.session_state.activos_fisicos)
+                guardar_activo_fisico(nuevo_activo)
                 st.success("✅ Activo físico agregado correctamente.")
                 st.rerun()
                 
@@ -923,5 +910,8 @@ def gestionar_inversiones_fisicas():
         seccion_administracion_mejorada()
 
 # Ejecutar la aplicación
+# (la configuración de página solo aplica al ejecutar este módulo por separado;
+# dentro de app.py la página la configura el punto de entrada)
 if __name__ == "__main__":
+    st.set_page_config(page_title="Gestión de Activos Físicos", page_icon="🏢", layout="wide")
     gestionar_inversiones_fisicas()
\ No newline at end of file
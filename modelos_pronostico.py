@@ -0,0 +1,158 @@
+# modelos_pronostico.py
+# Modelos de pronóstico para series mensuales del histórico (Capital Total, Ingreso Pasivo).
+#
+# Cada modelo recibe la serie completa y devuelve en una sola pasada los pronósticos desde
+# todos los orígenes posibles: una matriz (n x pasos) donde la fila o es el pronóstico de
+# y[o + 1], ..., y[o + pasos] usando solo y[0..o]. Los ajustes por prefijo se obtienen con
+# sumas acumuladas (regresiones) o con un único recorrido de la serie (Holt), de modo que el
+# backtest con origen móvil de todos los modelos cuesta lo mismo que un ajuste.
+#
+# Los modelos se registran en MODELOS; se pueden agregar otros con `registrar_modelo`.
+
+import numpy as np
+import pandas as pd
+
+MINIMO_ENTRENAMIENTO = 3
+MODELO_POR_DEFECTO = "Lineal"
+# Grilla de suavizamiento de Holt (nivel, tendencia); en cada origen se usa la pareja con menor
+# error de un paso acumulado hasta ese origen
+ALFAS_HOLT = (0.2, 0.4, 0.6, 0.8, 1.0)
+BETAS_HOLT = (0.05, 0.1, 0.2, 0.4)
+
+def _horizontes(n, pasos):
+    """Matriz (n x pasos) con la posición pronosticada desde cada origen: o + 1, ..., o + pasos."""
+    return np.arange(n)[:, None] + np.arange(1, pasos + 1)[None, :]
+
+def _recta_por_prefijo(y):
+    """Pendiente e intercepto de la recta de mínimos cuadrados de cada prefijo y[0..o]."""
+    n = len(y)
+    x = np.arange(n, dtype=float)
+    m = x + 1
+    suma_x = np.cumsum(x)
+    suma_xx = np.cumsum(x * x)
+    suma_y = np.cumsum(y)
+    suma_xy = np.cumsum(x * y)
+    denominador = m * suma_xx - suma_x ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pendiente = np.where(denominador > 0, (m * suma_xy - suma_x * suma_y) / denominador, 0.0)
+    return pendiente, (suma_y - pendiente * suma_x) / m
+
+def modelo_lineal(y, pasos, ingreso=None):
+    """Tendencia lineal sobre el número de mes."""
+    pendiente, intercepto = _recta_por_prefijo(y)
+    return intercepto[:, None] + pendiente[:, None] * _horizontes(len(y), pasos)
+
+def modelo_crecimiento_compuesto(y, pasos, ingreso=None):
+    """Crecimiento a tasa constante (recta sobre el logaritmo). NaN en orígenes con valores <= 0."""
+    positivos = y > 0
+    pendiente, intercepto = _recta_por_prefijo(np.log(np.where(positivos, y, 1.0)))
+    valido = np.cumsum(~positivos) == 0
+    with np.errstate(over='ignore'):
+        pronostico = np.exp(intercepto[:, None] + pendiente[:, None] * _horizontes(len(y), pasos))
+    return np.where(valido[:, None], pronostico, np.nan)
+
+def modelo_holt(y, pasos, ingreso=None, alfas=ALFAS_HOLT, betas=BETAS_HOLT):
+    """Suavizamiento exponencial de Holt (nivel + tendencia) con toda la grilla de parámetros a la vez."""
+    alfa, beta = (np.ravel(v) for v in np.meshgrid(alfas, betas))
+    n = len(y)
+    nivel = np.full(alfa.shape, y[0], dtype=float)
+    tendencia = np.zeros(alfa.shape)
+    error_acumulado = np.zeros(alfa.shape)
+    niveles, tendencias, errores = [nivel], [tendencia], [error_acumulado]
+    for t in range(1, n):
+        esperado = nivel + tendencia
+        error_acumulado = error_acumulado + (y[t] - esperado) ** 2
+        nuevo_nivel = alfa * y[t] + (1 - alfa) * esperado
+        tendencia = beta * (nuevo_nivel - nivel) + (1 - beta) * tendencia
+        nivel = nuevo_nivel
+        niveles.append(nivel)
+        tendencias.append(tendencia)
+        errores.append(error_acumulado)
+    filas = np.arange(n)
+    mejor = np.argmin(np.array(errores), axis=1)
+    nivel_origen = np.array(niveles)[filas, mejor]
+    tendencia_origen = np.array(tendencias)[filas, mejor]
+    return nivel_origen[:, None] + tendencia_origen[:, None] * np.arange(1, pasos + 1)[None, :]
+
+def modelo_aportes(y, pasos, ingreso=None):
+    """
+    Crecimiento con aportes: cada mes el capital rinde su rendimiento mensual promedio
+    (Ingreso Pasivo / Capital) y recibe el aporte neto promedio observado. Sin `ingreso`
+    el rendimiento es 0 y el modelo se reduce a una deriva constante.
+    """
+    n = len(y)
+    if ingreso is None:
+        rendimientos = np.zeros(n)
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rendimientos = np.where(y > 0, np.asarray(ingreso, dtype=float) / y, 0.0)
+    conteo = np.arange(1, n + 1)
+    rendimiento = np.cumsum(rendimientos) / conteo
+    # Aporte de cada mes: lo que cambió el capital además de su rendimiento
+    aportes = np.diff(y) - y[:-1] * rendimientos[:-1]
+    aporte = np.concatenate(([0.0], np.cumsum(aportes) / np.arange(1, n)))
+
+    j = np.arange(1, pasos + 1)[None, :]
+    factor = (1 + rendimiento[:, None]) ** j
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acumulado_aportes = np.where(rendimiento[:, None] != 0, (factor - 1) / rendimiento[:, None], j)
+    return y[:, None] * factor + aporte[:, None] * acumulado_aportes
+
+MODELOS = {
+    "Lineal": modelo_lineal,
+    "Crecimiento compuesto": modelo_crecimiento_compuesto,
+    "Holt": modelo_holt,
+    "Crecimiento con aportes": modelo_aportes,
+}
+
+def registrar_modelo(nombre, funcion):
+    """Agrega (o reemplaza) un modelo: funcion(y, pasos, ingreso=None) -> matriz (n x pasos)."""
+    MODELOS[nombre] = funcion
+
+def backtest(y, pronosticos, minimo=MINIMO_ENTRENAMIENTO):
+    """
+    Errores con origen móvil de una matriz de pronósticos: se comparan los orígenes con al menos
+    `minimo` observaciones contra los valores reales ya conocidos. Devuelve MAPE (%), RMSE y la
+    cantidad de pronósticos evaluados.
+    """
+    n, pasos = pronosticos.shape
+    posiciones = _horizontes(n, pasos)
+    evaluable = (posiciones < n) & (np.arange(n)[:, None] >= minimo - 1)
+    reales = np.asarray(y, dtype=float)[np.minimum(posiciones, n - 1)]
+    errores = np.where(evaluable, pronosticos - reales, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        porcentuales = np.where(evaluable & (reales != 0), np.abs(errores / reales), np.nan)
+    evaluados = int(np.count_nonzero(evaluable & ~np.isnan(errores)))
+    if evaluados == 0:
+        return {'MAPE (%)': np.nan, 'RMSE': np.nan, 'Pronósticos evaluados': 0}
+    return {
+        'MAPE (%)': np.nanmean(porcentuales) * 100 if np.any(~np.isnan(porcentuales)) else np.nan,
+        'RMSE': float(np.sqrt(np.nanmean(errores ** 2))),
+        'Pronósticos evaluados': evaluados,
+    }
+
+def pronosticar(y, pasos, ingreso=None, modelos=None, minimo=MINIMO_ENTRENAMIENTO):
+    """
+    Ajusta todos los modelos, los evalúa con backtest de origen móvil y elige el de menor MAPE
+    (RMSE si no hay MAPE; MODELO_POR_DEFECTO si la historia es demasiado corta para evaluar).
+
+    Devuelve {'mejor': nombre, 'evaluacion': DataFrame por modelo, 'pronosticos': {nombre: arreglo}}.
+    """
+    y = np.asarray(y, dtype=float)
+    modelos = MODELOS if modelos is None else modelos
+    evaluacion, pronosticos = {}, {}
+    for nombre, modelo in modelos.items():
+        matriz = modelo(y, pasos, ingreso=ingreso)
+        pronosticos[nombre] = matriz[-1]
+        evaluacion[nombre] = backtest(y, matriz, minimo)
+
+    evaluacion = pd.DataFrame.from_dict(evaluacion, orient='index')
+    evaluacion.index.name = 'Modelo'
+    # Solo compiten los modelos con un pronóstico final válido (p. ej. sin logaritmos de valores <= 0)
+    validos = evaluacion.loc[[nombre for nombre, pronostico in pronosticos.items() if np.isfinite(pronostico).all()]]
+    criterio = 'MAPE (%)' if validos['MAPE (%)'].notna().any() else 'RMSE'
+    if validos[criterio].notna().any():
+        mejor = validos[criterio].idxmin()
+    else:
+        mejor = MODELO_POR_DEFECTO if MODELO_POR_DEFECTO in pronosticos else next(iter(pronosticos))
+    return {'mejor': mejor, 'evaluacion': evaluacion.sort_values([criterio]), 'pronosticos': pronosticos}
@@ -0,0 +1,146 @@
+# montecarlo.py
+# Motor de proyecciones Monte Carlo del portafolio.
+# Simula N trayectorias × meses como arreglos de NumPy (por bloques de trayectorias,
+# para que la memoria no crezca con N) y devuelve bandas de percentiles y
+# probabilidades de alcanzar la meta.
+
+import numpy as np
+
+# Valores por defecto de la incertidumbre (todos en términos relativos / anuales)
+VOLATILIDAD_TASA_DEFECTO = 0.30        # Desviación de la tasa de cada activo, relativa a su tasa media
+VOLATILIDAD_INFLACION_DEFECTO = 1.0    # Desviación anual de la inflación, en puntos porcentuales
+VOLATILIDAD_APORTE_DEFECTO = 0.10      # Desviación del aporte mensual, relativa al aporte
+TRAYECTORIAS_POR_BLOQUE = 5_000
+PUNTOS_MAXIMOS_BANDAS = 121            # Meses muestreados para las bandas (limita la memoria)
+
+def tasas_activos_portafolio(df):
+    """
+    Deriva del portafolio la tasa mensual de cada activo (Interes Mensual / Dinero)
+    y su peso en el capital. Devuelve (tasas, pesos, capital_total) como arreglos.
+    """
+    dinero = df['Dinero'].to_numpy(dtype=float)
+    interes = df['Interes Mensual'].to_numpy(dtype=float)
+    capital_total = dinero.sum()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tasas = np.where(dinero > 0, interes / dinero, 0.0)
+    pesos = dinero / capital_total if capital_total > 0 else np.zeros_like(dinero)
+    return tasas, pesos, capital_total
+
+def _normales(rng, out, media, desviacion, desplazamiento=0.0):
+    """Llena `out` (float32) con Normal(media, desviacion) + desplazamiento; sin muestrear si la desviación es 0."""
+    if desviacion == 0:
+        out.fill(media + desplazamiento)
+        return out
+    rng.standard_normal(out=out, dtype=np.float32)
+    out *= desviacion
+    out += media + desplazamiento
+    return out
+
+def simular_montecarlo(capital_inicial, tasas_activos, pesos, meses, n_trayectorias=10_000,
+                       aporte_mensual=0.0, volatilidad_tasa=VOLATILIDAD_TASA_DEFECTO,
+                       inflacion_anual=0.0, volatilidad_inflacion=VOLATILIDAD_INFLACION_DEFECTO,
+                       volatilidad_aporte=VOLATILIDAD_APORTE_DEFECTO, meta=None,
+                       percentiles=(5, 50, 95), trayectorias_por_bloque=TRAYECTORIAS_POR_BLOQUE,
+                       semilla=None):
+    """
+    Simula la evolución del capital con rendimientos, inflación y aportes inciertos.
+
+    Modelo mensual por trayectoria:  C_t = (C_{t-1} + aporte_t) × (1 + r_t)
+    - r_t: tasa del portafolio. Cada activo i tiene tasa ~ Normal(r_i, volatilidad_tasa·r_i),
+      independiente entre activos; la suma ponderada se muestrea directamente como
+      Normal(Σ w_i·r_i, sqrt(Σ w_i²·σ_i²)) (pesos constantes, es decir, rebalanceo mensual).
+    - Inflación mensual ~ Normal(inflacion_anual/12, volatilidad_inflacion/√12), en %.
+    - aporte_t = aporte_mensual × max(0, Normal(1, volatilidad_aporte)).
+
+    La recurrencia se resuelve sin bucle por mes: con G_t = Π(1 + r_j),
+    C_t = G_t · (C_0 + Σ_{k≤t} aporte_k / G_{k-1}), usando cumprod/cumsum.
+
+    Devuelve un diccionario con:
+    - 'meses': meses muestreados para las bandas
+    - 'nominal' / 'real': {percentil: arreglo} del capital nominal y en pesos de hoy
+    - 'prob_meta': probabilidad de alcanzar la meta dentro del horizonte (si se indica meta)
+    - 'prob_meta_por_mes': probabilidad acumulada de haberla alcanzado en cada mes muestreado
+    - 'mediana_meses_meta': mediana del mes en que se alcanza (inf si menos del 50% la alcanza)
+    """
+    rng = np.random.default_rng(semilla)
+    tasas_activos = np.asarray(tasas_activos, dtype=float)
+    pesos = np.asarray(pesos, dtype=float)
+    meses = int(meses)
+
+    tasa_media = float(np.sum(pesos * tasas_activos))
+    desviacion_tasa = float(np.sqrt(np.sum((pesos * volatilidad_tasa * np.abs(tasas_activos)) ** 2)))
+    inflacion_media = inflacion_anual / 100 / 12
+    desviacion_inflacion = volatilidad_inflacion / 100 / np.sqrt(12)
+
+    # Meses que se guardan para las bandas (0 = hoy)
+    paso = max(1, int(np.ceil(meses / (PUNTOS_MAXIMOS_BANDAS - 1))))
+    meses_muestra = np.arange(0, meses + 1, paso)
+    if meses_muestra[-1] != meses:
+        meses_muestra = np.append(meses_muestra, meses)
+    indices_muestra = meses_muestra[1:] - 1  # columnas dentro de la matriz de meses 1..N
+
+    # Meses muestreados × trayectorias: cada percentil se calcula sobre una fila contigua
+    nominal = np.empty((len(meses_muestra), n_trayectorias), dtype=np.float32)
+    real = np.empty((len(meses_muestra), n_trayectorias), dtype=np.float32)
+    mes_meta = np.full(n_trayectorias, np.inf)
+
+    # Los bloques reutilizan tres arreglos float32 de trayectorias × meses y operan in-place
+    filas_bloque = min(trayectorias_por_bloque, n_trayectorias)
+    memoria_crecimiento, memoria_aportes, memoria_precios = (
+        np.empty((filas_bloque, meses), dtype=np.float32) for _ in range(3)
+    )
+
+    for inicio in range(0, n_trayectorias, trayectorias_por_bloque):
+        fin = min(inicio + trayectorias_por_bloque, n_trayectorias)
+        n = fin - inicio
+
+        crecimiento = _normales(rng, memoria_crecimiento[:n], tasa_media, desviacion_tasa, desplazamiento=1.0)
+        np.maximum(crecimiento, 0.01, out=crecimiento)
+        np.cumprod(crecimiento, axis=1, out=crecimiento)
+
+        if aporte_mensual:
+            # C_t = G_t · (C_0 + Σ_{k≤t} aporte_k / G_{k-1}), con G_0 = 1
+            capital = _normales(rng, memoria_aportes[:n], 1.0, volatilidad_aporte)
+            np.maximum(capital, 0.0, out=capital)
+            capital *= aporte_mensual
+            capital[:, 1:] /= crecimiento[:, :-1]
+            np.cumsum(capital, axis=1, out=capital)
+            capital += capital_inicial
+            capital *= crecimiento
+        else:
+            capital = crecimiento
+            capital *= capital_inicial
+
+        indice_precios = _normales(rng, memoria_precios[:n], inflacion_media, desviacion_inflacion, desplazamiento=1.0)
+        np.cumprod(indice_precios, axis=1, out=indice_precios)
+
+        muestra = capital[:, indices_muestra]
+        nominal[0, inicio:fin] = capital_inicial
+        real[0, inicio:fin] = capital_inicial
+        nominal[1:, inicio:fin] = muestra.T
+        real[1:, inicio:fin] = (muestra / indice_precios[:, indices_muestra]).T
+
+        if meta is not None:
+            alcanzada = capital >= meta
+            tiene_meta = alcanzada.any(axis=1)
+            primer_mes = np.argmax(alcanzada, axis=1) + 1
+            mes_meta[inicio:fin] = np.where(tiene_meta, primer_mes, np.inf)
+            if capital_inicial >= meta:
+                mes_meta[inicio:fin] = 0
+
+    resultado = {
+        'meses': meses_muestra,
+        'nominal': dict(zip(percentiles, np.percentile(nominal, percentiles, axis=1))),
+        'real': dict(zip(percentiles, np.percentile(real, percentiles, axis=1))),
+        'tasa_media_mensual': tasa_media,
+        'desviacion_tasa_mensual': desviacion_tasa,
+        'n_trayectorias': n_trayectorias,
+    }
+
+    if meta is not None:
+        resultado['prob_meta'] = float(np.mean(np.isfinite(mes_meta)))
+        resultado['prob_meta_por_mes'] = (mes_meta[:, None] <= meses_muestra[None, :]).mean(axis=0)
+        resultado['mediana_meses_meta'] = float(np.median(mes_meta))
+
+    return resultado
@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
-import json
-import os
 
-# Define el nombre del archivo para guardar los parámetros del optimizador
-OPTIMIZADOR_PARAMS_FILE = "optimizador_params.json"
+from repositorio import guardar_parametros, leer_parametros
+
+# Grupo de parámetros del optimizador en el repositorio
+OPTIMIZADOR_PARAMS_GRUPO = "optimizador"
 
 # Funcion para formatear valores monetarios en pesos colombianos
 def formato_pesos(valor):
@@ -13,21 +13,13 @@ def formato_pesos(valor):
 
 def load_optimizador_params():
     """
-    Carga los parámetros del optimizador desde un archivo JSON.
-    Retorna un diccionario con los parámetros o valores por defecto si el archivo no existe o está vacío.
+    Carga los parámetros del optimizador desde el repositorio.
+    Retorna un diccionario con los parámetros o valores por defecto si aún no se han guardado.
     """
-    if os.path.exists(OPTIMIZADOR_PARAMS_FILE):
-        with open(OPTIMIZADOR_PARAMS_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                # Si el archivo está vacío o mal formado, retornar valores por defecto
-                return {
-                    "tasa_minima": 0.5,
-                    "porcentaje_objetivo": 70,
-                    "tasa_simulada": 0.5
-                }
-    # Si el archivo no existe, retornar valores por defecto
+    params = leer_parametros(OPTIMIZADOR_PARAMS_GRUPO)
+    if params:
+        return params
+    # Si no hay parámetros guardados, retornar valores por defecto
     return {
         "tasa_minima": 0.5,
         "porcentaje_objetivo": 70,
@@ -36,10 +28,9 @@ def load_optimizador_params():
 
 def save_optimizador_params(params_dict):
     """
-    Guarda los parámetros del optimizador en un archivo JSON.
+    Guarda los parámetros del optimizador en el repositorio.
     """
-    with open(OPTIMIZADOR_PARAMS_FILE, 'w') as f:
-        json.dump(params_dict, f, indent=4)
+    guardar_parametros(OPTIMIZADOR_PARAMS_GRUPO, params_dict)
 
 def sugerir_rebalanceo(df):
     st.header("🧠 Asistente de Rebalanceo Inteligente")
@@ -48,10 +39,8 @@ def sugerir_rebalanceo(df):
         st.warning("Para utilizar el asistente de rebalanceo, por favor, carga tu portafolio primero.")
         return
 
-    # Limpieza de datos: Asegurarse de que 'Dinero' sea numérico y 'Interes Mensual' también
+    # El portafolio canónico ya trae 'Dinero' e 'Interes Mensual' numéricos; se copia para agregar columnas
     df_cleaned = df.copy()
-    df_cleaned['Dinero'] = pd.to_numeric(df_cleaned['Dinero'].replace('[\$,]', '', regex=True), errors='coerce').fillna(0)
-    df_cleaned['Interes Mensual'] = pd.to_numeric(df_cleaned['Interes Mensual'].replace('[\%,]', '', regex=True), errors='coerce').fillna(0)
     # Calcular la tasa de interés mensual en porcentaje para cada inversión
     df_cleaned['Tasa Mensual (%)'] = (df_cleaned['Interes Mensual'] / df_cleaned['Dinero']) * 100
     # Manejar casos donde 'Dinero' es cero para evitar NaN o Inf
@@ -170,10 +159,8 @@ def simular_activacion_activos(df):
         st.warning("Para utilizar el simulador de activación de activos, por favor, carga tu portafolio primero.")
         return
 
-    # Limpieza y preparación de datos
+    # El portafolio canónico ya viene limpio; se copia para agregar columnas
     df_cleaned = df.copy()
-    df_cleaned['Dinero'] = pd.to_numeric(df_cleaned['Dinero'].replace('[\$,]', '', regex=True), errors='coerce').fillna(0)
-    df_cleaned['Interes Mensual'] = pd.to_numeric(df_cleaned['Interes Mensual'], errors='coerce').fillna(0)
     
     # Calcular Interes anual en % (si 'Interes Mensual' es un monto)
     # Si 'Interes Mensual' ya es un porcentaje, esta línea podría necesitar ajuste o eliminación.
@@ -2,9 +2,11 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-import json
-import os
 from datetime import datetime, timedelta
+from functools import partial
+
+from repositorio import guardar_parametros, leer_parametros
+from valoracion import SIMBOLOS_MONEDA, composicion_por_moneda, etiquetar_monedas, portafolio_en_moneda_reporte
 
 # Verificar si plotly está disponible
 try:
@@ -15,46 +17,38 @@ try:
 except ImportError:
     PLOTLY_AVAILABLE = False
 
-# Configuración de estilo para matplotlib
-plt.style.use('default')
-plt.rcParams['figure.figsize'] = (10, 6)
-plt.rcParams['axes.grid'] = True
+# Estilo de matplotlib para los gráficos de este módulo. No se modifica el estado
+# global al importar: se aplica con plt.rc_context solo mientras se dibuja la página.
+ESTILO_GRAFICOS = {'figure.figsize': (10, 6), 'axes.grid': True}
 
-# Define el nombre del archivo para guardar los parámetros de las metas de KPIs
-KPI_META_PARAMS_FILE = "kpi_meta_params.json"
+# Grupo de parámetros de las metas de KPIs en el repositorio
+KPI_META_PARAMS_GRUPO = "kpi_meta"
 
 # ========================================
 # FUNCIONES AUXILIARES
 # ========================================
 
-def formato_pesos(valor):
+def formato_pesos(valor, simbolo="$"):
     """Formatea el numero con separador de miles como '.' y decimal como ','"""
-    return f"${valor:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"{simbolo}{valor:,.0f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 def formato_porcentaje(valor):
     """Formatea porcentajes con 2 decimales"""
     return f"{valor:.2f}%"
 
 def load_kpis_meta_params():
-    """Carga los parámetros de las metas de KPIs desde un archivo JSON."""
-    if os.path.exists(KPI_META_PARAMS_FILE):
-        with open(KPI_META_PARAMS_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {
-                    "meta_capital": 50_000_000.0,
-                    "meta_ingreso_pasivo": 1_000_000.0
-                }
+    """Carga los parámetros de las metas de KPIs desde el repositorio."""
+    params = leer_parametros(KPI_META_PARAMS_GRUPO)
+    if params:
+        return params
     return {
         "meta_capital": 50_000_000.0,
         "meta_ingreso_pasivo": 1_000_000.0
     }
 
 def save_kpis_meta_params(params_dict):
-    """Guarda los parámetros de las metas de KPIs en un archivo JSON."""
-    with open(KPI_META_PARAMS_FILE, 'w') as f:
-        json.dump(params_dict, f, indent=4)
+    """Guarda los parámetros de las metas de KPIs en el repositorio."""
+    guardar_parametros(KPI_META_PARAMS_GRUPO, params_dict)
 
 # ========================================
 # MÓDULO DE ANÁLISIS DE PORTAFOLIO
@@ -64,6 +58,7 @@ def save_kpis_meta_params(params_dict):
 # MÓDULO DE ANÁLISIS DE PORTAFOLIO - VERSIÓN MEJORADA
 # ========================================
 
+@plt.rc_context(ESTILO_GRAFICOS)
 def analizar_portafolio(df):
     # Encabezado con estilo mejorado
     st.markdown("""
@@ -78,10 +73,13 @@ def analizar_portafolio(df):
         </div>
     """, unsafe_allow_html=True)
 
-    # Limpieza de datos
+    # El portafolio canónico llega limpio; se valora en la moneda de reporte y se copia
+    # solo porque se agregan columnas
+    monedas_portafolio = etiquetar_monedas(df)
+    df_original = df
+    df, moneda = portafolio_en_moneda_reporte(df)
     df = df.copy()
-    df['Dinero'] = df['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-    df['Interes Mensual'] = df['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
+    formato_valor = partial(formato_pesos, simbolo=SIMBOLOS_MONEDA.get(moneda, "$"))
 
     # Cálculos generales
     capital_total = df['Dinero'].sum()
@@ -104,7 +102,7 @@ def analizar_portafolio(df):
             <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
                         padding: 1.5rem; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);'>
                 <p style='color: rgba(255,255,255,0.8); margin: 0; font-size: 0.9rem;'>💰 Capital Total</p>
-                <h2 style='color: white; margin: 0.5rem 0 0 0; font-size: 1.8rem;'>{formato_pesos(capital_total)}</h2>
+                <h2 style='color: white; margin: 0.5rem 0 0 0; font-size: 1.8rem;'>{formato_valor(capital_total)}</h2>
             </div>
         """, unsafe_allow_html=True)
     
@@ -113,7 +111,7 @@ def analizar_portafolio(df):
             <div style='background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%); 
                         padding: 1.5rem; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1);'>
                 <p style='color: rgba(255,255,255,0.8); margin: 0; font-size: 0.9rem;'>📈 Ingresos Mensuales</p>
-                <h2 style='color: white; margin: 0.5rem 0 0 0; font-size: 1.8rem;'>{formato_pesos(ingresos_mensuales)}</h2>
+                <h2 style='color: white; margin: 0.5rem 0 0 0; font-size: 1.8rem;'>{formato_valor(ingresos_mensuales)}</h2>
             </div>
         """, unsafe_allow_html=True)
     
@@ -138,6 +136,14 @@ def analizar_portafolio(df):
 
     st.markdown("<br>", unsafe_allow_html=True)
 
+    # Portafolio con activos en varias monedas: capital e ingreso por moneda de origen
+    if monedas_portafolio.nunique() > 1:
+        with st.expander("💱 Composición por moneda", expanded=False):
+            try:
+                st.dataframe(composicion_por_moneda(df_original, moneda), use_container_width=True, hide_index=True)
+            except ValueError as e:
+                st.error(f"No se pudo calcular la composición por moneda: {e}")
+
     # ========================================
     # GRÁFICO DE DISTRIBUCIÓN DEL CAPITAL
     # ========================================
@@ -183,7 +189,7 @@ def analizar_portafolio(df):
                     colorscale='Viridis',
                     showscale=False
                 ),
-                text=[formato_pesos(val) for val in top_5_capital['Dinero']],
+                text=[formato_valor(val) for val in top_5_capital['Dinero']],
                 textposition='outside'
             )])
             fig_bar.update_layout(
@@ -219,8 +225,8 @@ def analizar_portafolio(df):
             
             top_5 = df.sort_values(by="Interes Mensual", ascending=False).head(5).copy()
             top_5_display = top_5[['Personas', 'Dinero', 'Interes Mensual', 'Tasa (%)']].copy()
-            top_5_display["Dinero"] = top_5_display["Dinero"].map(formato_pesos)
-            top_5_display["Interes Mensual"] = top_5_display["Interes Mensual"].map(formato_pesos)
+            top_5_display["Dinero"] = top_5_display["Dinero"].map(formato_valor)
+            top_5_display["Interes Mensual"] = top_5_display["Interes Mensual"].map(formato_valor)
             top_5_display["Tasa (%)"] = top_5_display["Tasa (%)"].map(formato_porcentaje)
             
             # Aplicar estilo con colores
@@ -241,8 +247,8 @@ def analizar_portafolio(df):
             low_5 = df[df['Interes Mensual'] > 0].sort_values(by="Interes Mensual", ascending=True).head(5).copy()
             if not low_5.empty:
                 low_5_display = low_5[['Personas', 'Dinero', 'Interes Mensual', 'Tasa (%)']].copy()
-                low_5_display["Dinero"] = low_5_display["Dinero"].map(formato_pesos)
-                low_5_display["Interes Mensual"] = low_5_display["Interes Mensual"].map(formato_pesos)
+                low_5_display["Dinero"] = low_5_display["Dinero"].map(formato_valor)
+                low_5_display["Interes Mensual"] = low_5_display["Interes Mensual"].map(formato_valor)
                 low_5_display["Tasa (%)"] = low_5_display["Tasa (%)"].map(formato_porcentaje)
                 st.dataframe(low_5_display, use_container_width=True, hide_index=True)
             else:
@@ -307,8 +313,8 @@ def analizar_portafolio(df):
         st.markdown("### 📋 Tabla Completa del Portafolio")
         
         df_tabla = df[['Personas', 'Tipo de inversion', 'Dinero', 'Interes Mensual', 'Tasa (%)']].sort_values(by='Tasa (%)', ascending=False).copy()
-        df_tabla["Dinero"] = df_tabla["Dinero"].map(formato_pesos)
-        df_tabla["Interes Mensual"] = df_tabla["Interes Mensual"].map(formato_pesos)
+        df_tabla["Dinero"] = df_tabla["Dinero"].map(formato_valor)
+        df_tabla["Interes Mensual"] = df_tabla["Interes Mensual"].map(formato_valor)
         df_tabla["Tasa (%)"] = df_tabla["Tasa (%)"].map(formato_porcentaje)
         
         st.dataframe(df_tabla, use_container_width=True, hide_index=True, height=400)
@@ -319,8 +325,8 @@ def analizar_portafolio(df):
         if not df_bajo.empty:
             st.warning(f"⚠️ **{len(df_bajo)} inversiones** con rendimiento < 0.5% mensual")
             df_bajo_display = df_bajo[['Personas', 'Dinero', 'Interes Mensual', 'Tasa (%)']].copy()
-            df_bajo_display["Dinero"] = df_bajo_display["Dinero"].map(formato_pesos)
-            df_bajo_display["Interes Mensual"] = df_bajo_display["Interes Mensual"].map(formato_pesos)
+            df_bajo_display["Dinero"] = df_bajo_display["Dinero"].map(formato_valor)
+            df_bajo_display["Interes Mensual"] = df_bajo_display["Interes Mensual"].map(formato_valor)
             df_bajo_display["Tasa (%)"] = df_bajo_display["Tasa (%)"].map(formato_porcentaje)
             st.dataframe(df_bajo_display, use_container_width=True, hide_index=True)
         else:
@@ -343,7 +349,7 @@ def analizar_portafolio(df):
                         <strong>{mejor['Personas']}</strong> genera <strong>{formato_porcentaje(mejor['Tasa (%)'])}</strong> mensual
                     </p>
                     <p style='margin: 0.5rem 0 0 0; color: #666;'>
-                        Ingreso mensual: {formato_pesos(mejor['Interes Mensual'])}
+                        Ingreso mensual: {formato_valor(mejor['Interes Mensual'])}
                     </p>
                 </div>
             """, unsafe_allow_html=True)
@@ -375,14 +381,14 @@ def analizar_portafolio(df):
                                 padding: 1.5rem; border-radius: 12px; margin-bottom: 1rem;'>
                         <h4 style='margin: 0 0 0.5rem 0; color: #333;'>💰 Oportunidad de Optimización</h4>
                         <p style='margin: 0; color: #555; font-size: 1rem;'>
-                            Tienes <strong>{formato_pesos(capital_improductivo)}</strong> sin generar ingresos
+                            Tienes <strong>{formato_valor(capital_improductivo)}</strong> sin generar ingresos
                         </p>
                         <p style='margin: 0.8rem 0 0 0; color: #333; font-size: 1.1rem; background: white; padding: 1rem; border-radius: 8px;'>
                             <strong>💡 Potencial:</strong> Si reinviertes al {formato_porcentaje(mejor_tasa)} mensual, 
-                            generarías <strong>{formato_pesos(ingreso_potencial)}</strong> adicionales cada mes
+                            generarías <strong>{formato_valor(ingreso_potencial)}</strong> adicionales cada mes
                         </p>
                         <p style='margin: 0.5rem 0 0 0; color: #666; font-size: 0.9rem;'>
-                            Proyección anual: {formato_pesos(ingreso_potencial * 12)}
+                            Proyección anual: {formato_valor(ingreso_potencial * 12)}
                         </p>
                     </div>
                 """, unsafe_allow_html=True)
@@ -403,6 +409,7 @@ def analizar_portafolio(df):
 # MÓDULO DE KPIs Y METAS - VERSIÓN MEJORADA
 # ========================================
 
+@plt.rc_context(ESTILO_GRAFICOS)
 def mostrar_kpis(df):
     # Encabezado con estilo mejorado
     st.markdown("""
@@ -457,10 +464,8 @@ def mostrar_kpis(df):
         "meta_ingreso_pasivo": meta_ingreso_pasivo
     })
 
-    # Limpieza y cálculos
+    # Cálculos (se copia porque más abajo se agregan columnas de brecha y estado)
     df = df.copy()
-    df['Dinero'] = df['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-    df['Interes Mensual'] = df['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
 
     capital_total = df['Dinero'].sum()
     capital_productivo = df[df['Interes Mensual'] > 0]['Dinero'].sum()
@@ -895,11 +900,6 @@ def simular_proyecciones_integrado(df):
         format="%.2f"
     )
 
-    # Limpieza de datos
-    df = df.copy()
-    df['Dinero'] = df['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-    df['Interes Mensual'] = df['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
-
     # Calcular métricas y proyecciones
     metricas = calcular_metricas_financieras(df)
     df_proyecciones = calcular_proyecciones_compuestas(df)
@@ -992,9 +992,7 @@ def sistema_financiero_completo(df):
         
         # Estadísticas básicas
         st.subheader("📊 Estadísticas Básicas")
-        df_stats = df.copy()
-        df_stats['Dinero'] = df_stats['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-        df_stats['Interes Mensual'] = df_stats['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
+        df_stats = df
         
         col1, col2 = st.columns(2)
         with col1:
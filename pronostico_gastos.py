@@ -0,0 +1,98 @@
+# pronostico_gastos.py
+# Pronóstico de gastos por categoría y detección de transacciones atípicas.
+#
+# - El pronóstico parte de los totales por mes y categoría (tabla gastos_mensuales) y trabaja
+#   sobre una matriz meses x categorías: promedio móvil, base estacional (promedio del mismo
+#   mes calendario en años anteriores) y proyección del mes siguiente se calculan para todas
+#   las categorías a la vez, sin recorrerlas una por una.
+# - Las anomalías se marcan con un puntaje z robusto (mediana y desviación absoluta mediana de
+#   cada categoría), calculado en una sola pasada con transform sobre todas las transacciones.
+
+import numpy as np
+import pandas as pd
+
+VENTANA_PROMEDIO_MESES = 3
+MESES_TEMPORADA = 12
+UMBRAL_ANOMALIA = 3.5
+# Escala para que la desviación absoluta mediana equivalga a la desviación estándar (datos normales)
+CONSTANTE_MAD = 0.6745
+
+def matriz_mensual(totales, hasta=None):
+    """
+    Matriz meses x categorías a partir de un DataFrame con 'Mes' (periodo mensual), 'Categoria' y
+    'Monto'. Incluye todos los meses entre el primero y `hasta` (los meses sin movimientos quedan en 0).
+    """
+    if hasta is not None:
+        totales = totales[totales['Mes'] <= hasta]
+    if totales.empty:
+        return pd.DataFrame(dtype=float)
+    matriz = totales.pivot_table(index='Mes', columns='Categoria', values='Monto', aggfunc='sum', fill_value=0.0)
+    meses = pd.period_range(matriz.index.min(), hasta if hasta is not None else matriz.index.max(), freq='M')
+    return matriz.reindex(meses, fill_value=0.0).astype(float)
+
+def pronosticar_gastos(totales, hasta=None, ventana=VENTANA_PROMEDIO_MESES):
+    """
+    Proyección del mes siguiente a `hasta` (por defecto, al último mes con datos) para cada categoría.
+
+    Devuelve un DataFrame indexado por categoría con 'Último mes', 'Promedio móvil' (últimos
+    `ventana` meses), 'Base estacional' (promedio del mismo mes calendario en años anteriores, NaN
+    si no hay), 'Índice estacional' y 'Proyección' (promedio móvil ajustado por el índice), más el
+    atributo `mes_proyectado`.
+    """
+    matriz = matriz_mensual(totales, hasta)
+    if matriz.empty:
+        return pd.DataFrame(columns=['Último mes', 'Promedio móvil', 'Base estacional', 'Índice estacional', 'Proyección'])
+
+    mes_proyectado = matriz.index[-1] + 1
+    promedio_movil = matriz.rolling(ventana, min_periods=1).mean().iloc[-1]
+
+    # Base estacional: el mismo mes calendario en años anteriores
+    mismo_mes = matriz[matriz.index.month == mes_proyectado.month]
+    base_estacional = mismo_mes.mean() if not mismo_mes.empty else pd.Series(np.nan, index=matriz.columns)
+
+    # El índice compara ese mes con el promedio general; solo se aplica con al menos un año completo
+    if len(matriz) >= MESES_TEMPORADA and not mismo_mes.empty:
+        promedio_general = matriz.mean()
+        indice = (base_estacional / promedio_general.replace(0.0, np.nan)).fillna(1.0)
+    else:
+        indice = pd.Series(1.0, index=matriz.columns)
+
+    pronostico = pd.DataFrame({
+        'Último mes': matriz.iloc[-1],
+        'Promedio móvil': promedio_movil,
+        'Base estacional': base_estacional,
+        'Índice estacional': indice,
+        'Proyección': promedio_movil * indice,
+    })
+    pronostico.index.name = 'Categoria'
+    pronostico.attrs['mes_proyectado'] = mes_proyectado
+    return pronostico.sort_values('Proyección', ascending=False)
+
+def puntajes_robustos(montos, grupos):
+    """
+    Puntaje z robusto de cada monto respecto a su grupo: 0.6745 * (x - mediana) / MAD.
+    Los grupos sin dispersión (MAD = 0) reciben puntaje 0.
+    """
+    agrupados = montos.groupby(grupos)
+    mediana = agrupados.transform('median')
+    desviacion = (montos - mediana).abs()
+    mad = desviacion.groupby(grupos).transform('median')
+    puntajes = CONSTANTE_MAD * (montos - mediana) / mad.replace(0.0, np.nan)
+    return puntajes.fillna(0.0)
+
+def detectar_anomalias(df_gastos, umbral=UMBRAL_ANOMALIA, tipos=None):
+    """
+    Transacciones cuyo monto (en valor absoluto) se aleja de lo habitual en su categoría.
+    Si se indican `tipos`, solo se consideran las categorías cuyo tipo ("Tipo - Subcategoría")
+    esté en la lista. Devuelve las filas atípicas con la columna 'Puntaje', de mayor a menor.
+    """
+    if df_gastos.empty:
+        return df_gastos.assign(Puntaje=pd.Series(dtype=float))
+    if tipos is not None:
+        # El tipo se extrae una vez por categoría distinta, no por transacción
+        categorias = df_gastos['Categoria'].unique()
+        seleccionadas = [categoria for categoria in categorias if str(categoria).split(' - ')[0] in tipos]
+        df_gastos = df_gastos[df_gastos['Categoria'].isin(seleccionadas)]
+    puntajes = puntajes_robustos(df_gastos['Monto'].abs(), df_gastos['Categoria'])
+    atipicas = df_gastos[puntajes.abs() > umbral].assign(Puntaje=puntajes)
+    return atipicas.sort_values('Puntaje', ascending=False)
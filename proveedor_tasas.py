@@ -0,0 +1,185 @@
+# proveedor_tasas.py
+# Proveedor de tasas de cambio (base USD) con caché compartido por todo el proceso y en disco.
+#
+# - TTL configurable: mientras la última consulta sea más reciente que el TTL, no se llama a la fuente.
+# - Stale-while-revalidate: si el valor venció, se devuelve el último conocido de inmediato y se
+#   refresca en segundo plano (una sola consulta a la vez).
+# - El caché en disco hace que un reinicio de la app o una sesión nueva no vuelvan a consultar la API.
+# - La fuente es intercambiable: cualquier función sin argumentos que devuelva {"COP": ..., "EUR": ...}.
+#   Con las variables de entorno TASAS_FUENTE_URL o TASAS_FUENTE_ARCHIVO se puede apuntar a un
+#   servidor local o a un archivo de prueba en lugar de la API pública.
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+URL_TASAS = "https://api.exchangerate-api.com/v4/latest/USD"
+TASAS_CACHE_FILE = "tasas_cambio_cache.json"
+TTL_TASAS_SEGUNDOS = 10 * 60
+TIMEOUT_SEGUNDOS = 5
+FORMATO_FECHA_HORA = "%Y-%m-%d %H:%M:%S"
+
+# Sesión HTTP compartida (reutiliza conexiones entre consultas)
+_sesion = requests.Session()
+_sesion.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1))
+_sesion.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=1))
+
+# Caché del proceso: {'tasas': {...}, 'obtenido': epoch, 'fuente': str}
+_cache = {}
+_lock = threading.Lock()
+_revalidando = threading.Event()
+_fuente = None
+_oyentes = []
+
+def fuente_api(url=URL_TASAS, timeout=TIMEOUT_SEGUNDOS):
+    """Fuente HTTP: consulta un endpoint con el formato de exchangerate-api ({'rates': {...}})."""
+    def obtener():
+        respuesta = _sesion.get(url, timeout=timeout)
+        respuesta.raise_for_status()
+        return respuesta.json()['rates']
+    obtener.descripcion = url
+    return obtener
+
+def fuente_archivo(ruta):
+    """Fuente local: lee las tasas de un archivo JSON ({'rates': {...}} o directamente {...})."""
+    def obtener():
+        with open(ruta, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        return datos.get('rates', datos)
+    obtener.descripcion = ruta
+    return obtener
+
+def _fuente_por_defecto():
+    if os.environ.get("TASAS_FUENTE_ARCHIVO"):
+        return fuente_archivo(os.environ["TASAS_FUENTE_ARCHIVO"])
+    return fuente_api(os.environ.get("TASAS_FUENTE_URL", URL_TASAS))
+
+def configurar_fuente(fuente):
+    """Reemplaza la fuente de tasas del proceso y descarta el caché en memoria."""
+    global _fuente
+    with _lock:
+        _fuente = fuente
+        _cache.clear()
+
+def registrar_oyente(funcion):
+    """Registra una función que recibe cada consulta nueva ({'tasas', 'obtenido', 'fuente'})."""
+    with _lock:
+        if funcion not in _oyentes:
+            _oyentes.append(funcion)
+
+def _obtener_fuente():
+    global _fuente
+    if _fuente is None:
+        _fuente = _fuente_por_defecto()
+    return _fuente
+
+def _leer_cache_disco():
+    try:
+        with open(TASAS_CACHE_FILE, 'r', encoding='utf-8') as f:
+            datos = json.load(f)
+        if isinstance(datos.get('tasas'), dict) and isinstance(datos.get('obtenido'), (int, float)):
+            return datos
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _guardar_cache_disco(entrada):
+    temporal = TASAS_CACHE_FILE + ".tmp"
+    try:
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(entrada, f)
+        os.replace(temporal, TASAS_CACHE_FILE)
+    except OSError:
+        pass
+
+def _consultar_fuente():
+    """Consulta la fuente y actualiza ambos cachés. Devuelve la entrada nueva o lanza la excepción."""
+    fuente = _obtener_fuente()
+    tasas = fuente()
+    entrada = {
+        'tasas': {moneda: float(valor) for moneda, valor in tasas.items() if valor is not None},
+        'obtenido': time.time(),
+        'fuente': getattr(fuente, 'descripcion', 'personalizada'),
+    }
+    with _lock:
+        _cache.clear()
+        _cache.update(entrada)
+        oyentes = list(_oyentes)
+    _guardar_cache_disco(entrada)
+    for oyente in oyentes:
+        try:
+            oyente(entrada)
+        except Exception:
+            pass  # Un oyente con error no impide servir la tasa
+    return entrada
+
+def _revalidar_en_segundo_plano():
+    with _lock:
+        if _revalidando.is_set():
+            return
+        _revalidando.set()
+
+    def tarea():
+        try:
+            _consultar_fuente()
+        except Exception:
+            pass  # Se sigue sirviendo el último valor conocido
+        finally:
+            _revalidando.clear()
+
+    threading.Thread(target=tarea, name="revalidar-tasas", daemon=True).start()
+
+def _resultado(entrada, ttl, error=None):
+    if entrada is None:
+        return {'tasas': {}, 'obtenido': None, 'timestamp': None,
+                'antiguedad_segundos': None, 'obsoleto': True, 'error': error}
+    antiguedad = time.time() - entrada['obtenido']
+    return {
+        'tasas': entrada['tasas'],
+        'obtenido': entrada['obtenido'],
+        'timestamp': datetime.fromtimestamp(entrada['obtenido']).strftime(FORMATO_FECHA_HORA),
+        'antiguedad_segundos': antiguedad,
+        'obsoleto': antiguedad > ttl,
+        'error': error,
+    }
+
+def _entrada_en_cache():
+    """Última entrada conocida (memoria o, si no hay, disco) sin consultar la fuente."""
+    with _lock:
+        if not _cache:
+            disco = _leer_cache_disco()
+            if disco:
+                _cache.update(disco)
+        return dict(_cache) if _cache else None
+
+def ultimas_tasas(ttl=TTL_TASAS_SEGUNDOS):
+    """Devuelve el último valor conocido sin bloquear (nunca consulta la fuente)."""
+    return _resultado(_entrada_en_cache(), ttl)
+
+def obtener_tasas(ttl=TTL_TASAS_SEGUNDOS, forzar=False):
+    """
+    Devuelve las tasas (base USD) como diccionario con 'tasas', 'timestamp',
+    'antiguedad_segundos', 'obsoleto' y 'error'. Si nunca se han podido obtener,
+    'tasas' es un diccionario vacío y 'error' explica el motivo.
+
+    - Con caché vigente (más reciente que `ttl`) no se consulta la fuente.
+    - Con caché vencido se devuelve el último valor y se refresca en segundo plano.
+    - Sin caché, o con forzar=True, se consulta la fuente de forma sincrónica; si falla,
+      se devuelve el último valor conocido con el error.
+    """
+    entrada = _entrada_en_cache()
+
+    if entrada and not forzar:
+        if time.time() - entrada['obtenido'] > ttl:
+            _revalidar_en_segundo_plano()
+        return _resultado(entrada, ttl)
+
+    try:
+        return _resultado(_consultar_fuente(), ttl)
+    except Exception as e:
+        return _resultado(entrada, ttl, error=str(e))
@@ -4,10 +4,8 @@ import pandas as pd
 def rebalanceo_inteligente(df, objetivo_productivo_default=0.8):
     st.header("♻️ Asistente de Rebalanceo Inteligente")
 
-    # Limpiar valores
+    # El portafolio canónico ya viene limpio; se copia porque se agrega la columna 'Sugerencia'
     df = df.copy()
-    df['Dinero'] = df['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-    df['Interes Mensual'] = df['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
 
     # ✅ Control interactivo: barra editable para porcentaje deseado
     st.subheader("🎯 Objetivo de Capital Productivo")
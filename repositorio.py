@@ -0,0 +1,783 @@
+# repositorio.py
+# Capa de persistencia de la app sobre una base SQLite embebida (finanzas.db).
+#
+# Reemplaza los archivos sueltos (JSON/CSV/XLSX) que se leían y reescribían completos
+# en cada cambio: cada conjunto de datos tiene su tabla con índices y las escrituras
+# son incrementales y transaccionales (agregar un gasto o un activo escribe solo esa fila).
+#
+# La primera vez que se abre la base se migran los archivos existentes (una sola vez
+# por archivo; los originales no se modifican).
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import warnings
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+DB_FILE = "finanzas.db"
+
+# Archivos de la versión anterior que se importan una vez a la base
+PARAMETROS_LEGADOS = {
+    "kpi_meta": "kpi_meta_params.json",
+    "ruta_meta": "ruta_meta_params.json",
+    "optimizador": "optimizador_params.json",
+    "niveles_riesgo": "user_risk_levels.json",
+}
+GASTOS_PRESUPUESTOS_LEGADO = "gastos_presupuestos.json"
+HISTORIAL_CAPITAL_LEGADO = "historial_capital.json"
+ACTIVOS_FISICOS_LEGADO = "physical_assets.json"
+SNAPSHOTS_LEGADO = "historial_snapshots.csv"
+PRESTAMOS_LEGADO = "historial_prestamos.csv"
+PASIVOS_LEGADO = "pasivos_guardados.xlsx"
+
+COLUMNAS_GASTOS = ['Fecha', 'Descripcion', 'Monto', 'Categoria']
+# Máximo de parámetros por consulta "IN (...)" (SQLite admite 999 en versiones antiguas)
+LOTE_CONSULTA = 900
+COLUMNAS_CAPITAL = ['fecha', 'capital_cop', 'capital_usd', 'tasa_cop']
+COLUMNAS_SNAPSHOTS = ["Fecha", "Capital Total", "Ingreso Pasivo"]
+COLUMNAS_SNAPSHOTS_ACTIVOS = ["Fecha", "Items", "Tipo de inversion", "Dinero", "Interes Mensual"]
+# Días con detalle diario por activo; los meses completos anteriores se compactan a su último día
+DIAS_DETALLE_SNAPSHOTS = 90
+COLUMNAS_PASIVOS = ["ID", "Descripcion", "Valor", "Tasa Anual", "Fecha_Creacion"]
+FORMATO_FECHA_HORA = "%Y-%m-%d %H:%M:%S"
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS parametros (
+    grupo TEXT NOT NULL,
+    clave TEXT NOT NULL,
+    valor TEXT NOT NULL,
+    PRIMARY KEY (grupo, clave)
+);
+CREATE TABLE IF NOT EXISTS gastos (
+    id INTEGER PRIMARY KEY,
+    fecha TEXT NOT NULL,
+    descripcion TEXT NOT NULL,
+    monto REAL NOT NULL,
+    categoria TEXT,
+    huella INTEGER,
+    UNIQUE (fecha, descripcion, monto)
+);
+CREATE INDEX IF NOT EXISTS idx_gastos_fecha ON gastos (fecha);
+CREATE INDEX IF NOT EXISTS idx_gastos_categoria ON gastos (categoria);
+CREATE TABLE IF NOT EXISTS gastos_mensuales (
+    mes TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    ingresos REAL NOT NULL DEFAULT 0,
+    egresos REAL NOT NULL DEFAULT 0,
+    transacciones INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (mes, categoria)
+);
+CREATE TRIGGER IF NOT EXISTS gastos_mensuales_al_insertar AFTER INSERT ON gastos BEGIN
+    INSERT INTO gastos_mensuales (mes, categoria, ingresos, egresos, transacciones)
+    VALUES (substr(NEW.fecha, 1, 7), COALESCE(NEW.categoria, ''), MAX(NEW.monto, 0), MAX(-NEW.monto, 0), 1)
+    ON CONFLICT (mes, categoria) DO UPDATE SET
+        ingresos = ingresos + excluded.ingresos,
+        egresos = egresos + excluded.egresos,
+        transacciones = transacciones + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS gastos_mensuales_al_borrar AFTER DELETE ON gastos BEGIN
+    UPDATE gastos_mensuales
+    SET ingresos = ingresos - MAX(OLD.monto, 0), egresos = egresos - MAX(-OLD.monto, 0), transacciones = transacciones - 1
+    WHERE mes = substr(OLD.fecha, 1, 7) AND categoria = COALESCE(OLD.categoria, '');
+    DELETE FROM gastos_mensuales
+    WHERE mes = substr(OLD.fecha, 1, 7) AND categoria = COALESCE(OLD.categoria, '') AND transacciones <= 0;
+END;
+CREATE TABLE IF NOT EXISTS presupuestos (
+    categoria TEXT PRIMARY KEY,
+    monto REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS historial_capital (
+    fecha TEXT PRIMARY KEY,
+    capital_cop REAL,
+    capital_usd REAL,
+    tasa_cop REAL
+);
+CREATE TABLE IF NOT EXISTS historial_tasas (
+    fecha TEXT NOT NULL,
+    moneda TEXT NOT NULL,
+    tasa REAL NOT NULL,
+    PRIMARY KEY (moneda, fecha)
+);
+CREATE TABLE IF NOT EXISTS activos_fisicos (
+    id INTEGER PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    fecha TEXT PRIMARY KEY,
+    capital_total REAL,
+    ingreso_pasivo REAL
+);
+CREATE TABLE IF NOT EXISTS snapshots_activos (
+    fecha TEXT NOT NULL,
+    item TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    dinero REAL NOT NULL,
+    interes_mensual REAL NOT NULL,
+    PRIMARY KEY (fecha, item, tipo)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots_activos_mensuales (
+    mes TEXT NOT NULL,
+    item TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    fecha TEXT NOT NULL,
+    dinero REAL NOT NULL,
+    interes_mensual REAL NOT NULL,
+    PRIMARY KEY (mes, item, tipo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_snapshots_activos_mensuales_fecha ON snapshots_activos_mensuales (fecha);
+CREATE TABLE IF NOT EXISTS prestamos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre_clave TEXT,
+    fecha TEXT,
+    datos TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prestamos_nombre ON prestamos (nombre_clave);
+CREATE INDEX IF NOT EXISTS idx_prestamos_fecha ON prestamos (fecha);
+CREATE TABLE IF NOT EXISTS pasivos (
+    id TEXT PRIMARY KEY,
+    orden INTEGER,
+    datos TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versiones (
+    tabla TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS migraciones (
+    nombre TEXT PRIMARY KEY,
+    fecha TEXT NOT NULL
+);
+"""
+
+# Una conexión por hilo (Streamlit ejecuta cada sesión en su propio hilo)
+_local = threading.local()
+_lock_inicializacion = threading.Lock()
+_bases_inicializadas = set()
+
+def _actualizar_esquema(conexion):
+    """Cambios de esquema sobre bases creadas por versiones anteriores de la app."""
+    columnas_gastos = {fila[1] for fila in conexion.execute("PRAGMA table_info(gastos)")}
+    with conexion:
+        if "huella" not in columnas_gastos:
+            # Índice de huellas de las transacciones: se calcula una vez para las ya guardadas
+            conexion.execute("ALTER TABLE gastos ADD COLUMN huella INTEGER")
+            conexion.executemany(
+                "UPDATE gastos SET huella = ? WHERE id = ?",
+                [(_huella_gasto(fecha, descripcion, monto), id_gasto)
+                 for id_gasto, fecha, descripcion, monto in conexion.execute("SELECT id, fecha, descripcion, monto FROM gastos")]
+            )
+        conexion.execute("CREATE INDEX IF NOT EXISTS idx_gastos_huella ON gastos (huella)")
+
+        # Resumen mensual por categoría (lo mantienen los triggers): se arma desde cero si no
+        # corresponde con las transacciones, p. ej. en una base creada antes de existir la tabla
+        resumidas = conexion.execute("SELECT COALESCE(SUM(transacciones), 0) FROM gastos_mensuales").fetchone()[0]
+        if resumidas != conexion.execute("SELECT COUNT(*) FROM gastos").fetchone()[0]:
+            conexion.execute("DELETE FROM gastos_mensuales")
+            conexion.execute(
+                "INSERT INTO gastos_mensuales (mes, categoria, ingresos, egresos, transacciones) "
+                "SELECT substr(fecha, 1, 7), COALESCE(categoria, ''), SUM(MAX(monto, 0)), SUM(MAX(-monto, 0)), COUNT(*) "
+                "FROM gastos GROUP BY 1, 2"
+            )
+
+def obtener_conexion():
+    """Devuelve la conexión SQLite del hilo actual; crea el esquema y migra la primera vez."""
+    conexion = getattr(_local, "conexion", None)
+    if conexion is not None and getattr(_local, "ruta", None) == DB_FILE:
+        return conexion
+
+    conexion = sqlite3.connect(DB_FILE, timeout=30)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    with _lock_inicializacion:
+        if DB_FILE not in _bases_inicializadas:
+            with conexion:
+                conexion.executescript(ESQUEMA)
+            _actualizar_esquema(conexion)
+            migrar_archivos_legados(conexion)
+            _bases_inicializadas.add(DB_FILE)
+    _local.conexion = conexion
+    _local.ruta = DB_FILE
+    return conexion
+
+@contextmanager
+def transaccion():
+    """Bloque transaccional: confirma al salir o revierte si hay una excepción."""
+    conexion = obtener_conexion()
+    with conexion:
+        yield conexion
+
+def _marcar_cambio(conexion, tabla):
+    """Incrementa la versión de la tabla dentro de la transacción en curso y la devuelve."""
+    conexion.execute(
+        "INSERT INTO versiones (tabla, version) VALUES (?, 1) "
+        "ON CONFLICT(tabla) DO UPDATE SET version = version + 1",
+        (tabla,)
+    )
+    return conexion.execute("SELECT version FROM versiones WHERE tabla = ?", (tabla,)).fetchone()[0]
+
+def version_tabla(tabla):
+    """Contador que aumenta con cada escritura en la tabla; sirve para invalidar cachés."""
+    fila = obtener_conexion().execute("SELECT version FROM versiones WHERE tabla = ?", (tabla,)).fetchone()
+    return fila[0] if fila else 0
+
+def _valor_serializable(valor):
+    """Convierte tipos de NumPy/pandas (np.int64, Timestamp, ...) a tipos nativos para JSON."""
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+def _a_json(valor):
+    return json.dumps(valor, ensure_ascii=False, default=_valor_serializable)
+
+def _registro_json(fila):
+    """Convierte una fila (dict) en JSON, reemplazando NaN por None."""
+    return _a_json({clave: (None if isinstance(valor, float) and valor != valor else valor) for clave, valor in fila.items()})
+
+# ========================================
+# PARÁMETROS (metas, optimizador, niveles de riesgo)
+# ========================================
+
+def leer_parametros(grupo):
+    """Devuelve los parámetros guardados de un grupo como diccionario ({} si no hay)."""
+    filas = obtener_conexion().execute("SELECT clave, valor FROM parametros WHERE grupo = ?", (grupo,)).fetchall()
+    return {clave: json.loads(valor) for clave, valor in filas}
+
+def guardar_parametros(grupo, parametros):
+    """Guarda un grupo de parámetros: escribe solo las claves que cambiaron y elimina las que ya no están."""
+    actuales = leer_parametros(grupo)
+    with transaccion() as conexion:
+        cambios = [(grupo, str(clave), _a_json(valor)) for clave, valor in parametros.items()
+                   if str(clave) not in actuales or actuales[str(clave)] != valor]
+        conexion.executemany(
+            "INSERT INTO parametros (grupo, clave, valor) VALUES (?, ?, ?) "
+            "ON CONFLICT(grupo, clave) DO UPDATE SET valor = excluded.valor",
+            cambios
+        )
+        eliminadas = [(grupo, clave) for clave in actuales if clave not in {str(c) for c in parametros}]
+        conexion.executemany("DELETE FROM parametros WHERE grupo = ? AND clave = ?", eliminadas)
+
+# ========================================
+# GASTOS Y PRESUPUESTOS
+# ========================================
+
+def leer_gastos():
+    """Devuelve todas las transacciones como DataFrame (Fecha como datetime)."""
+    df = pd.read_sql_query(
+        "SELECT fecha AS Fecha, descripcion AS Descripcion, monto AS Monto, categoria AS Categoria "
+        "FROM gastos ORDER BY id",
+        obtener_conexion()
+    )
+    df['Fecha'] = pd.to_datetime(df['Fecha'])
+    return df
+
+def _huella_gasto(fecha, descripcion, monto):
+    """Huella de 63 bits de (Fecha, Descripcion, Monto) para el índice de transacciones repetidas."""
+    clave = f"{fecha}\x1f{descripcion}\x1f{float(monto)!r}".encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(clave, digest_size=8).digest(), 'big') >> 1
+
+def _filas_gastos(df):
+    fechas = pd.to_datetime(df['Fecha']).dt.strftime('%Y-%m-%d')
+    descripciones = df['Descripcion'].astype(str)
+    montos = df['Monto'].astype(float)
+    categorias = df['Categoria'] if 'Categoria' in df.columns else pd.Series(None, index=df.index)
+    return [
+        (fecha, descripcion, monto, categoria, _huella_gasto(fecha, descripcion, monto))
+        for fecha, descripcion, monto, categoria
+        in zip(fechas, descripciones, montos, categorias.astype(object).where(categorias.notna(), None))
+    ]
+
+def filtrar_gastos_nuevos(df):
+    """
+    Devuelve solo las filas de `df` que todavía no están en el repositorio (ni repetidas dentro de
+    `df`). Se consulta el índice de huellas de (Fecha, Descripcion, Monto) únicamente para esas filas,
+    sin leer el historial de transacciones.
+    """
+    if df.empty:
+        return df
+    huellas = pd.Series([fila[4] for fila in _filas_gastos(df)], index=df.index)
+    valores = huellas.unique().tolist()
+    conexion = obtener_conexion()
+    existentes = set()
+    for inicio in range(0, len(valores), LOTE_CONSULTA):
+        lote = valores[inicio:inicio + LOTE_CONSULTA]
+        existentes.update(
+            huella for (huella,) in conexion.execute(
+                f"SELECT huella FROM gastos WHERE huella IN ({', '.join('?' * len(lote))})", lote
+            )
+        )
+    nuevas = ~huellas.duplicated() & ~huellas.isin(existentes)
+    return df[nuevas.to_numpy()]
+
+def agregar_gastos(df):
+    """
+    Inserta transacciones nuevas en una sola transacción. Las repetidas
+    (misma Fecha, Descripcion y Monto) se ignoran. Devuelve cuántas se insertaron.
+    """
+    if df.empty:
+        return 0
+    with transaccion() as conexion:
+        # rowcount cuenta solo las filas insertadas en gastos (no las que escribe el trigger
+        # de gastos_mensuales, que total_changes sí sumaría)
+        insertadas = conexion.executemany(
+            "INSERT OR IGNORE INTO gastos (fecha, descripcion, monto, categoria, huella) VALUES (?, ?, ?, ?, ?)",
+            _filas_gastos(df)
+        ).rowcount
+        if insertadas:
+            _marcar_cambio(conexion, "gastos")
+    return insertadas
+
+def reemplazar_gastos(df):
+    """Reemplaza todas las transacciones (para ediciones masivas)."""
+    with transaccion() as conexion:
+        conexion.execute("DELETE FROM gastos")
+        conexion.executemany(
+            "INSERT OR IGNORE INTO gastos (fecha, descripcion, monto, categoria, huella) VALUES (?, ?, ?, ?, ?)",
+            _filas_gastos(df)
+        )
+        _marcar_cambio(conexion, "gastos")
+
+def leer_resumen_gastos():
+    """
+    Resumen de transacciones por mes y categoría (Mes como periodo mensual): suma de montos
+    positivos (Ingresos), suma de montos negativos en valor absoluto (Egresos) y Transacciones.
+    Lo mantienen actualizado los triggers de la tabla gastos, sin recorrer las transacciones.
+    """
+    df = pd.read_sql_query(
+        "SELECT mes AS Mes, categoria AS Categoria, ingresos AS Ingresos, egresos AS Egresos, "
+        "transacciones AS Transacciones FROM gastos_mensuales ORDER BY mes, categoria",
+        obtener_conexion()
+    )
+    df['Mes'] = pd.PeriodIndex(df['Mes'], freq='M')
+    return df
+
+def leer_presupuestos():
+    filas = obtener_conexion().execute("SELECT categoria, monto FROM presupuestos").fetchall()
+    return {categoria: monto for categoria, monto in filas}
+
+def guardar_presupuestos(presupuestos):
+    """Actualiza los presupuestos por categoría (solo los que cambiaron)."""
+    actuales = leer_presupuestos()
+    cambios = [(categoria, float(monto)) for categoria, monto in presupuestos.items() if actuales.get(categoria) != monto]
+    with transaccion() as conexion:
+        conexion.executemany(
+            "INSERT INTO presupuestos (categoria, monto) VALUES (?, ?) "
+            "ON CONFLICT(categoria) DO UPDATE SET monto = excluded.monto",
+            cambios
+        )
+
+# ========================================
+# HISTORIAL DE CAPITAL (divisas)
+# ========================================
+
+def leer_historial_capital():
+    df = pd.read_sql_query(
+        "SELECT fecha, capital_cop, capital_usd, tasa_cop FROM historial_capital ORDER BY fecha",
+        obtener_conexion()
+    )
+    df['fecha'] = pd.to_datetime(df['fecha'])
+    return df
+
+def registrar_capital_del_dia(fecha, capital_cop, capital_usd, tasa_cop):
+    """
+    Upsert por día: reemplaza el registro del día de `fecha` (si lo hay) por el nuevo.
+    Solo toca las filas de ese día (rango sobre la clave primaria). Devuelve la nueva
+    versión de la tabla.
+    """
+    dia = pd.Timestamp(fecha).normalize()
+    with transaccion() as conexion:
+        conexion.execute(
+            "DELETE FROM historial_capital WHERE fecha >= ? AND fecha < ?",
+            (dia.strftime(FORMATO_FECHA_HORA), (dia + pd.Timedelta(days=1)).strftime(FORMATO_FECHA_HORA))
+        )
+        conexion.execute(
+            "INSERT OR REPLACE INTO historial_capital VALUES (?, ?, ?, ?)",
+            (pd.Timestamp(fecha).strftime(FORMATO_FECHA_HORA), float(capital_cop), float(capital_usd), float(tasa_cop))
+        )
+        return _marcar_cambio(conexion, "historial_capital")
+
+def reemplazar_historial_capital(df):
+    """Reemplaza el historial de capital completo."""
+    filas = list(zip(
+        pd.to_datetime(df['fecha']).dt.strftime(FORMATO_FECHA_HORA),
+        df['capital_cop'].astype(float), df['capital_usd'].astype(float), df['tasa_cop'].astype(float)
+    ))
+    with transaccion() as conexion:
+        conexion.execute("DELETE FROM historial_capital")
+        conexion.executemany("INSERT OR REPLACE INTO historial_capital VALUES (?, ?, ?, ?)", filas)
+        _marcar_cambio(conexion, "historial_capital")
+
+def registrar_tasas(fecha, tasas):
+    """Guarda las tasas consultadas ({moneda: tasa}, base USD) con la fecha y hora de la consulta."""
+    fecha_texto = pd.Timestamp(fecha).strftime(FORMATO_FECHA_HORA)
+    with transaccion() as conexion:
+        conexion.executemany(
+            "INSERT OR REPLACE INTO historial_tasas (fecha, moneda, tasa) VALUES (?, ?, ?)",
+            [(fecha_texto, moneda, float(tasa)) for moneda, tasa in tasas.items()]
+        )
+        _marcar_cambio(conexion, "historial_tasas")
+
+def leer_historial_tasas(moneda=None):
+    """Tasas registradas (fecha, moneda, tasa) ordenadas por fecha; opcionalmente de una sola moneda."""
+    consulta = "SELECT fecha, moneda, tasa FROM historial_tasas"
+    parametros = ()
+    if moneda:
+        consulta += " WHERE moneda = ?"
+        parametros = (moneda,)
+    df = pd.read_sql_query(consulta + " ORDER BY fecha", obtener_conexion(), params=parametros)
+    df['fecha'] = pd.to_datetime(df['fecha'])
+    return df
+
+# ========================================
+# ACTIVOS FÍSICOS
+# ========================================
+
+def leer_activos_fisicos():
+    filas = obtener_conexion().execute("SELECT datos FROM activos_fisicos ORDER BY id").fetchall()
+    return [json.loads(datos) for (datos,) in filas]
+
+def guardar_activo_fisico(activo):
+    """Inserta o actualiza un único activo (por su 'ID')."""
+    with transaccion() as conexion:
+        conexion.execute(
+            "INSERT INTO activos_fisicos (id, datos) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET datos = excluded.datos",
+            (int(activo['ID']), _registro_json(activo))
+        )
+
+def eliminar_activo_fisico(id_activo):
+    with transaccion() as conexion:
+        conexion.execute("DELETE FROM activos_fisicos WHERE id = ?", (int(id_activo),))
+
+def sincronizar_activos_fisicos(activos):
+    """
+    Deja en la base exactamente la lista recibida, escribiendo solo los activos
+    nuevos o modificados y eliminando los que ya no están.
+    """
+    conexion = obtener_conexion()
+    actuales = dict(conexion.execute("SELECT id, datos FROM activos_fisicos").fetchall())
+    nuevos = {int(activo['ID']): _registro_json(activo) for activo in activos}
+    with transaccion() as conexion:
+        conexion.executemany(
+            "INSERT INTO activos_fisicos (id, datos) VALUES (?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET datos = excluded.datos",
+            [(id_activo, datos) for id_activo, datos in nuevos.items() if actuales.get(id_activo) != datos]
+        )
+        conexion.executemany(
+            "DELETE FROM activos_fisicos WHERE id = ?",
+            [(id_activo,) for id_activo in actuales if id_activo not in nuevos]
+        )
+
+# ========================================
+# SNAPSHOTS MENSUALES (histórico)
+# ========================================
+
+def leer_snapshots():
+    return pd.read_sql_query(
+        'SELECT fecha AS "Fecha", capital_total AS "Capital Total", ingreso_pasivo AS "Ingreso Pasivo" '
+        "FROM snapshots ORDER BY fecha",
+        obtener_conexion()
+    )
+
+def guardar_snapshot_mensual(fecha, capital_total, ingreso_pasivo):
+    """Inserta o actualiza el snapshot de un mes (fecha 'YYYY-MM')."""
+    with transaccion() as conexion:
+        conexion.execute(
+            "INSERT INTO snapshots (fecha, capital_total, ingreso_pasivo) VALUES (?, ?, ?) "
+            "ON CONFLICT(fecha) DO UPDATE SET capital_total = excluded.capital_total, "
+            "ingreso_pasivo = excluded.ingreso_pasivo",
+            (fecha, float(capital_total), float(ingreso_pasivo))
+        )
+        _marcar_cambio(conexion, "snapshots")
+
+def borrar_snapshots():
+    with transaccion() as conexion:
+        conexion.execute("DELETE FROM snapshots")
+        conexion.execute("DELETE FROM snapshots_activos")
+        conexion.execute("DELETE FROM snapshots_activos_mensuales")
+        _marcar_cambio(conexion, "snapshots")
+        _marcar_cambio(conexion, "snapshots_activos")
+
+# ========================================
+# SNAPSHOTS DIARIOS POR ACTIVO (histórico)
+# ========================================
+# Un registro por día y activo (Items, Tipo de inversion). Guardar el día solo escribe las filas
+# que cambiaron; los meses que quedan fuera de la ventana de detalle se compactan a las filas de
+# su último día registrado (tabla snapshots_activos_mensuales). Las consultas por rango usan las
+# claves primarias por fecha, sin leer el historial completo.
+
+def _compactar_snapshots_activos(conexion, antes_de):
+    """Pasa los días anteriores a `antes_de` (inicio de mes 'YYYY-MM-01') al resumen mensual."""
+    if conexion.execute("SELECT 1 FROM snapshots_activos WHERE fecha < ? LIMIT 1", (antes_de,)).fetchone() is None:
+        return
+    conexion.execute(
+        "INSERT OR REPLACE INTO snapshots_activos_mensuales (mes, item, tipo, fecha, dinero, interes_mensual) "
+        "SELECT substr(d.fecha, 1, 7), d.item, d.tipo, d.fecha, d.dinero, d.interes_mensual "
+        "FROM snapshots_activos d "
+        "JOIN (SELECT MAX(fecha) AS ultimo FROM snapshots_activos WHERE fecha < ? GROUP BY substr(fecha, 1, 7)) u "
+        "ON d.fecha = u.ultimo",
+        (antes_de,)
+    )
+    conexion.execute("DELETE FROM snapshots_activos WHERE fecha < ?", (antes_de,))
+
+def guardar_snapshot_diario(fecha, activos, dias_detalle=DIAS_DETALLE_SNAPSHOTS):
+    """
+    Guarda el estado del portafolio del día `fecha` ('YYYY-MM-DD'). `activos` es una lista de
+    (item, tipo, dinero, interes_mensual) con un registro por activo. Si el día ya estaba guardado
+    con los mismos valores no se escribe nada. También actualiza los totales del mes en la tabla
+    snapshots. Devuelve True si hubo cambios.
+    """
+    nuevos = {(str(item), str(tipo)): (float(dinero), float(interes)) for item, tipo, dinero, interes in activos}
+    conexion = obtener_conexion()
+    actuales = {
+        (item, tipo): (dinero, interes)
+        for item, tipo, dinero, interes in conexion.execute(
+            "SELECT item, tipo, dinero, interes_mensual FROM snapshots_activos WHERE fecha = ?", (fecha,)
+        )
+    }
+    if actuales == nuevos:
+        return False
+
+    with transaccion() as conexion:
+        conexion.executemany(
+            "DELETE FROM snapshots_activos WHERE fecha = ? AND item = ? AND tipo = ?",
+            [(fecha, item, tipo) for item, tipo in actuales if (item, tipo) not in nuevos]
+        )
+        conexion.executemany(
+            "INSERT INTO snapshots_activos (fecha, item, tipo, dinero, interes_mensual) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(fecha, item, tipo) DO UPDATE SET dinero = excluded.dinero, interes_mensual = excluded.interes_mensual",
+            [(fecha, item, tipo, dinero, interes) for (item, tipo), (dinero, interes) in nuevos.items()
+             if actuales.get((item, tipo)) != (dinero, interes)]
+        )
+        conexion.execute(
+            "INSERT INTO snapshots (fecha, capital_total, ingreso_pasivo) VALUES (?, ?, ?) "
+            "ON CONFLICT(fecha) DO UPDATE SET capital_total = excluded.capital_total, "
+            "ingreso_pasivo = excluded.ingreso_pasivo",
+            (fecha[:7], sum(dinero for dinero, _ in nuevos.values()), sum(interes for _, interes in nuevos.values()))
+        )
+        limite = (pd.Timestamp(fecha) - pd.Timedelta(days=dias_detalle)).strftime("%Y-%m-01")
+        _compactar_snapshots_activos(conexion, limite)
+        _marcar_cambio(conexion, "snapshots")
+        _marcar_cambio(conexion, "snapshots_activos")
+    return True
+
+def _filtro_fechas(desde, hasta):
+    condiciones, parametros = [], []
+    if desde is not None:
+        condiciones.append("fecha >= ?")
+        parametros.append(pd.Timestamp(desde).strftime("%Y-%m-%d"))
+    if hasta is not None:
+        condiciones.append("fecha <= ?")
+        parametros.append(pd.Timestamp(hasta).strftime("%Y-%m-%d"))
+    return (" WHERE " + " AND ".join(condiciones) if condiciones else ""), parametros
+
+def leer_snapshots_activos(desde=None, hasta=None):
+    """
+    Registros por activo entre `desde` y `hasta` (incluidos): los días con detalle y, para los
+    meses compactados, su último día. Columnas de COLUMNAS_SNAPSHOTS_ACTIVOS, ordenadas por fecha.
+    """
+    filtro, parametros = _filtro_fechas(desde, hasta)
+    df = pd.read_sql_query(
+        'SELECT fecha AS "Fecha", item AS "Items", tipo AS "Tipo de inversion", dinero AS "Dinero", '
+        'interes_mensual AS "Interes Mensual" FROM ('
+        "SELECT fecha, item, tipo, dinero, interes_mensual FROM snapshots_activos_mensuales" + filtro +
+        " UNION ALL SELECT fecha, item, tipo, dinero, interes_mensual FROM snapshots_activos" + filtro +
+        ") ORDER BY fecha, item",
+        obtener_conexion(), params=parametros * 2
+    )
+    df['Fecha'] = pd.to_datetime(df['Fecha'])
+    return df
+
+def leer_totales_snapshots_activos(desde=None, hasta=None):
+    """Capital Total e Ingreso Pasivo por fecha entre `desde` y `hasta`, sumados en la base."""
+    filtro, parametros = _filtro_fechas(desde, hasta)
+    df = pd.read_sql_query(
+        'SELECT fecha AS "Fecha", SUM(dinero) AS "Capital Total", SUM(interes_mensual) AS "Ingreso Pasivo" FROM ('
+        "SELECT fecha, dinero, interes_mensual FROM snapshots_activos_mensuales" + filtro +
+        " UNION ALL SELECT fecha, dinero, interes_mensual FROM snapshots_activos" + filtro +
+        ") GROUP BY fecha ORDER BY fecha",
+        obtener_conexion(), params=parametros * 2
+    )
+    df['Fecha'] = pd.to_datetime(df['Fecha'])
+    return df
+
+# ========================================
+# HISTORIAL DE PRÉSTAMOS
+# ========================================
+
+def _clave_nombre(nombre):
+    return str(nombre).strip().lower()
+
+def _fecha_prestamo(fila):
+    fecha = fila.get("Fecha")
+    return fecha if isinstance(fecha, str) and fecha else None
+
+def anexar_prestamos(df):
+    """Agrega evaluaciones de préstamos (cada fila se guarda completa como JSON)."""
+    if df.empty:
+        return
+    registros = df.to_dict('records')
+    filas = [(_clave_nombre(fila.get("Nombre", "")), _fecha_prestamo(fila), _registro_json(fila)) for fila in registros]
+    with transaccion() as conexion:
+        conexion.executemany("INSERT INTO prestamos (nombre_clave, fecha, datos) VALUES (?, ?, ?)", filas)
+        _marcar_cambio(conexion, "prestamos")
+
+def leer_prestamos(nombre=None, desde=None, hasta=None):
+    """
+    Evaluaciones guardadas, en orden de registro. Los filtros usan los índices
+    por nombre (sin distinguir mayúsculas) y por fecha; 'hasta' incluye el día completo.
+    """
+    condiciones, parametros = [], []
+    if nombre:
+        condiciones.append("nombre_clave = ?")
+        parametros.append(_clave_nombre(nombre))
+    if desde is not None:
+        condiciones.append("fecha >= ?")
+        parametros.append(pd.Timestamp(desde).strftime(FORMATO_FECHA_HORA))
+    if hasta is not None:
+        condiciones.append("fecha < ?")
+        parametros.append((pd.Timestamp(hasta).normalize() + pd.Timedelta(days=1)).strftime(FORMATO_FECHA_HORA))
+    where = f" WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    filas = obtener_conexion().execute(f"SELECT datos FROM prestamos{where} ORDER BY id", parametros).fetchall()
+    return pd.DataFrame([json.loads(datos) for (datos,) in filas])
+
+# ========================================
+# PASIVOS (balance general)
+# ========================================
+
+def leer_pasivos():
+    filas = obtener_conexion().execute("SELECT datos FROM pasivos ORDER BY orden, rowid").fetchall()
+    if not filas:
+        return pd.DataFrame(columns=COLUMNAS_PASIVOS)
+    return pd.DataFrame([json.loads(datos) for (datos,) in filas])
+
+def guardar_pasivo(pasivo):
+    """Inserta o actualiza un único pasivo (por su 'ID')."""
+    with transaccion() as conexion:
+        conexion.execute(
+            "INSERT INTO pasivos (id, orden, datos) VALUES (?, (SELECT COALESCE(MAX(orden), 0) + 1 FROM pasivos), ?) "
+            "ON CONFLICT(id) DO UPDATE SET datos = excluded.datos",
+            (str(pasivo['ID']), _registro_json(pasivo))
+        )
+
+def eliminar_pasivo(id_pasivo):
+    with transaccion() as conexion:
+        conexion.execute("DELETE FROM pasivos WHERE id = ?", (str(id_pasivo),))
+
+def reemplazar_pasivos(df):
+    """Reemplaza todos los pasivos conservando el orden del DataFrame."""
+    filas = [(str(fila['ID']), orden, _registro_json(fila)) for orden, fila in enumerate(df.to_dict('records'))]
+    with transaccion() as conexion:
+        conexion.execute("DELETE FROM pasivos")
+        conexion.executemany("INSERT OR REPLACE INTO pasivos (id, orden, datos) VALUES (?, ?, ?)", filas)
+
+# ========================================
+# MIGRACIÓN DESDE LOS ARCHIVOS ANTERIORES
+# ========================================
+
+def _migrar(conexion, nombre, archivo, importar):
+    """
+    Ejecuta `importar(archivo)` una sola vez por archivo legado, dentro de una transacción.
+    Solo se registra la migración si el archivo existe y se importó: uno que aparezca
+    después se importa en el próximo inicio.
+    """
+    if not os.path.exists(archivo):
+        return
+    if conexion.execute("SELECT 1 FROM migraciones WHERE nombre = ?", (nombre,)).fetchone():
+        return
+    try:
+        with conexion:
+            importar(archivo)
+            conexion.execute("INSERT INTO migraciones (nombre, fecha) VALUES (?, ?)",
+                             (nombre, datetime.now().strftime(FORMATO_FECHA_HORA)))
+    except Exception as e:
+        # Archivo ilegible: la transacción se revierte y se reintenta en el próximo inicio
+        warnings.warn(f"No se pudo migrar {archivo}: {e}")
+
+def _leer_json(archivo, defecto):
+    try:
+        with open(archivo, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return defecto
+
+def migrar_archivos_legados(conexion):
+    """
+    Importa a la base, una sola vez, los datos de los archivos JSON/CSV/XLSX usados
+    antes del repositorio. Si un archivo no existe o su importación falla (se revierte),
+    se reintentará en el próximo inicio.
+    """
+    def importar_parametros(grupo):
+        def importar(archivo):
+            datos = _leer_json(archivo, {})
+            conexion.executemany(
+                "INSERT OR REPLACE INTO parametros (grupo, clave, valor) VALUES (?, ?, ?)",
+                [(grupo, str(clave), _a_json(valor)) for clave, valor in datos.items()]
+            )
+        return importar
+
+    def importar_gastos(archivo):
+        datos = _leer_json(archivo, {})
+        df = pd.DataFrame(datos.get('gastos_df') or [], columns=COLUMNAS_GASTOS)
+        if not df.empty:
+            conexion.executemany(
+                "INSERT OR IGNORE INTO gastos (fecha, descripcion, monto, categoria, huella) VALUES (?, ?, ?, ?, ?)",
+                _filas_gastos(df)
+            )
+        conexion.executemany(
+            "INSERT OR REPLACE INTO presupuestos (categoria, monto) VALUES (?, ?)",
+            [(categoria, float(monto)) for categoria, monto in (datos.get('presupuestos') or {}).items()]
+        )
+
+    def importar_capital(archivo):
+        df = pd.DataFrame(_leer_json(archivo, []), columns=COLUMNAS_CAPITAL)
+        conexion.executemany(
+            "INSERT OR REPLACE INTO historial_capital VALUES (?, ?, ?, ?)",
+            list(zip(pd.to_datetime(df['fecha']).dt.strftime(FORMATO_FECHA_HORA),
+                     df['capital_cop'].astype(float), df['capital_usd'].astype(float), df['tasa_cop'].astype(float)))
+        )
+
+    def importar_activos(archivo):
+        conexion.executemany(
+            "INSERT OR REPLACE INTO activos_fisicos (id, datos) VALUES (?, ?)",
+            [(int(activo['ID']), _registro_json(activo)) for activo in _leer_json(archivo, [])]
+        )
+
+    def importar_snapshots(archivo):
+        df = pd.read_csv(archivo)
+        conexion.executemany(
+            "INSERT OR REPLACE INTO snapshots (fecha, capital_total, ingreso_pasivo) VALUES (?, ?, ?)",
+            list(zip(df["Fecha"].astype(str), df["Capital Total"].astype(float), df["Ingreso Pasivo"].astype(float)))
+        )
+
+    def importar_prestamos(archivo):
+        registros = pd.read_csv(archivo).to_dict('records')
+        conexion.executemany(
+            "INSERT INTO prestamos (nombre_clave, fecha, datos) VALUES (?, ?, ?)",
+            [(_clave_nombre(fila.get("Nombre", "")),
+              _fecha_prestamo(fila),
+              _registro_json(fila)) for fila in registros]
+        )
+
+    def importar_pasivos(archivo):
+        registros = pd.read_excel(archivo).to_dict('records')
+        for fila in registros:
+            if not isinstance(fila.get('ID'), str) or not fila['ID']:
+                fila['ID'] = str(uuid.uuid4())
+        conexion.executemany(
+            "INSERT OR REPLACE INTO pasivos (id, orden, datos) VALUES (?, ?, ?)",
+            [(fila['ID'], orden, _registro_json(fila)) for orden, fila in enumerate(registros)]
+        )
+
+    for grupo, archivo in PARAMETROS_LEGADOS.items():
+        _migrar(conexion, archivo, archivo, importar_parametros(grupo))
+    _migrar(conexion, GASTOS_PRESUPUESTOS_LEGADO, GASTOS_PRESUPUESTOS_LEGADO, importar_gastos)
+    _migrar(conexion, HISTORIAL_CAPITAL_LEGADO, HISTORIAL_CAPITAL_LEGADO, importar_capital)
+    _migrar(conexion, ACTIVOS_FISICOS_LEGADO, ACTIVOS_FISICOS_LEGADO, importar_activos)
+    _migrar(conexion, SNAPSHOTS_LEGADO, SNAPSHOTS_LEGADO, importar_snapshots)
+    _migrar(conexion, PRESTAMOS_LEGADO, PRESTAMOS_LEGADO, importar_prestamos)
+    _migrar(conexion, PASIVOS_LEGADO, PASIVOS_LEGADO, importar_pasivos)
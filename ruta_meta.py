@@ -3,10 +3,12 @@ import pandas as pd
 import math
 import plotly.graph_objects as go
 import plotly.express as px
-import json
-import os
+import numpy as np
 
-META_PARAMS_FILE = "ruta_meta_params.json"
+from repositorio import guardar_parametros, leer_parametros
+from solver_metas import HORIZONTE_MAXIMO_MESES, capital_proyectado, meses_para_meta, tasa_mensual_desde_anual
+
+META_PARAMS_GRUPO = "ruta_meta"
 
 def formato_pesos(valor):
     """Formatea valores numéricos como moneda colombiana"""
@@ -32,18 +34,26 @@ def formato_tiempo(meses_total):
     
     return " ".join(partes), dias
 
+def tabla_hitos(capital, rentabilidad_anual, inversion_mensual, meses_meta, capital_meta):
+    """
+    Hitos hasta la meta (1, 3, 6, 12, 24 y 36 meses, y el mes en que se alcanza) con el capital
+    de la misma curva del solver, el ingreso mensual que genera a la tasa del portafolio y el % de la meta.
+    """
+    hitos = np.array(sorted({h for h in (1, 3, 6, 12, 24, 36, int(meses_meta)) if h <= meses_meta}))
+    capitales = capital_proyectado(capital, rentabilidad_anual, inversion_mensual, hitos)
+    ingresos = capitales * tasa_mensual_desde_anual(rentabilidad_anual)
+    return pd.DataFrame({
+        "Periodo": [formato_tiempo(mes)[0] for mes in hitos],
+        "Capital": [formato_pesos(valor) for valor in capitales],
+        "Ingreso Mensual": [formato_pesos(valor) for valor in ingresos],
+        "% de Meta": [f"{valor / capital_meta * 100:.1f}%" for valor in capitales],
+    })
+
 def load_meta_params():
-    """Carga los parámetros guardados desde archivo JSON"""
-    if os.path.exists(META_PARAMS_FILE):
-        with open(META_PARAMS_FILE, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {
-                    "capital_meta": 50_000_000.0,
-                    "ingreso_pasivo_objetivo": 1_000_000.0,
-                    "inversion_mensual": 1_800_000.0
-                }
+    """Carga los parámetros guardados desde el repositorio"""
+    params = leer_parametros(META_PARAMS_GRUPO)
+    if params:
+        return params
     return {
         "capital_meta": 50_000_000.0,
         "ingreso_pasivo_objetivo": 1_000_000.0,
@@ -51,9 +61,8 @@ def load_meta_params():
     }
 
 def save_meta_params(params_dict):
-    """Guarda los parámetros en archivo JSON"""
-    with open(META_PARAMS_FILE, 'w') as f:
-        json.dump(params_dict, f, indent=4)
+    """Guarda los parámetros en el repositorio"""
+    guardar_parametros(META_PARAMS_GRUPO, params_dict)
 
 def ruta_hacia_meta(df=None, capital=None, rentabilidad=None, capital_objetivo=None, ingreso_pasivo_objetivo=None, inversion_mensual=None):
     # CSS mejorado para UX moderna
@@ -175,10 +184,7 @@ def ruta_hacia_meta(df=None, capital=None, rentabilidad=None, capital_objetivo=N
 
     # Procesar datos
     if df is not None:
-        df = df.copy()
-        df['Dinero'] = pd.to_numeric(df['Dinero'].replace('[\$,]', '', regex=True), errors='coerce')
-        df['Interes Mensual'] = pd.to_numeric(df['Interes Mensual'], errors='coerce').fillna(0)
-        
+        # El portafolio canónico ya trae 'Dinero' e 'Interes Mensual' numéricos
         # Corrección: Ahora se calcula el capital productivo.
         capital_productivo = df[df['Interes Mensual'] > 0]['Dinero'].sum()
         capital = df['Dinero'].sum()
@@ -242,30 +248,18 @@ def ruta_hacia_meta(df=None, capital=None, rentabilidad=None, capital_objetivo=N
         "inversion_mensual": inversion_mensual_input
     })
 
-    # Cálculos
-    rentabilidad_anual_decimal = rentabilidad_anual / 100
-    
-    # Cálculo con interés
-    denominator = inversion_mensual_input + (capital * rentabilidad_anual_decimal / 12)
-    
-    if denominator > 0 and capital < capital_meta_input:
-        meses_para_capital_meta_con_interes = (capital_meta_input - capital) / denominator
-        if meses_para_capital_meta_con_interes < 0:
-            meses_para_capital_meta_con_interes = 0.0
-    elif capital >= capital_meta_input:
-        meses_para_capital_meta_con_interes = 0.0
-    else:
-        meses_para_capital_meta_con_interes = float('inf')
-    
-    # Cálculo sin interés (solo aportes mensuales)
-    if inversion_mensual_input > 0 and capital < capital_meta_input:
-        meses_para_capital_meta_sin_interes = (capital_meta_input - capital) / inversion_mensual_input
-        if meses_para_capital_meta_sin_interes < 0:
-            meses_para_capital_meta_sin_interes = 0.0
-    elif capital >= capital_meta_input:
-        meses_para_capital_meta_sin_interes = 0.0
-    else:
-        meses_para_capital_meta_sin_interes = float('inf')
+    # Cálculos (solver compartido con la Calculadora FIRE y el Generador de Informes)
+    # Con interés compuesto: rendimientos reinvertidos + aporte mensual
+    meses_para_capital_meta_con_interes = meses_para_meta(
+        capital, capital_meta_input, rentabilidad_anual, inversion_mensual_input,
+        max_meses=HORIZONTE_MAXIMO_MESES
+    )
+    
+    # Sin interés (solo aportes mensuales)
+    meses_para_capital_meta_sin_interes = meses_para_meta(
+        capital, capital_meta_input, 0.0, inversion_mensual_input,
+        max_meses=HORIZONTE_MAXIMO_MESES
+    )
 
     # Progreso visual mejorado
     st.markdown('<div class="progress-container">', unsafe_allow_html=True)
@@ -382,20 +376,13 @@ def ruta_hacia_meta(df=None, capital=None, rentabilidad=None, capital_objetivo=N
     if capital < capital_meta_input and meses_para_capital_meta_con_interes != float('inf'):
         st.markdown('<h3 class="section-header">Proyección de Crecimiento</h3>', unsafe_allow_html=True)
         
-        max_months = min(int(max(meses_para_capital_meta_con_interes, meses_para_capital_meta_sin_interes)) + 12, 600)
-        meses = list(range(0, max_months + 1, 3))  # Cada 3 meses para mejor rendimiento
+        horizontes = [m for m in (meses_para_capital_meta_con_interes, meses_para_capital_meta_sin_interes) if m != float('inf')]
+        max_months = min(int(max(horizontes)) + 12, HORIZONTE_MAXIMO_MESES)
+        meses = np.arange(0, max_months + 1, 3)  # Cada 3 meses
         
-        capital_con_interes = []
-        capital_sin_interes = []
-        
-        for m in meses:
-            # Con interés
-            cap_interes = capital + (inversion_mensual_input * m) + (capital * rentabilidad_anual_decimal * m / 12)
-            capital_con_interes.append(cap_interes)
-            
-            # Sin interés
-            cap_sin_interes = capital + (inversion_mensual_input * m)
-            capital_sin_interes.append(cap_sin_interes)
+        # Curvas completas en una sola operación vectorizada
+        capital_con_interes = capital_proyectado(capital, rentabilidad_anual, inversion_mensual_input, meses)
+        capital_sin_interes = capital_proyectado(capital, 0.0, inversion_mensual_input, meses)
         
         fig = go.Figure()
         
@@ -465,24 +452,9 @@ def ruta_hacia_meta(df=None, capital=None, rentabilidad=None, capital_objetivo=N
     if meses_para_capital_meta_con_interes != float('inf') and meses_para_capital_meta_con_interes <= 240:  # Solo si es menos de 20 años
         st.markdown('<h3 class="section-header">Hitos Importantes</h3>', unsafe_allow_html=True)
         
-        hitos = [1, 3, 6, 12, 24, 36, int(meses_para_capital_meta_con_interes)]
-        hitos = sorted(list(set([h for h in hitos if h <= meses_para_capital_meta_con_interes])))
-        
-        tabla_data = []
-        for mes in hitos:
-            capital_proyectado = capital + (inversion_mensual_input * mes) + (capital * rentabilidad_anual_decimal * mes / 12)
-            ingreso_proyectado = capital_proyectado * (rentabilidad_anual_decimal / 12)
-            
-            tiempo_formateado, _ = formato_tiempo(mes)
-            
-            tabla_data.append({
-                "Periodo": tiempo_formateado,
-                "Capital": formato_pesos(capital_proyectado),
-                "Ingreso Mensual": formato_pesos(ingreso_proyectado),
-                "% de Meta": f"{(capital_proyectado/capital_meta_input)*100:.1f}%"
-            })
-        
-        df_tabla = pd.DataFrame(tabla_data)
+        # Mismo modelo (interés compuesto + aportes) que el tiempo estimado y la gráfica
+        df_tabla = tabla_hitos(capital, rentabilidad_anual, inversion_mensual_input,
+                               meses_para_capital_meta_con_interes, capital_meta_input)
         st.dataframe(
             df_tabla,
             use_container_width=True,
@@ -56,9 +56,7 @@ def mostrar_seguimiento_metas(df):
     # Limpiar y convertir 'Dinero' del portafolio a numérico
     current_capital = 0.0
     if df is not None:
-        df_cleaned = df.copy()
-        df_cleaned['Dinero'] = pd.to_numeric(df_cleaned['Dinero'].replace('[\$,]', '', regex=True), errors='coerce').fillna(0)
-        current_capital = df_cleaned['Dinero'].sum()
+        current_capital = df['Dinero'].sum()
     else:
         st.warning("Carga tu portafolio para ver cómo tu capital actual contribuye a tus metas.")
 
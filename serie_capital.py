@@ -0,0 +1,187 @@
+# serie_capital.py
+# Serie temporal del historial de capital (capital_cop, capital_usd, tasa_cop) indexada por fecha.
+#
+# - Se construye a partir del último registro válido de cada día y se precalculan los agregados
+#   diario, semanal y mensual (último registro de cada periodo).
+# - Un rango de fechas ("7 días", "30 días", "1 año"...) se ubica con búsqueda binaria sobre las
+#   fechas ordenadas: O(log n), sin filtrar la tabla completa.
+# - Mínimo, máximo (con su posición), promedio y cambio de cualquier rango se responden en O(1)
+#   con tablas dispersas (sparse tables) y sumas acumuladas. Agregar o reemplazar el registro del
+#   último periodo (el caso de "guardar el capital de hoy") las actualiza en O(log n).
+#
+# Una serie es un diccionario; las funciones de este módulo la leen y la actualizan en el lugar.
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS_SERIE = ('capital_cop', 'capital_usd', 'tasa_cop')
+# Frecuencia -> periodo de pandas usado para agrupar (None: un registro por día)
+FRECUENCIAS = {"diaria": None, "semanal": "W", "mensual": "M"}
+
+def _clave_periodo(fechas, frecuencia):
+    """Inicio del periodo (día, semana o mes) al que pertenece cada fecha."""
+    periodo = FRECUENCIAS[frecuencia]
+    if periodo is None:
+        return fechas.dt.normalize()
+    return fechas.dt.to_period(periodo).dt.start_time
+
+def _mejor(valores, a, b, es_minimo):
+    # En empates se conserva la posición más antigua
+    if es_minimo:
+        return a if valores[a] <= valores[b] else b
+    return a if valores[a] >= valores[b] else b
+
+def _construir_tabla(valores, es_minimo):
+    """Tabla dispersa de posiciones: niveles[k][i] = posición del extremo en valores[i:i + 2**k]."""
+    arreglo = np.asarray(valores, dtype=float)
+    posiciones = np.arange(len(arreglo))
+    niveles = [posiciones.tolist()] if len(arreglo) else []
+    ancho = 1
+    while 2 * ancho <= len(arreglo):
+        izquierda, derecha = posiciones[:-ancho], posiciones[ancho:]
+        if es_minimo:
+            posiciones = np.where(arreglo[izquierda] <= arreglo[derecha], izquierda, derecha)
+        else:
+            posiciones = np.where(arreglo[izquierda] >= arreglo[derecha], izquierda, derecha)
+        niveles.append(posiciones.tolist())
+        ancho *= 2
+    return niveles
+
+def _agregar_a_tabla(niveles, valores, es_minimo):
+    """Extiende la tabla después de agregar un valor al final de `valores` (O(log n))."""
+    n = len(valores)
+    if not niveles:
+        niveles.append([])
+    niveles[0].append(n - 1)
+    k = 1
+    while (1 << k) <= n:
+        mitad = 1 << (k - 1)
+        inicio = n - (1 << k)
+        if k == len(niveles):
+            niveles.append([])
+        anterior = niveles[k - 1]
+        niveles[k].append(_mejor(valores, anterior[inicio], anterior[inicio + mitad], es_minimo))
+        k += 1
+
+def _quitar_de_tabla(niveles, n_anterior):
+    """Descarta las entradas que cubren la última posición (antes de quitarla de `valores`)."""
+    for k, nivel in enumerate(niveles):
+        if len(nivel) > n_anterior - (1 << k):
+            nivel.pop()
+    while niveles and not niveles[-1]:
+        niveles.pop()
+
+def _consultar_tabla(niveles, valores, i, j, es_minimo):
+    """Posición del extremo en valores[i:j] (j exclusivo, j > i)."""
+    k = (j - i).bit_length() - 1
+    return _mejor(valores, niveles[k][i], niveles[k][j - (1 << k)], es_minimo)
+
+def construir_serie(por_dia, frecuencia="diaria"):
+    """
+    Construye la serie a partir del último registro válido de cada día (ordenado por fecha),
+    conservando el último registro de cada periodo de la frecuencia indicada.
+    """
+    if frecuencia not in FRECUENCIAS:
+        raise ValueError(f"Frecuencia no soportada: {frecuencia}. Opciones: {', '.join(FRECUENCIAS)}")
+
+    if por_dia is None or por_dia.empty:
+        registros = pd.DataFrame(columns=['fecha', *COLUMNAS_SERIE])
+        claves = pd.Series([], dtype='datetime64[ns]')
+    else:
+        claves = _clave_periodo(por_dia['fecha'], frecuencia)
+        ultimos = ~claves.duplicated(keep='last')
+        registros, claves = por_dia[ultimos], claves[ultimos]
+
+    serie = {
+        'frecuencia': frecuencia,
+        'claves': list(claves),
+        'fechas': list(registros['fecha']),
+        'tiempos': [fecha.value for fecha in registros['fecha']],
+        'valores': {},
+        'sumas': {},
+        'minimos': {},
+        'maximos': {},
+    }
+    for columna in COLUMNAS_SERIE:
+        valores = registros[columna].astype(float).tolist()
+        serie['valores'][columna] = valores
+        serie['sumas'][columna] = [0.0] + np.cumsum(valores).tolist()
+        serie['minimos'][columna] = _construir_tabla(valores, es_minimo=True)
+        serie['maximos'][columna] = _construir_tabla(valores, es_minimo=False)
+    return serie
+
+def actualizar_serie(serie, fecha, valores):
+    """
+    Agrega (o reemplaza, si cae en el mismo periodo) el registro más reciente de la serie.
+    `valores` es un diccionario con las columnas de COLUMNAS_SERIE. Devuelve False si la
+    fecha es anterior al último periodo; en ese caso hay que reconstruir la serie.
+    """
+    fecha = pd.Timestamp(fecha)
+    clave = _clave_periodo(pd.Series([fecha]), serie['frecuencia']).iloc[0]
+    n = len(serie['claves'])
+
+    if n and clave < serie['claves'][-1]:
+        return False
+
+    if n and clave == serie['claves'][-1]:
+        for lista in (serie['claves'], serie['fechas'], serie['tiempos']):
+            lista.pop()
+        for columna in COLUMNAS_SERIE:
+            _quitar_de_tabla(serie['minimos'][columna], n)
+            _quitar_de_tabla(serie['maximos'][columna], n)
+            serie['valores'][columna].pop()
+            serie['sumas'][columna].pop()
+
+    serie['claves'].append(clave)
+    serie['fechas'].append(fecha)
+    serie['tiempos'].append(fecha.value)
+    for columna in COLUMNAS_SERIE:
+        lista = serie['valores'][columna]
+        lista.append(float(valores[columna]))
+        serie['sumas'][columna].append(serie['sumas'][columna][-1] + lista[-1])
+        _agregar_a_tabla(serie['minimos'][columna], lista, es_minimo=True)
+        _agregar_a_tabla(serie['maximos'][columna], lista, es_minimo=False)
+    return True
+
+def rango_fechas(serie, desde=None, hasta=None):
+    """Posiciones [i, j) de los registros con desde <= fecha <= hasta (búsqueda binaria)."""
+    tiempos = serie['tiempos']
+    i = bisect_left(tiempos, pd.Timestamp(desde).value) if desde is not None else 0
+    j = bisect_right(tiempos, pd.Timestamp(hasta).value) if hasta is not None else len(tiempos)
+    return i, max(i, j)
+
+def estadisticas_rango(serie, columna, i, j):
+    """
+    Resumen de `columna` en las posiciones [i, j): inicio, fin, cambio, cambio_pct, minimo,
+    maximo (con fecha_minimo y fecha_maximo), promedio, registros y dias. None si está vacío.
+    """
+    if j <= i:
+        return None
+    valores = serie['valores'][columna]
+    pos_min = _consultar_tabla(serie['minimos'][columna], valores, i, j, es_minimo=True)
+    pos_max = _consultar_tabla(serie['maximos'][columna], valores, i, j, es_minimo=False)
+    inicio, fin = valores[i], valores[j - 1]
+    cambio = fin - inicio
+    return {
+        'inicio': inicio,
+        'fin': fin,
+        'cambio': cambio,
+        'cambio_pct': (cambio / inicio * 100) if inicio != 0 else 0.0,
+        'minimo': valores[pos_min],
+        'maximo': valores[pos_max],
+        'fecha_minimo': serie['fechas'][pos_min],
+        'fecha_maximo': serie['fechas'][pos_max],
+        'promedio': (serie['sumas'][columna][j] - serie['sumas'][columna][i]) / (j - i),
+        'registros': j - i,
+        'dias': (serie['fechas'][j - 1] - serie['fechas'][i]).days,
+    }
+
+def serie_a_dataframe(serie, i=0, j=None):
+    """Registros [i, j) de la serie como DataFrame (fecha + columnas), para graficar o mostrar."""
+    j = len(serie['fechas']) if j is None else j
+    datos = {'fecha': pd.to_datetime(serie['fechas'][i:j])}
+    for columna in COLUMNAS_SERIE:
+        datos[columna] = serie['valores'][columna][i:j]
+    return pd.DataFrame(datos, columns=['fecha', *COLUMNAS_SERIE])
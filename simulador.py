@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime, timedelta
 
+from montecarlo import simular_montecarlo, tasas_activos_portafolio
+
 # Verificar si plotly está disponible
 try:
     import plotly.express as px
@@ -12,12 +14,10 @@ try:
     PLOTLY_AVAILABLE = True
 except ImportError:
     PLOTLY_AVAILABLE = False
-    st.warning("📋 Plotly no está instalado. Usando matplotlib para visualizaciones. Para gráficos interactivos, instala plotly: `pip install plotly`")
 
-# Configuración de estilo para matplotlib
-plt.style.use('default')
-plt.rcParams['figure.figsize'] = (10, 6)
-plt.rcParams['axes.grid'] = True
+# Estilo de matplotlib para los gráficos de este módulo. No se modifica el estado
+# global al importar: se aplica con plt.rc_context solo mientras se dibuja la página.
+ESTILO_GRAFICOS = {'figure.figsize': (10, 6), 'axes.grid': True}
 
 # Function to format currency in Colombian Pesos
 def formato_pesos(valor):
@@ -305,10 +305,111 @@ def analisis_avanzado_portafolio(df, metricas, meta_ingreso_pasivo):
             st.info(f"📌 **Para alcanzar tu meta necesitas**: {formato_pesos(capital_adicional_necesario)} COP adicionales "
                    f"al rendimiento actual de {formato_porcentaje(metricas['rendimiento_promedio'])} anual.")
 
+def mostrar_simulacion_montecarlo(df):
+    """Proyección Monte Carlo: bandas P5/P50/P95 y probabilidad de alcanzar la meta"""
+    st.subheader("🎲 Simulación Monte Carlo")
+    st.caption("Proyecta miles de escenarios con rentabilidad, inflación y aportes inciertos, "
+               "a partir de la tasa de cada activo (Interés Mensual / Dinero).")
+
+    tasas, pesos, capital_total = tasas_activos_portafolio(df)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        anios = st.slider("Horizonte (años)", min_value=1, max_value=50, value=10, key="mc_anios")
+        n_trayectorias = st.selectbox("Número de escenarios", [1_000, 10_000, 100_000], index=1, key="mc_trayectorias")
+    with col2:
+        aporte_mensual = st.number_input(
+            "Aporte mensual (COP)", min_value=0.0,
+            value=float(st.session_state.get('inversion_mensual_informe', 0.0)),
+            step=100_000.0, format="%.0f", key="mc_aporte"
+        )
+        meta_capital = st.number_input(
+            "Meta de capital (COP)", min_value=0.0,
+            value=float(st.session_state.get('capital_meta_informe', 50_000_000.0)),
+            step=1_000_000.0, format="%.0f", key="mc_meta"
+        )
+    with col3:
+        inflacion_anual = st.number_input(
+            "Inflación anual esperada (%)", min_value=0.0, max_value=50.0,
+            value=float(st.session_state.get('inflacion_anual_input', 3.0)), step=0.5, key="mc_inflacion"
+        )
+        volatilidad_tasa = st.slider("Volatilidad de la rentabilidad (%)", min_value=0, max_value=100, value=30, key="mc_volatilidad") / 100
+
+    if not st.button("▶️ Ejecutar simulación", key="mc_ejecutar"):
+        return
+
+    with st.spinner(f"Simulando {n_trayectorias:,} escenarios..."):
+        resultado = simular_montecarlo(
+            capital_total, tasas, pesos, anios * 12,
+            n_trayectorias=n_trayectorias,
+            aporte_mensual=aporte_mensual,
+            volatilidad_tasa=volatilidad_tasa,
+            inflacion_anual=inflacion_anual,
+            meta=meta_capital,
+        )
+
+    meses = resultado['meses']
+    nominal = resultado['nominal']
+    real = resultado['real']
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Probabilidad de alcanzar la meta", formato_porcentaje(resultado['prob_meta'] * 100))
+    mediana = resultado['mediana_meses_meta']
+    col2.metric("Tiempo mediano a la meta", f"{mediana / 12:.1f} años" if np.isfinite(mediana) else "No se alcanza")
+    col3.metric("Capital final P50", formato_pesos(nominal[50][-1]))
+    col4.metric("Capital final P50 (pesos de hoy)", formato_pesos(real[50][-1]))
+
+    anios_eje = meses / 12
+    if PLOTLY_AVAILABLE:
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=anios_eje, y=nominal[95], mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=anios_eje, y=nominal[5], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor='rgba(31,119,180,0.2)', name='Rango P5 - P95'))
+        fig.add_trace(go.Scatter(x=anios_eje, y=nominal[50], mode='lines', line=dict(color='#1f77b4', width=3), name='Mediana (P50)'))
+        fig.add_trace(go.Scatter(x=anios_eje, y=real[50], mode='lines', line=dict(color='#ff7f0e', width=2, dash='dash'), name='Mediana en pesos de hoy'))
+        if meta_capital > 0:
+            fig.add_hline(y=meta_capital, line_dash="dot", line_color="green", annotation_text="Meta")
+        fig.update_layout(title="Bandas de Proyección Monte Carlo", xaxis_title="Años", yaxis_title="Capital (COP)",
+                          hovermode='x unified', height=500)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.fill_between(anios_eje, nominal[5], nominal[95], alpha=0.2, label='Rango P5 - P95')
+        ax.plot(anios_eje, nominal[50], linewidth=3, label='Mediana (P50)')
+        ax.plot(anios_eje, real[50], linestyle='--', label='Mediana en pesos de hoy')
+        if meta_capital > 0:
+            ax.axhline(meta_capital, color='green', linestyle=':', label='Meta')
+        ax.set_xlabel('Años')
+        ax.set_ylabel('Capital (COP)')
+        ax.set_title('Bandas de Proyección Monte Carlo')
+        ax.legend()
+        st.pyplot(fig)
+        plt.close(fig)
+
+    # Tabla resumen por año
+    filas = []
+    for anio in range(1, anios + 1):
+        idx = int(np.searchsorted(meses, anio * 12))
+        if idx >= len(meses):
+            idx = len(meses) - 1
+        filas.append({
+            'Año': anio,
+            'P5': formato_pesos(nominal[5][idx]),
+            'P50': formato_pesos(nominal[50][idx]),
+            'P95': formato_pesos(nominal[95][idx]),
+            'P50 (pesos de hoy)': formato_pesos(real[50][idx]),
+            'Prob. meta': formato_porcentaje(resultado['prob_meta_por_mes'][idx] * 100),
+        })
+    st.dataframe(pd.DataFrame(filas), use_container_width=True, hide_index=True)
+
+@plt.rc_context(ESTILO_GRAFICOS)
 def simular_proyecciones(df):
     st.header("📈 Simulador Avanzado de Proyecciones Financieras")
     st.subheader("Interés Simple vs Interés Compuesto con Métricas Avanzadas")
 
+    if not PLOTLY_AVAILABLE:
+        st.warning("📋 Plotly no está instalado. Usando matplotlib para visualizaciones. Para gráficos interactivos, instala plotly: `pip install plotly`")
+
     # ?Campo editable de meta
     meta_ingreso_pasivo = st.number_input(
         "Meta de Ingreso Pasivo Mensual (COP)",
@@ -318,10 +419,6 @@ def simular_proyecciones(df):
         format="%.2f"
     )
 
-    # Limpieza y preparacion
-    df['Dinero'] = df['Dinero'].replace('[\$,]', '', regex=True).astype(float)
-    df['Interes Mensual'] = df['Interes Mensual'].replace('[\$,]', '', regex=True).fillna(0).astype(float)
-
     # Calcular métricas financieras
     metricas = calcular_metricas_financieras(df)
     
@@ -334,7 +431,7 @@ def simular_proyecciones(df):
     df_proyecciones = calcular_proyecciones_compuestas(df)
 
     # Tabs para organizar la información
-    tab1, tab2, tab3, tab4 = st.tabs(["📋 Tabla Detallada", "📊 Visualizaciones", "📈 Evolución Temporal", "🔍 Análisis"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 Tabla Detallada", "📊 Visualizaciones", "📈 Evolución Temporal", "🔍 Análisis", "🎲 Monte Carlo"])
     
     with tab1:
         st.subheader("Comparación: Interés Simple vs Compuesto")
@@ -428,6 +525,9 @@ def simular_proyecciones(df):
             - Crecimiento exponencial
             - Fórmula: Capital × (1 + Tasa)^Tiempo
             """)
+    
+    with tab5:
+        mostrar_simulacion_montecarlo(df)
 
 # Ejemplo de uso (comentado para no ejecutar automáticamente)
 """
@@ -0,0 +1,98 @@
+# solver_metas.py
+# Cálculo en forma cerrada del tiempo necesario para alcanzar una meta de capital.
+# Lo usan la Calculadora FIRE, Camino a tu meta y el Generador de Informes,
+# para que las tres páginas den exactamente la misma respuesta.
+#
+# Todas las funciones aceptan números o arreglos de NumPy (con broadcasting),
+# de modo que miles de combinaciones "qué pasaría si" se resuelven en una sola llamada.
+
+import numpy as np
+
+# Horizonte máximo de las proyecciones (50 años); más allá se considera inalcanzable
+HORIZONTE_MAXIMO_MESES = 600
+
+def tasa_mensual_desde_anual(rentabilidad_anual):
+    """
+    Convierte una rentabilidad anual en % a tasa mensual decimal.
+    En la app la rentabilidad anual se obtiene como (ingreso mensual × 12) / capital,
+    por lo que la tasa mensual equivalente es la anual / 12.
+    """
+    return np.asarray(rentabilidad_anual, dtype=float) / 100 / 12
+
+def _como_resultado(valor, entradas):
+    """Devuelve float si todas las entradas eran escalares, o el arreglo en otro caso."""
+    if all(np.ndim(entrada) == 0 for entrada in entradas):
+        return float(valor)
+    return valor
+
+def meses_para_meta(capital_inicial, capital_objetivo, rentabilidad_anual, aporte_mensual=0.0,
+                    compuesto=True, max_meses=None):
+    """
+    Meses (fraccionarios) para llevar `capital_inicial` hasta `capital_objetivo`.
+
+    - compuesto=True: los intereses se reinvierten cada mes y el aporte se hace al
+      inicio del mes, es decir C_{t+1} = (C_t + aporte) × (1 + r).
+      Despejando: (1 + r)^n = (M·r + A') / (C·r + A'), con A' = aporte × (1 + r).
+    - compuesto=False (interés simple): solo el capital inicial genera interés y los
+      aportes se acumulan sin rendimiento: M = C + C·r·n + aporte·n.
+
+    Devuelve 0 si la meta ya se alcanzó e `inf` si no se alcanza nunca
+    (o si supera `max_meses`, cuando se indica).
+    """
+    entradas = (capital_inicial, capital_objetivo, rentabilidad_anual, aporte_mensual)
+    capital, meta, tasa, aporte = np.broadcast_arrays(
+        np.asarray(capital_inicial, dtype=float),
+        np.asarray(capital_objetivo, dtype=float),
+        tasa_mensual_desde_anual(rentabilidad_anual),
+        np.asarray(aporte_mensual, dtype=float),
+    )
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if compuesto:
+            aporte_efectivo = aporte * (1 + tasa)
+            numerador = meta * tasa + aporte_efectivo
+            denominador = capital * tasa + aporte_efectivo
+            meses_con_tasa = np.log(numerador / denominador) / np.log1p(tasa)
+            valido_con_tasa = (numerador > 0) & (denominador > 0) & (tasa > -1)
+            meses_con_tasa = np.where(valido_con_tasa, meses_con_tasa, np.inf)
+
+            # Con tasa 0 solo cuentan los aportes
+            meses_sin_tasa = np.where(aporte > 0, (meta - capital) / aporte, np.inf)
+            meses = np.where(tasa == 0, meses_sin_tasa, meses_con_tasa)
+        else:
+            avance_mensual = capital * tasa + aporte
+            meses = np.where(avance_mensual > 0, (meta - capital) / avance_mensual, np.inf)
+
+    meses = np.where(np.isnan(meses) | (meses < 0), np.inf, meses)
+    meses = np.where(capital >= meta, 0.0, meses)
+    if max_meses is not None:
+        meses = np.where(meses > max_meses, np.inf, meses)
+
+    return _como_resultado(meses, entradas)
+
+def capital_proyectado(capital_inicial, rentabilidad_anual, aporte_mensual, meses, compuesto=True):
+    """
+    Capital después de `meses` meses bajo el mismo modelo que `meses_para_meta`.
+    `meses` puede ser un arreglo (p. ej. np.arange(0, 601, 3)) para trazar la curva completa.
+    """
+    entradas = (capital_inicial, rentabilidad_anual, aporte_mensual, meses)
+    capital, tasa, aporte, n = np.broadcast_arrays(
+        np.asarray(capital_inicial, dtype=float),
+        tasa_mensual_desde_anual(rentabilidad_anual),
+        np.asarray(aporte_mensual, dtype=float),
+        np.asarray(meses, dtype=float),
+    )
+
+    if compuesto:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = np.power(1 + tasa, n)
+            acumulado_aportes = np.where(
+                tasa == 0,
+                aporte * n,
+                aporte * (1 + tasa) * (factor - 1) / tasa,
+            )
+        resultado = capital * factor + acumulado_aportes
+    else:
+        resultado = capital + capital * tasa * n + aporte * n
+
+    return _como_resultado(resultado, entradas)
@@ -0,0 +1,69 @@
+# test_amortizacion.py
+# Las tablas de amortización (mes a mes) deben cuadrar con los resúmenes en forma cerrada.
+
+import numpy as np
+import pytest
+
+from amortizacion import MODALIDADES, resumen_amortizacion, tabla_amortizacion
+
+CASOS = [(10_000_000.0, 2.0, 12), (5_000_000.0, 1.25, 36), (1_000_000.0, 0.0, 6), (3_000_000.0, 3.0, 1)]
+
+@pytest.mark.parametrize("modalidad", MODALIDADES)
+@pytest.mark.parametrize("monto, tasa, plazo", CASOS)
+def test_tabla_cuadra_con_resumen(modalidad, monto, tasa, plazo):
+    tabla = tabla_amortizacion(monto, tasa, plazo, modalidad)
+    resumen = resumen_amortizacion(monto, tasa, plazo, modalidad)
+
+    assert len(tabla) == plazo
+    assert tabla['mes'].tolist() == list(range(1, plazo + 1))
+    assert tabla['capital'].sum() == pytest.approx(monto)
+    assert tabla['interes'].sum() == pytest.approx(float(resumen['interes_total']))
+    assert tabla['cuota'].sum() == pytest.approx(float(resumen['total_pagado']))
+    assert tabla['cuota'].mean() == pytest.approx(float(resumen['cuota_promedio']))
+    if plazo > 1:
+        # Con un solo mes no hay cuotas "regulares", solo la final
+        assert tabla['cuota'].iloc[0] == pytest.approx(float(resumen['cuota_regular']))
+    assert tabla['cuota'].iloc[-1] == pytest.approx(float(resumen['cuota_final']))
+    assert tabla['saldo'].iloc[-1] == pytest.approx(0.0, abs=1e-6)
+    np.testing.assert_allclose(tabla['cuota'], tabla['interes'] + tabla['capital'])
+
+def test_francesa_coincide_con_recorrido_mes_a_mes():
+    monto, tasa, plazo = 10_000_000.0, 2.0, 24
+    tabla = tabla_amortizacion(monto, tasa, plazo, "francesa")
+    saldo = monto
+    for fila in tabla.itertuples():
+        interes = saldo * tasa / 100
+        saldo -= fila.cuota - interes
+        assert fila.interes == pytest.approx(interes)
+        assert fila.saldo == pytest.approx(max(saldo, 0.0), abs=1e-6)
+
+def test_modalidades_del_detalle():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    from evaluacion import MODALIDADES_DETALLE
+
+    for modalidad, clave_cuota in MODALIDADES_DETALLE.values():
+        assert modalidad in MODALIDADES
+        assert clave_cuota in resumen_amortizacion(1_000_000.0, 1.0, 12, modalidad)
+
+@pytest.mark.parametrize("modalidad", MODALIDADES)
+def test_grilla_de_escenarios(modalidad):
+    # Misma construcción que la simulación de escenarios de evaluacion.py
+    tasas = 1.0 + 0.25 * np.arange(9)
+    plazos = np.arange(6, 61, 6)
+    tasas_grilla, plazos_grilla = np.meshgrid(tasas, plazos, indexing='ij')
+    resumen = resumen_amortizacion(5_000_000.0, tasas_grilla, plazos_grilla, modalidad)
+
+    for valor in resumen.values():
+        assert valor.shape == (len(tasas), len(plazos))
+    i, j = 4, 7
+    individual = resumen_amortizacion(5_000_000.0, tasas[i], plazos[j], modalidad)
+    for clave, valor in resumen.items():
+        assert valor[i, j] == pytest.approx(float(individual[clave]))
+
+def test_plazo_invalido():
+    assert tabla_amortizacion(1_000_000.0, 1.0, 0, "francesa").empty
+    resumen = resumen_amortizacion(1_000_000.0, 1.0, np.array([0, 12]), "francesa")
+    assert np.isnan(resumen['cuota_regular'][0]) and np.isfinite(resumen['cuota_regular'][1])
+    with pytest.raises(ValueError):
+        tabla_amortizacion(1_000_000.0, 1.0, 12, "alemana")
@@ -0,0 +1,91 @@
+# test_analitica_historico.py
+# Pruebas de la analítica de snapshots: tendencia, TIR por bisección, TWR/MWR declaradas y máxima caída.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analitica_historico import DIAS_POR_ANIO, DIAS_POR_MES, _tir, ajustar_tendencia, analizar_historial, analizar_series
+
+def test_ajustar_tendencia_coincide_con_polyfit():
+    azar = np.random.default_rng(3)
+    x = np.sort(azar.uniform(0, 400, 15))
+    y = azar.normal(1000, 50, (15, 4)) + 2.5 * x[:, None]
+    pendientes, interceptos = ajustar_tendencia(x, y)
+    for columna in range(y.shape[1]):
+        pendiente, intercepto = np.polyfit(x, y[:, columna], 1)
+        assert pendientes[columna] == pytest.approx(pendiente)
+        assert interceptos[columna] == pytest.approx(intercepto)
+
+    # Con x constante la pendiente es 0 y el intercepto es el promedio
+    pendientes, interceptos = ajustar_tendencia([5.0, 5.0], np.array([[1.0], [3.0]]))
+    assert pendientes.tolist() == [0.0] and interceptos.tolist() == [2.0]
+
+def test_tir_flujo_conocido():
+    # 100 al inicio, aporte de 50 a mitad de año y 100·1.08 + 50·1.08^0.5 al final: TIR 8 %
+    tiempos = np.array([0.0, 0.5, 1.0])
+    flujos = np.array([[50.0, 0.0], [0.0, 0.0]])
+    valor_final = np.array([100 * 1.08 + 50 * 1.08 ** 0.5, 110.0])
+    tir = _tir(tiempos, np.array([100.0, 100.0]), flujos, valor_final)
+    assert tir[0] == pytest.approx(0.08, abs=1e-9)
+    # Sin aportes: 100 -> 110 en un año es 10 %
+    assert tir[1] == pytest.approx(0.10, abs=1e-9)
+
+def test_tir_sin_cambio_de_signo_es_nan():
+    # El valor final no puede alcanzarse con ninguna tasa dentro de LIMITES_TIR
+    tir = _tir(np.array([0.0, 1.0]), np.array([100.0]), np.array([[0.0]]), np.array([1e6]))
+    assert np.isnan(tir[0])
+
+def test_analizar_series_rendimiento_declarado():
+    fechas = pd.to_datetime(["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01"])
+    dias = (fechas - fechas[0]).days.to_numpy(dtype=float)
+    meses = np.diff(dias) / DIAS_POR_MES
+    # Columna 0: solo crece por el interés declarado (1 % mensual); columna 1: además recibe un aporte
+    aportes = np.array([[0.0, 0.0], [0.0, 500.0], [0.0, 0.0]])
+    valores = np.zeros((4, 2))
+    intereses = np.zeros((4, 2))
+    valores[0] = 1000.0
+    for t in range(1, 4):
+        intereses[t - 1] = valores[t - 1] * 0.01
+        valores[t] = valores[t - 1] + intereses[t - 1] * meses[t - 1] + aportes[t - 1]
+    intereses[-1] = valores[-1] * 0.01
+
+    metricas = analizar_series(fechas, valores, intereses)
+    assert metricas['Aportes netos'] == pytest.approx([0.0, 500.0])
+    twr_esperada = (np.prod(1 + 0.01 * meses) - 1) * 100
+    # TWR encadena solo el rendimiento declarado: el aporte no la cambia
+    assert metricas['Rentabilidad TWR declarada (%)'] == pytest.approx([twr_esperada, twr_esperada])
+    # Sin aportes la MWR es la TWR anualizada
+    anios = dias[-1] / DIAS_POR_ANIO
+    mwr_esperada = ((1 + twr_esperada / 100) ** (1 / anios) - 1) * 100
+    assert metricas['Rentabilidad MWR declarada anual (%)'][0] == pytest.approx(mwr_esperada, rel=1e-6)
+    assert metricas['Crecimiento (%)'][0] == pytest.approx(twr_esperada)
+    assert metricas['Máxima caída (%)'] == pytest.approx([0.0, 0.0])
+
+def test_maxima_caida():
+    fechas = pd.date_range("2024-01-01", periods=5, freq="MS")
+    valores = np.array([[100.0], [120.0], [90.0], [130.0], [117.0]])
+    metricas = analizar_series(fechas, valores, np.zeros_like(valores))
+    assert metricas['Máxima caída (%)'][0] == pytest.approx(-25.0)
+    # Sin interés declarado todo el cambio de valor cuenta como aporte
+    assert metricas['Aportes netos'][0] == pytest.approx(17.0)
+    assert metricas['Rentabilidad TWR declarada (%)'][0] == pytest.approx(0.0)
+
+def test_analizar_historial():
+    activos = pd.DataFrame({
+        'Fecha': pd.to_datetime(["2024-01-01"] * 2 + ["2024-02-01"] * 2 + ["2024-03-01"] * 2),
+        'Items': ["CDT", "ETF"] * 3,
+        'Tipo de inversion': ["Renta fija", "Acciones"] * 3,
+        'Dinero': [1000.0, 500.0, 1010.0, 450.0, 1020.0, 600.0],
+        'Interes Mensual': [10.0, 0.0, 10.0, 0.0, 10.0, 0.0],
+    })
+    resultado = analizar_historial(activos)
+    assert set(resultado['tipos'].index) == {"Renta fija", "Acciones"}
+    assert len(resultado['activos']) == 2
+    portafolio = resultado['portafolio'].loc['Portafolio']
+    assert portafolio['Valor inicial'] == 1500.0
+    assert portafolio['Valor final'] == 1620.0
+    assert resultado['tipos'].loc["Acciones", 'Máxima caída (%)'] == pytest.approx(-10.0)
+
+    vacio = analizar_historial(activos[activos['Fecha'] == "2024-01-01"])
+    assert all(tabla.empty for tabla in vacio.values())
@@ -0,0 +1,168 @@
+# test_categorizador_gastos.py
+# El motor de reglas (categorizador_gastos + reglas_gastos.json) debe asignar exactamente la misma
+# categoría que la cadena de `if` que reemplazó, incluido su orden de prioridad.
+
+import inspect
+import itertools
+import os
+import random
+import re
+
+import pandas as pd
+import pytest
+
+import categorizador_gastos
+from categorizador_gastos import categorizar_columna, categorizar_texto
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DESCRIPCIONES_ALEATORIAS = 20000
+
+@pytest.fixture(autouse=True)
+def reglas_del_repositorio(monkeypatch):
+    monkeypatch.setattr(categorizador_gastos, "REGLAS_GASTOS_FILE", os.path.join(RAIZ, "reglas_gastos.json"))
+
+# Cadena de `if` original (gestion_gastos.categorizar_gasto antes del motor de reglas), sin cambios:
+# incluye las condiciones siempre verdaderas de "movistar", "broker" y "mis cuentas".
+def categorizar_gasto_anterior(descripcion):
+    desc = descripcion.lower()
+
+    # INGRESOS
+    if "tesoro naci" in desc or "interbanc dir" in desc or "nomina" in desc or "salario" in desc:
+        return ("Ingreso", "Salario / Tesorería")
+    if "transferencia desde nequi" in desc or "transf qr keyner" in desc or "pago de cliente" in desc or "honorarios" in desc:
+        return ("Ingreso", "Transferencia / Honorarios")
+    if "consignacion" in desc or "deposito" in desc:
+        return ("Ingreso", "Consignación / Depósito")
+    if "abono intereses" in desc or "rendimientos" in desc:
+        return ("Financiero", "Intereses ganados")
+    if "bono" in desc or "regalo" in desc:
+        return ("Ingreso", "Bonos / Regalos")
+    if "reembolso" in desc or "devolucion" in desc:
+        return ("Ingreso", "Reembolso / Devolución")
+    if "venta" in desc or "ingreso extra" in desc:
+        return ("Ingreso", "Ventas / Ingresos Extra")
+
+    # GASTOS
+    if "transferencia a nequi" in desc or "transf qr nequi" in desc or "pago a proveedor" in desc:
+        return ("Gasto", "Transferencia a terceros")
+    if "retiro cajero" in desc or "retiro corresponsal" in desc or "efectivo" in desc:
+        return ("Gasto", "Retiros en efectivo")
+    if "pago suc virt tc" in desc or "mora tarjeta" in desc or "cuota tarjeta" in desc:
+        return ("Gasto", "Pago de tarjeta de crédito")
+    if "cuota manejo" in desc or "comision bancaria" in desc or "gmf" in desc:
+        return ("Financiero", "Comisión bancaria")
+    if "pago pse" in desc or "compra en" in desc or "pago qr" in desc or "adquisicion" in desc:
+        if any(keyword in desc for keyword in ["supermercado", "alimentos", "mercado", "d1", "exito", "jumbo", "tiendas ar", "tienda d1", "exito maga", "fruver", "carniceria", "panaderia", "farmatodo", "la rebaja"]):
+            return ("Gasto", "Alimentos y Compras")
+        elif any(keyword in desc for keyword in ["restaurante", "cafe", "bar", "comida rapida", "crepes de la villa", "pollos crock", "cali pollos", "pizzeria", "sushi", "domicilios", "rappipay"]):
+            return ("Gasto", "Comida Fuera")
+        elif any(keyword in desc for keyword in ["ropa", "zapatos", "moda", "boutique", "tienda de ropa", "falabella", "arturo calle"]):
+            return ("Gasto", "Vestimenta")
+        elif any(keyword in desc for keyword in ["cine", "concierto", "teatro", "ocio", "entretenimiento", "viaje", "bold*event", "parque", "museo", "vacaciones", "hotel", "tiquetes", "netflix", "spotify", "disney+"]):
+            return ("Gasto", "Ocio y Entretenimiento")
+        elif any(keyword in desc for keyword in ["salud", "medico", "farmacia", "hospital", "seguro medico", "odontologo", "terapia", "medicamentos", "drogueria", "eps"]):
+            return ("Gasto", "Salud")
+        elif any(keyword in desc for keyword in ["educacion", "curso", "universidad", "libros", "matricula", "diplomado", "taller", "colegio", "academia"]):
+            return ("Gasto", "Educación")
+        elif any(keyword in desc for keyword in ["gimnasio", "deporte", "entrenamiento", "suplementos", "sportlife", "smartfit"]):
+            return ("Gasto", "Deporte y Bienestar")
+        elif any(keyword in desc for keyword in ["mascota", "veterinaria", "alimento mascotas", "petshop"]):
+            return ("Gasto", "Mascotas")
+        elif any(keyword in desc for keyword in ["electronicos", "tecnologia", "celular", "computador", "gadget", "alkosto", "falabella tecnologia"]):
+            return ("Gasto", "Tecnología")
+        elif any(keyword in desc for keyword in ["muebles", "hogar", "decoracion", "electrodomesticos", "reparacion hogar", "ferreteria", "homecenter", "construccion"]):
+            return ("Gasto", "Hogar y Mantenimiento")
+        else:
+            return ("Gasto", "Compras y Pagos Varios")
+
+    if "transf a comunicacion" in desc or "pago celular" in desc or "recarga" in desc or "claro" in desc or "tigo" in desc or "movistar":
+        return ("Gasto", "Comunicación")
+    if any(keyword in desc for keyword in ["arriendo", "hipoteca", "servicios", "luz", "agua", "gas", "internet", "administracion", "impuestos predial", "alquiler"]):
+        return ("Gasto", "Vivienda y Servicios")
+    if any(keyword in desc for keyword in ["transporte", "gasolina", "bus", "taxi", "uber", "metro", "peajes", "mantenimiento vehiculo", "parqueadero", "transmilenio"]):
+        return ("Gasto", "Transporte")
+    if any(keyword in desc for keyword in ["seguros", "poliza", "seguro vida", "seguro auto", "seguro hogar"]):
+        return ("Gasto", "Seguros")
+    if any(keyword in desc for keyword in ["impuestos", "dian", "renta", "iva"]):
+        return ("Gasto", "Impuestos")
+    if any(keyword in desc for keyword in ["donacion", "caridad", "fundacion"]):
+        return ("Gasto", "Donaciones")
+    if any(keyword in desc for keyword in ["belleza", "peluqueria", "estetica", "spa", "cosmeticos"]):
+        return ("Gasto", "Cuidado Personal")
+    if any(keyword in desc for keyword in ["regalo", "celebracion", "fiesta", "evento"]):
+        return ("Gasto", "Regalos y Celebraciones")
+
+    # INVERSIÓN
+    if "apertura inv" in desc or "compra acciones" in desc or "fondo de inversion" in desc or "cdt" in desc or "bolsa" in desc or "broker":
+        return ("Inversión", "Inversión en Mercados")
+    if "pago pse lulo bank" in desc or "nu colombia" in desc or "daviplata" in desc or "banco digital" in desc or "tyba" in desc or "afin" in desc:
+        return ("Inversión", "Neobancos / Plataformas Digitales")
+    if "compra cripto" in desc or "binance" in desc or "exchange cripto" in desc or "coinbase" in desc:
+        return ("Inversión", "Criptomonedas")
+
+    # TRANSFERENCIAS INTERNAS (entre cuentas propias, no son gasto ni ingreso real)
+    if "cta suc virtual" in desc or "suc virtual" in desc or "keyner andres" in desc or "transferencia entre cuentas" in desc or "mis cuentas":
+        return ("Transferencia Interna", "Entre cuentas propias")
+
+    # OTROS
+    return ("Otros", "Sin clasificar")
+
+
+# Todas las palabras clave que aparecen en la cadena original
+PALABRAS = sorted(set(re.findall(r'"([^"]+)"', inspect.getsource(categorizar_gasto_anterior))) - {
+    tipo for resultado in re.findall(r'return \("([^"]+)", "([^"]+)"\)', inspect.getsource(categorizar_gasto_anterior))
+    for tipo in resultado
+})
+
+def _descripciones():
+    azar = random.Random(2024)
+    relleno = ["", "pago", "compra", "ref 123", "bogota", "xx", "*", "   "]
+    descripciones = list(PALABRAS)
+    descripciones += [f"{a} {b}" for a, b in itertools.permutations(PALABRAS, 2) if azar.random() < 0.05]
+    for _ in range(DESCRIPCIONES_ALEATORIAS):
+        partes = azar.sample(PALABRAS, azar.randint(1, 4)) + azar.sample(relleno, 2)
+        azar.shuffle(partes)
+        texto = " ".join(partes)
+        descripciones.append(texto.upper() if azar.random() < 0.2 else texto)
+    return descripciones
+
+@pytest.mark.parametrize("descripcion, esperado", [
+    # Condición siempre verdadera de "movistar": lo que no coincidió antes es Comunicación
+    ("texto sin palabras clave", ("Gasto", "Comunicación")),
+    ("", ("Gasto", "Comunicación")),
+    ("arriendo apartamento", ("Gasto", "Comunicación")),
+    ("binance compra cripto", ("Gasto", "Comunicación")),
+    ("broker internacional", ("Gasto", "Comunicación")),
+    ("transferencia a mis cuentas", ("Gasto", "Comunicación")),
+    # Subreglas de "pago pse" / "compra en" / "pago qr" / "adquisicion", en su orden
+    ("PAGO PSE EXITO", ("Gasto", "Alimentos y Compras")),
+    ("pago pse restaurante exito", ("Gasto", "Alimentos y Compras")),
+    ("compra en pizzeria", ("Gasto", "Comida Fuera")),
+    ("compra en bar", ("Gasto", "Comida Fuera")),
+    ("pago qr falabella tecnologia", ("Gasto", "Vestimenta")),
+    ("adquisicion hotel", ("Gasto", "Ocio y Entretenimiento")),
+    ("pago pse drogueria", ("Gasto", "Salud")),
+    ("pago pse lulo bank", ("Gasto", "Compras y Pagos Varios")),
+    ("pago pse nu colombia", ("Gasto", "Compras y Pagos Varios")),
+    ("pago pse sportlife", ("Gasto", "Deporte y Bienestar")),
+    ("pago pse homecenter", ("Gasto", "Hogar y Mantenimiento")),
+    # Prioridad entre reglas
+    ("nomina pago pse exito", ("Ingreso", "Salario / Tesorería")),
+    ("bono regalo", ("Ingreso", "Bonos / Regalos")),
+    ("cuota manejo gmf", ("Financiero", "Comisión bancaria")),
+])
+def test_casos_conocidos(descripcion, esperado):
+    assert categorizar_gasto_anterior(descripcion) == esperado
+    assert categorizar_texto(descripcion) == esperado
+
+def test_cada_palabra_clave_igual_a_la_cadena_original():
+    for palabra in PALABRAS:
+        assert categorizar_texto(palabra) == categorizar_gasto_anterior(palabra), palabra
+
+def test_mezclas_aleatorias_igual_a_la_cadena_original():
+    descripciones = _descripciones()
+    esperado = [categorizar_gasto_anterior(descripcion) for descripcion in descripciones]
+    assert [categorizar_texto(descripcion) for descripcion in descripciones] == esperado
+
+    columna = categorizar_columna(pd.Series(descripciones))
+    assert list(zip(columna['tipo'], columna['categoria'])) == esperado
@@ -0,0 +1,71 @@
+# test_evaluacion_lote.py
+# La evaluación por lote (vectorizada) debe dar, fila por fila, el mismo resultado que la
+# evaluación individual: calcular_cuota_francesa + clasificar_endeudamiento + riesgo_por_actividad.
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("plotly")
+
+from evaluacion import (
+    COLUMNAS_LOTE, calcular_cuota_francesa, clasificar_endeudamiento, evaluar_solicitudes_lote, riesgo_por_actividad
+)
+
+DATOS_INVALIDOS = "Datos inválidos: el monto y el plazo deben ser mayores a 0."
+
+# Filas del CSV (texto, como las lee leer_solicitudes_csv) y los números que deben resultar:
+# (Ingresos, Deudas Actuales, Monto Prestamo, Tasa (%), Plazo (meses))
+CASOS = [
+    (["Ana", "$ 5.000.000", "$ 300.000", "$ 10.000.000", "1.5", "24", "Empleado"], (5e6, 3e5, 1e7, 1.5, 24)),
+    (["Luis", "4,000,000.00", "0", "2,000,000", "1,5%", " 12 ", "Independiente"], (4e6, 0, 2e6, 1.5, 12)),
+    (["Eva", "3.000.000", "100.000", "5.000.000", "1.125", "36", "Informal"], (3e6, 1e5, 5e6, 1.125, 36)),
+    (["Sin ingresos", "0", "0", "1.000.000", "2 %", "12", "Desempleado"], (0, 0, 1e6, 2.0, 12)),
+    (["Monto cero", "2.000.000", "0", "0", "1", "12", "Empleado"], (2e6, 0, 0, 1.0, 12)),
+    (["Plazo cero", "2.000.000", "0", "1.000.000", "1", "0", "Empleado"], (2e6, 0, 1e6, 1.0, 0)),
+    (["Plazo texto", "2.000.000", "0", "1.000.000", "1", "doce", "Otro"], (2e6, 0, 1e6, 1.0, 0)),
+    (["Tasa cero", "1.000.000", "0", "1.200.000", "0", "12", "Pensionado"], (1e6, 0, 1.2e6, 0.0, 12)),
+    (["Tasa vacía", "1.000.000", "50.000", "1.200.000", None, "6", None], (1e6, 5e4, 1.2e6, 0.0, 6)),
+    # Exactamente en el límite de un rango (20 %)
+    (["Límite", "1.000.000", "100.000", "1.200.000", "0", "12", "Empleado"], (1e6, 1e5, 1.2e6, 0.0, 12)),
+]
+
+def _resultado_individual(ingresos, deudas, monto, tasa, plazo):
+    if monto <= 0 or plazo <= 0:
+        return DATOS_INVALIDOS, np.nan
+    cuota = calcular_cuota_francesa(monto, tasa, plazo)
+    return clasificar_endeudamiento(ingresos, deudas + cuota), cuota
+
+def _verificar(filas, numeros, actividades):
+    resultado = evaluar_solicitudes_lote(pd.DataFrame(filas, columns=COLUMNAS_LOTE, dtype=object))
+    assert len(resultado) == len(filas)
+    for fila, (ingresos, deudas, monto, tasa, plazo), actividad in zip(resultado.itertuples(index=False), numeros, actividades):
+        assert (fila.Ingresos, fila[2], fila[3], fila[4], fila[5]) == pytest.approx((ingresos, deudas, monto, tasa, plazo))
+        esperado, cuota = _resultado_individual(ingresos, deudas, monto, tasa, plazo)
+        assert fila.Resultado == esperado
+        if np.isnan(cuota):
+            assert np.isnan(fila[6])
+        else:
+            assert fila[6] == pytest.approx(cuota)
+        assert fila[9] == riesgo_por_actividad(actividad)
+
+def test_lote_coincide_con_evaluacion_individual():
+    filas = [fila for fila, _ in CASOS]
+    _verificar(filas, [numeros for _, numeros in CASOS], [fila[-1] for fila in filas])
+
+def test_lote_aleatorio_coincide_con_evaluacion_individual():
+    azar = np.random.default_rng(7)
+    n = 500
+    ingresos = azar.choice([0.0, 1e6, 2.5e6, 8e6], n)
+    deudas = azar.choice([0.0, 2e5, 9e5], n)
+    montos = azar.choice([0.0, 5e5, 3e6, 2e7], n)
+    tasas = azar.choice([0.0, 0.5, 1.25, 2.0, 3.5], n)
+    plazos = azar.choice([0, 6, 12, 36, 60], n)
+    actividades = azar.choice(["Empleado", "Independiente", "Informal", "Desempleado", "Otro", "Estudiante"], n)
+    filas = [
+        [f"S{i}", f"{ingresos[i]:.0f}", f"{deudas[i]:.0f}", f"{montos[i]:.0f}", f"{tasas[i]}%", str(plazos[i]), actividades[i]]
+        for i in range(n)
+    ]
+    numeros = list(zip(ingresos, deudas, montos, tasas, plazos.astype(float)))
+    _verificar(filas, numeros, actividades)
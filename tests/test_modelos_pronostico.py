@@ -0,0 +1,105 @@
+# test_modelos_pronostico.py
+# Pruebas de los modelos de pronóstico con origen móvil: Holt contra un recorrido escalar,
+# ausencia de datos futuros en cada origen y elección del mejor modelo.
+
+import numpy as np
+import pytest
+
+from modelos_pronostico import (
+    ALFAS_HOLT, BETAS_HOLT, MODELOS, backtest, modelo_crecimiento_compuesto, modelo_holt, modelo_lineal, pronosticar
+)
+
+def _serie(n=30, semilla=11):
+    azar = np.random.default_rng(semilla)
+    return 10e6 * 1.02 ** np.arange(n) + azar.normal(0, 2e5, n)
+
+def _holt_escalar(y, alfa, beta):
+    """Holt clásico, un parámetro a la vez: (nivel, tendencia, error de un paso acumulado) en cada origen."""
+    nivel, tendencia, error = y[0], 0.0, 0.0
+    estados = [(nivel, tendencia, error)]
+    for valor in y[1:]:
+        esperado = nivel + tendencia
+        error += (valor - esperado) ** 2
+        nuevo_nivel = alfa * valor + (1 - alfa) * esperado
+        tendencia = beta * (nuevo_nivel - nivel) + (1 - beta) * tendencia
+        nivel = nuevo_nivel
+        estados.append((nivel, tendencia, error))
+    return estados
+
+def test_holt_coincide_con_recorrido_escalar():
+    y = _serie()
+    pasos = 4
+    matriz = modelo_holt(y, pasos)
+    recorridos = {(alfa, beta): _holt_escalar(y, alfa, beta) for beta in BETAS_HOLT for alfa in ALFAS_HOLT}
+    for origen in range(len(y)):
+        # Misma regla de desempate que np.argmin: la primera pareja de la grilla con el menor error
+        mejor = min(recorridos, key=lambda pareja: recorridos[pareja][origen][2])
+        nivel, tendencia, _ = recorridos[mejor][origen]
+        np.testing.assert_allclose(matriz[origen], nivel + tendencia * np.arange(1, pasos + 1), rtol=1e-10)
+
+def test_holt_con_un_solo_parametro():
+    y = _serie(12)
+    matriz = modelo_holt(y, 2, alfas=(0.5,), betas=(0.3,))
+    for origen, (nivel, tendencia, _) in enumerate(_holt_escalar(y, 0.5, 0.3)):
+        assert matriz[origen] == pytest.approx([nivel + tendencia, nivel + 2 * tendencia])
+
+def test_lineal_coincide_con_polyfit_por_prefijo():
+    y = _serie(15)
+    matriz = modelo_lineal(y, 3)
+    for origen in range(1, len(y)):
+        pendiente, intercepto = np.polyfit(np.arange(origen + 1), y[:origen + 1], 1)
+        assert matriz[origen] == pytest.approx(intercepto + pendiente * np.arange(origen + 1, origen + 4))
+
+@pytest.mark.parametrize("nombre", list(MODELOS))
+def test_pronostico_no_usa_datos_posteriores_al_origen(nombre):
+    y = _serie(24)
+    ingreso = y * 0.008
+    pasos = 6
+    matriz = MODELOS[nombre](y, pasos, ingreso=ingreso)
+    assert matriz.shape == (len(y), pasos)
+    for origen in (2, 9, 17):
+        # Se alteran todos los valores posteriores al origen: su fila no debe cambiar
+        alterada = y.copy()
+        alterada[origen + 1:] *= 3.0
+        alterado = ingreso.copy()
+        alterado[origen + 1:] *= 5.0
+        np.testing.assert_allclose(MODELOS[nombre](alterada, pasos, ingreso=alterado)[origen], matriz[origen])
+        # y recortar la serie en el origen da el mismo pronóstico
+        recortada = MODELOS[nombre](y[:origen + 1], pasos, ingreso=ingreso[:origen + 1])
+        np.testing.assert_allclose(recortada[-1], matriz[origen])
+
+def test_crecimiento_compuesto_con_valores_no_positivos():
+    y = np.array([100.0, 110.0, 0.0, 130.0, 140.0])
+    matriz = modelo_crecimiento_compuesto(y, 2)
+    assert np.isfinite(matriz[:2]).all()
+    assert np.isnan(matriz[2:]).all()
+
+def test_backtest():
+    y = np.array([10.0, 20.0, 30.0, 40.0, 50.0])
+    # Pronóstico "ingenuo": repite el último valor conocido
+    pronosticos = np.repeat(y[:, None], 2, axis=1)
+    resultado = backtest(y, pronosticos, minimo=2)
+    # Orígenes 1..3; un paso: 20->30, 30->40, 40->50; dos pasos: 20->40, 30->50
+    errores = np.array([10.0, 10.0, 10.0, 20.0, 20.0])
+    reales = np.array([30.0, 40.0, 50.0, 40.0, 50.0])
+    assert resultado['Pronósticos evaluados'] == 5
+    assert resultado['RMSE'] == pytest.approx(np.sqrt(np.mean(errores ** 2)))
+    assert resultado['MAPE (%)'] == pytest.approx(np.mean(errores / reales) * 100)
+
+    # Sin orígenes evaluables
+    vacio = backtest(y[:2], pronosticos[:2], minimo=3)
+    assert vacio['Pronósticos evaluados'] == 0 and np.isnan(vacio['RMSE'])
+
+def test_pronosticar_elige_el_menor_mape():
+    y = 5e6 + 2e5 * np.arange(20)
+    resultado = pronosticar(y, 3)
+    evaluacion = resultado['evaluacion']
+    assert resultado['mejor'] == evaluacion['MAPE (%)'].idxmin()
+    # Una recta exacta la pronostica sin error el modelo lineal
+    assert evaluacion.loc["Lineal", 'MAPE (%)'] == pytest.approx(0.0, abs=1e-9)
+    assert resultado['pronosticos']["Lineal"] == pytest.approx(5e6 + 2e5 * np.arange(20, 23))
+
+def test_pronosticar_historia_corta_usa_modelo_por_defecto():
+    resultado = pronosticar(np.array([100.0, 120.0]), 2)
+    assert resultado['mejor'] == "Lineal"
+    assert (resultado['evaluacion']['Pronósticos evaluados'] == 0).all()
@@ -0,0 +1,54 @@
+# test_montecarlo.py
+# Pruebas del motor Monte Carlo: sin volatilidad debe reproducir la forma cerrada de solver_metas.
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from montecarlo import simular_montecarlo, tasas_activos_portafolio
+from solver_metas import capital_proyectado, meses_para_meta
+
+SIN_VOLATILIDAD = dict(volatilidad_tasa=0.0, volatilidad_inflacion=0.0, volatilidad_aporte=0.0)
+
+def test_tasas_activos_portafolio():
+    df = pd.DataFrame({'Dinero': [600.0, 400.0, 0.0], 'Interes Mensual': [6.0, 2.0, 0.0]})
+    tasas, pesos, capital = tasas_activos_portafolio(df)
+    assert tasas.tolist() == pytest.approx([0.01, 0.005, 0.0])
+    assert pesos.tolist() == pytest.approx([0.6, 0.4, 0.0])
+    assert capital == 1000.0
+
+def test_sin_volatilidad_coincide_con_forma_cerrada():
+    capital, aporte, meses, meta = 20e6, 1.5e6, 240, 300e6
+    tasas, pesos = [0.012, 0.006], [0.5, 0.5]
+    rentabilidad_anual = 0.009 * 12 * 100
+    resultado = simular_montecarlo(capital, tasas, pesos, meses, n_trayectorias=2_000, aporte_mensual=aporte,
+                                   inflacion_anual=6.0, meta=meta, trayectorias_por_bloque=700,
+                                   semilla=11, **SIN_VOLATILIDAD)
+
+    esperado = capital_proyectado(capital, rentabilidad_anual, aporte, resultado['meses'])
+    np.testing.assert_allclose(resultado['nominal'][50], esperado, rtol=1e-4)
+    np.testing.assert_allclose(resultado['nominal'][5], resultado['nominal'][95], rtol=1e-6)
+    np.testing.assert_allclose(resultado['real'][50], esperado / (1 + 0.06 / 12) ** resultado['meses'], rtol=1e-4)
+
+    assert resultado['prob_meta'] == 1.0
+    assert resultado['mediana_meses_meta'] == math.ceil(meses_para_meta(capital, meta, rentabilidad_anual, aporte))
+
+def test_sin_aportes_ni_volatilidad():
+    resultado = simular_montecarlo(1e6, [0.01], [1.0], 60, n_trayectorias=100, meta=1e9, semilla=3, **SIN_VOLATILIDAD)
+    np.testing.assert_allclose(resultado['nominal'][50], 1e6 * 1.01 ** resultado['meses'], rtol=1e-5)
+    assert resultado['prob_meta'] == 0.0
+    assert resultado['mediana_meses_meta'] == math.inf
+
+def test_semilla_reproducible_y_bandas_ordenadas():
+    argumentos = dict(capital_inicial=10e6, tasas_activos=[0.01, 0.02], pesos=[0.7, 0.3], meses=120,
+                      n_trayectorias=3_000, aporte_mensual=5e5, inflacion_anual=5.0, meta=60e6, semilla=42)
+    primero = simular_montecarlo(**argumentos)
+    segundo = simular_montecarlo(**argumentos)
+    for percentil in (5, 50, 95):
+        np.testing.assert_array_equal(primero['nominal'][percentil], segundo['nominal'][percentil])
+    assert (primero['nominal'][5] <= primero['nominal'][50]).all()
+    assert (primero['nominal'][50] <= primero['nominal'][95]).all()
+    assert (np.diff(primero['prob_meta_por_mes']) >= 0).all()
+    assert 0.0 < primero['prob_meta'] <= 1.0
@@ -0,0 +1,86 @@
+# test_pronostico_gastos.py
+# Pruebas del pronóstico por categoría y de la detección de transacciones atípicas.
+
+import pandas as pd
+import pytest
+
+from pronostico_gastos import (
+    CONSTANTE_MAD, UMBRAL_ANOMALIA, detectar_anomalias, matriz_mensual, pronosticar_gastos, puntajes_robustos
+)
+
+def _totales_estacionales(anios=3):
+    """Mercado: 100 + 10 por mes calendario, más 100 en diciembre (320); Transporte: 50 fijo."""
+    meses = pd.period_range("2021-01", periods=12 * anios, freq="M")
+    mercado = [100.0 + 10 * mes.month + (100 if mes.month == 12 else 0) for mes in meses]
+    return pd.DataFrame({
+        'Mes': list(meses) * 2,
+        'Categoria': ["Gasto - Mercado"] * len(meses) + ["Gasto - Transporte"] * len(meses),
+        'Monto': mercado + [50.0] * len(meses),
+    })
+
+def test_matriz_mensual_rellena_meses_sin_movimientos():
+    totales = pd.DataFrame({
+        'Mes': pd.PeriodIndex(["2024-01", "2024-03"], freq="M"),
+        'Categoria': ["A", "B"],
+        'Monto': [10.0, 5.0],
+    })
+    matriz = matriz_mensual(totales, hasta=pd.Period("2024-04", freq="M"))
+    assert [str(mes) for mes in matriz.index] == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    assert matriz.loc[pd.Period("2024-02", freq="M")].tolist() == [0.0, 0.0]
+    assert matriz["B"].sum() == 5.0
+
+def test_proyeccion_estacional():
+    totales = _totales_estacionales()
+    # Pronóstico de diciembre del tercer año con los meses cerrados hasta noviembre
+    pronostico = pronosticar_gastos(totales, hasta=pd.Period("2023-11", freq="M"))
+    assert pronostico.attrs['mes_proyectado'] == pd.Period("2023-12", freq="M")
+
+    matriz = matriz_mensual(totales, hasta=pd.Period("2023-11", freq="M"))
+    mercado = pronostico.loc["Gasto - Mercado"]
+    assert mercado['Último mes'] == 210.0
+    assert mercado['Promedio móvil'] == pytest.approx((190 + 200 + 210) / 3)
+    assert mercado['Base estacional'] == pytest.approx(320.0)
+    assert mercado['Índice estacional'] == pytest.approx(320.0 / matriz["Gasto - Mercado"].mean())
+    assert mercado['Proyección'] == pytest.approx(mercado['Promedio móvil'] * mercado['Índice estacional'])
+    # Diciembre supera el promedio móvil; una categoría plana no tiene efecto estacional
+    assert mercado['Proyección'] > mercado['Promedio móvil']
+    transporte = pronostico.loc["Gasto - Transporte"]
+    assert transporte['Índice estacional'] == pytest.approx(1.0)
+    assert transporte['Proyección'] == pytest.approx(50.0)
+
+def test_sin_un_anio_completo_no_aplica_indice():
+    totales = _totales_estacionales(anios=1)
+    pronostico = pronosticar_gastos(totales, hasta=pd.Period("2021-06", freq="M"))
+    assert (pronostico['Índice estacional'] == 1.0).all()
+    assert pronostico['Base estacional'].isna().all()
+    assert pronostico.loc["Gasto - Mercado", 'Proyección'] == pytest.approx((140 + 150 + 160) / 3)
+
+def test_puntajes_robustos():
+    montos = pd.Series([10.0, 12.0, 11.0, 13.0, 100.0, 5.0, 5.0, 5.0, 50.0])
+    grupos = pd.Series(["A"] * 5 + ["B"] * 4)
+    puntajes = puntajes_robustos(montos, grupos)
+    # Grupo A: mediana 12, MAD = mediana(|x - 12|) = 1
+    assert puntajes.iloc[4] == pytest.approx(CONSTANTE_MAD * (100 - 12) / 1)
+    assert puntajes.iloc[0] == pytest.approx(CONSTANTE_MAD * (10 - 12) / 1)
+    # Grupo B: mediana 5, MAD 0 -> puntaje 0 aunque haya un valor muy alejado
+    assert (puntajes.iloc[5:] == 0.0).all()
+
+def test_detectar_anomalias_por_tipo():
+    gastos = pd.DataFrame({
+        'Fecha': pd.date_range("2024-01-01", periods=9),
+        'Descripcion': [f"t{i}" for i in range(9)],
+        'Monto': [-10.0, -12.0, -11.0, -13.0, -100.0, 900.0, 1000.0, 1100.0, 9000.0],
+        'Categoria': ["Gasto - Mercado"] * 5 + ["Ingreso - Salario"] * 4,
+    })
+    anomalias = detectar_anomalias(gastos, tipos=["Gasto"])
+    assert anomalias['Descripcion'].tolist() == ["t4"]
+    assert anomalias['Puntaje'].iloc[0] > UMBRAL_ANOMALIA
+
+    todas = detectar_anomalias(gastos)
+    assert set(todas['Descripcion']) == {"t4", "t8"}
+    assert todas['Puntaje'].is_monotonic_decreasing
+
+def test_detectar_anomalias_vacio():
+    vacio = pd.DataFrame(columns=['Fecha', 'Descripcion', 'Monto', 'Categoria'])
+    assert detectar_anomalias(vacio).empty
+    assert pronosticar_gastos(pd.DataFrame(columns=['Mes', 'Categoria', 'Monto'])).empty
@@ -0,0 +1,74 @@
+# test_repositorio.py
+# Pruebas de la capa SQLite sobre una base temporal (finanzas.db en un directorio de prueba).
+
+import pandas as pd
+import pytest
+
+import repositorio
+
+FILAS = 5000
+
+@pytest.fixture
+def base_temporal(tmp_path, monkeypatch):
+    # Sin archivos legados en el directorio de trabajo: la migración no importa nada
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(repositorio, "DB_FILE", str(tmp_path / "finanzas.db"))
+    return tmp_path
+
+def _gastos(n, desde=0):
+    indices = range(desde, desde + n)
+    return pd.DataFrame({
+        'Fecha': pd.to_datetime('2024-01-01') + pd.to_timedelta([i % 365 for i in indices], unit='D'),
+        'Descripcion': [f"Compra {i}" for i in indices],
+        'Monto': [-(i % 97) - 1.5 for i in indices],
+        'Categoria': ['Gastos - Mercado' if i % 2 else 'Gastos - Transporte' for i in indices],
+    })
+
+def test_agregar_gastos_devuelve_filas_insertadas(base_temporal):
+    assert repositorio.agregar_gastos(_gastos(FILAS)) == FILAS
+    assert len(repositorio.leer_gastos()) == FILAS
+
+def test_agregar_gastos_no_cuenta_repetidas(base_temporal):
+    repositorio.agregar_gastos(_gastos(FILAS))
+    # La mitad ya existe: solo se cuentan las nuevas
+    assert repositorio.agregar_gastos(_gastos(FILAS, desde=FILAS // 2)) == FILAS // 2
+    assert repositorio.agregar_gastos(_gastos(FILAS)) == 0
+    assert len(repositorio.leer_gastos()) == FILAS + FILAS // 2
+
+def test_resumen_mensual_coincide_con_transacciones(base_temporal):
+    df = _gastos(FILAS)
+    repositorio.agregar_gastos(df)
+    resumen = repositorio.leer_resumen_gastos()
+    assert resumen['Transacciones'].sum() == FILAS
+    assert resumen['Egresos'].sum() == pytest.approx(-df['Monto'].sum())
+
+def _reiniciar(monkeypatch):
+    """Simula un nuevo inicio de la aplicación sobre la misma base."""
+    repositorio.obtener_conexion().close()
+    monkeypatch.setattr(repositorio._local, "conexion", None)
+    repositorio._bases_inicializadas.discard(repositorio.DB_FILE)
+
+def test_migracion_espera_archivo_legado_ausente(base_temporal, monkeypatch):
+    # Primer inicio sin el archivo legado: no se importa nada ni se marca como migrado
+    assert repositorio.leer_snapshots().empty
+    migradas = repositorio.obtener_conexion().execute("SELECT nombre FROM migraciones").fetchall()
+    assert migradas == []
+
+    # El archivo aparece (p. ej. restaurado de una copia) y se importa en el siguiente inicio
+    pd.DataFrame({'Fecha': ["2024-01", "2024-02"], 'Capital Total': [100.0, 110.0],
+                  'Ingreso Pasivo': [1.0, 1.1]}).to_csv(base_temporal / repositorio.SNAPSHOTS_LEGADO, index=False)
+    _reiniciar(monkeypatch)
+    assert repositorio.leer_snapshots()['Capital Total'].tolist() == [100.0, 110.0]
+
+    # Ya migrado: cambios posteriores al archivo no se vuelven a importar
+    pd.DataFrame({'Fecha': ["2024-03"], 'Capital Total': [999.0],
+                  'Ingreso Pasivo': [9.0]}).to_csv(base_temporal / repositorio.SNAPSHOTS_LEGADO, index=False)
+    _reiniciar(monkeypatch)
+    assert len(repositorio.leer_snapshots()) == 2
+
+def test_migracion_fallida_se_reintenta(base_temporal, monkeypatch):
+    (base_temporal / repositorio.SNAPSHOTS_LEGADO).write_text("Fecha,Capital Total\n2024-01,100\n", encoding="utf-8")
+    with pytest.warns(UserWarning, match=repositorio.SNAPSHOTS_LEGADO):
+        assert repositorio.leer_snapshots().empty
+    conexion = repositorio.obtener_conexion()
+    assert conexion.execute("SELECT 1 FROM migraciones WHERE nombre = ?", (repositorio.SNAPSHOTS_LEGADO,)).fetchone() is None
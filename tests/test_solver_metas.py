@@ -0,0 +1,92 @@
+# test_solver_metas.py
+# Pruebas del solver de tiempo a la meta (solver_metas) y de los hitos de "Camino a tu meta".
+
+import math
+
+import numpy as np
+import pytest
+
+from solver_metas import capital_proyectado, meses_para_meta, tasa_mensual_desde_anual
+
+def _simular_compuesto(capital, tasa_anual, aporte, meses):
+    """Mes a mes, como lo describe el solver: C_{t+1} = (C_t + aporte) × (1 + r)."""
+    tasa = tasa_anual / 100 / 12
+    for _ in range(meses):
+        capital = (capital + aporte) * (1 + tasa)
+    return capital
+
+def test_tasa_mensual_desde_anual():
+    assert tasa_mensual_desde_anual(12.0) == pytest.approx(0.01)
+
+def test_compuesto_sin_aporte_forma_cerrada():
+    meses = meses_para_meta(1000.0, 2000.0, 12.0)
+    assert meses == pytest.approx(math.log(2) / math.log(1.01))
+    assert capital_proyectado(1000.0, 12.0, 0.0, meses) == pytest.approx(2000.0)
+
+def test_compuesto_con_aporte_coincide_con_simulacion():
+    for meses in (1, 12, 60, 240):
+        assert capital_proyectado(5e6, 10.0, 1e6, meses) == pytest.approx(_simular_compuesto(5e6, 10.0, 1e6, meses))
+    meses = meses_para_meta(5e6, 200e6, 10.0, 1e6)
+    assert capital_proyectado(5e6, 10.0, 1e6, meses) == pytest.approx(200e6)
+
+def test_interes_simple():
+    # M = C + C·r·n + aporte·n  ->  n = (M - C) / (C·r + aporte)
+    meses = meses_para_meta(1000.0, 2000.0, 12.0, 10.0, compuesto=False)
+    assert meses == pytest.approx(1000.0 / (1000.0 * 0.01 + 10.0))
+    assert capital_proyectado(1000.0, 12.0, 10.0, meses, compuesto=False) == pytest.approx(2000.0)
+    # El compuesto llega antes que el simple con los mismos datos
+    assert meses_para_meta(1000.0, 2000.0, 12.0, 10.0) < meses
+
+def test_tasa_cero_solo_aportes():
+    assert meses_para_meta(1000.0, 4000.0, 0.0, 500.0) == pytest.approx(6.0)
+    assert capital_proyectado(1000.0, 0.0, 500.0, 6) == pytest.approx(4000.0)
+
+def test_sin_aporte_ni_tasa_es_inalcanzable():
+    assert meses_para_meta(1000.0, 2000.0, 0.0, 0.0) == math.inf
+    assert meses_para_meta(1000.0, 2000.0, 0.0, 0.0, compuesto=False) == math.inf
+
+def test_meta_ya_alcanzada():
+    assert meses_para_meta(3000.0, 2000.0, 12.0, 100.0) == 0.0
+    assert meses_para_meta(2000.0, 2000.0, 0.0, 0.0, compuesto=False) == 0.0
+
+def test_meta_inalcanzable():
+    # Rentabilidad negativa sin aportes: el capital solo baja
+    assert meses_para_meta(1000.0, 2000.0, -12.0, 0.0) == math.inf
+    # Alcanzable, pero después del horizonte indicado
+    assert math.isfinite(meses_para_meta(1000.0, 1e9, 1.0, 10.0))
+    assert meses_para_meta(1000.0, 1e9, 1.0, 10.0, max_meses=600) == math.inf
+
+def test_arreglos_con_broadcasting():
+    capitales = np.array([0.0, 1000.0, 5000.0])
+    tasas = np.array([[0.0], [6.0], [12.0]])
+    meses = meses_para_meta(capitales, 5000.0, tasas, 100.0)
+    assert isinstance(meses, np.ndarray)
+    assert meses.shape == (3, 3)
+    assert (meses[:, 2] == 0.0).all()
+    assert meses[0, 0] == pytest.approx(50.0)
+    for i, tasa in enumerate(tasas[:, 0]):
+        for j, capital in enumerate(capitales):
+            assert meses[i, j] == pytest.approx(meses_para_meta(capital, 5000.0, tasa, 100.0))
+
+    curva = capital_proyectado(1000.0, 12.0, 100.0, np.arange(0, 61, 3))
+    assert curva.shape == (21,)
+    assert curva[0] == pytest.approx(1000.0)
+    assert (np.diff(curva) > 0).all()
+
+def test_escalares_devuelven_float():
+    assert type(meses_para_meta(1000, 2000, 12, 10)) is float
+    assert type(capital_proyectado(1000, 12, 10, 24)) is float
+
+def test_hitos_de_camino_a_tu_meta():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    from ruta_meta import tabla_hitos
+
+    meses_meta = meses_para_meta(10e6, 50e6, 12.0, 1.8e6)
+    tabla = tabla_hitos(10e6, 12.0, 1.8e6, meses_meta, 50e6)
+    assert tabla.columns.tolist() == ["Periodo", "Capital", "Ingreso Mensual", "% de Meta"]
+    # La meta se alcanza en el mes 19: hitos 1, 3, 6, 12 y 19
+    assert tabla["Periodo"].tolist() == ["1m", "3m", "6m", "1a", "1a 7m"]
+    capital_mes_12 = capital_proyectado(10e6, 12.0, 1.8e6, 12)
+    assert tabla["Capital"].iloc[3] == f"${capital_mes_12:,.0f}".replace(",", ".")
+    assert tabla["Ingreso Mensual"].iloc[3] == f"${capital_mes_12 * 0.01:,.0f}".replace(",", ".")
@@ -0,0 +1,67 @@
+# test_tiempo_importacion.py
+# Tiempo de arranque de app.py con los módulos de página importados de forma diferida
+# (cargar_funcion) frente a la importación de todos al inicio, como hacía antes el router.
+#
+# Cada medición corre en un proceso nuevo (sin nada en sys.modules). También se puede ejecutar
+# como script para ver los tiempos y los módulos más lentos según `python -X importtime`:
+#     python tests/test_tiempo_importacion.py
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPETICIONES = 3
+
+# Lo que app.py importaba al arrancar antes de la carga diferida
+MODULOS_ANTES = [
+    "streamlit", "pandas", "cargador_archivos", "portafolio", "simulador", "evaluacion",
+    "chat_financiero", "generador_informe", "inversiones_fisicas", "manual_ia", "fire",
+    "devaluacion", "optimizador", "historico", "balance_general", "divisas", "ruta_meta",
+    "gestion_gastos", "evaluacion_riesgo", "seguimiento_metas", "dashboard",
+]
+# Lo que importa ahora en la primera ejecución (sin elegir página): el router, la
+# valoración para el selector de moneda, el actualizador de tasas y los parámetros de la meta
+MODULOS_AHORA = ["streamlit", "pandas", "importlib", "valoracion", "actualizador_tasas", "ruta_meta"]
+
+def medir_importacion(modulos, repeticiones=REPETICIONES):
+    """Mejor tiempo (segundos) de importar `modulos` en un intérprete nuevo."""
+    codigo = (
+        "import time\n"
+        "inicio = time.perf_counter()\n"
+        f"import {', '.join(modulos)}\n"
+        "print(time.perf_counter() - inicio)\n"
+    )
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+        tiempos.append(float(salida.stdout.strip().splitlines()[-1]))
+    return min(tiempos)
+
+def modulos_mas_lentos(modulos, cantidad=15):
+    """Módulos con mayor tiempo acumulado (microsegundos) según `python -X importtime`."""
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modulos)}"],
+                            cwd=RAIZ, capture_output=True, text=True, check=True)
+    tiempos = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        tiempos.append((int(acumulado), nombre.strip()))
+    return sorted(tiempos, reverse=True)[:cantidad]
+
+def test_arranque_diferido_mas_rapido():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("plotly")
+    antes = medir_importacion(MODULOS_ANTES)
+    ahora = medir_importacion(MODULOS_AHORA)
+    print(f"\nImportación al arrancar: antes {antes:.2f} s, ahora {ahora:.2f} s")
+    assert ahora < antes
+
+if __name__ == "__main__":
+    for titulo, modulos in (("Antes (todo al inicio)", MODULOS_ANTES), ("Ahora (carga diferida)", MODULOS_AHORA)):
+        print(f"{titulo}: {medir_importacion(modulos):.2f} s")
+        for acumulado, nombre in modulos_mas_lentos(modulos):
+            print(f"    {acumulado / 1e6:8.3f} s  {nombre}")
@@ -0,0 +1,102 @@
+# test_utils.py
+# Pruebas del parser vectorizado de montos y tasas (utils.limpiar_moneda / limpiar_porcentaje).
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import clean_df_for_analysis, limpiar_moneda, limpiar_porcentaje
+
+FILAS_BENCHMARK = 1_000_000
+# Tiempo máximo (segundos) para limpiar una columna de texto de 1M de filas
+LIMITE_BENCHMARK = 15.0
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("$10,510,000.00", 10510000.0),
+    ("$ 10.510.000,00", 10510000.0),
+    ("10.510.000", 10510000.0),
+    ("1,000,000", 1000000.0),
+    ("1.000", 1000.0),
+    ("1,000", 1000.0),
+    ("10,510", 10510.0),
+    ("10,5", 10.5),
+    ("1.234,56", 1234.56),
+    ("1,234.56", 1234.56),
+    ("12.5", 12.5),
+    ("-2.500,75", -2500.75),
+    ("\xa0$\xa01.500.000\xa0", 1500000.0),
+    ("COP 250.000", 250000.0),
+])
+def test_limpiar_moneda_formatos(texto, esperado):
+    assert limpiar_moneda(pd.Series([texto])).iloc[0] == pytest.approx(esperado)
+
+@pytest.mark.parametrize("texto, esperado", [
+    # La parte entera 0 nunca lleva separador de miles
+    ("0.125", 0.125),
+    ("0,125", 0.125),
+    ("-0,125", -0.125),
+    ("00.125", 0.125),
+    # Un separador único con 3 decimales sigue siendo de miles en un monto
+    ("1.125", 1125.0),
+    ("1,125", 1125.0),
+    # Negativos contables entre paréntesis
+    ("(1,000)", -1000.0),
+    ("(1.000)", -1000.0),
+    ("$ (1.000,50)", -1000.5),
+    ("($2,500.75)", -2500.75),
+])
+def test_limpiar_moneda_casos_ambiguos(texto, esperado):
+    assert limpiar_moneda(pd.Series([texto])).iloc[0] == pytest.approx(esperado)
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("1.125", 1.125),
+    ("1,125", 1.125),
+    ("0.125", 0.125),
+    ("12,5 %", 12.5),
+    ("8.5%", 8.5),
+    ("1.000.000", 1000000.0),
+    ("1.000,5", 1000.5),
+    ("(2,5)", -2.5),
+])
+def test_limpiar_porcentaje(texto, esperado):
+    assert limpiar_porcentaje(pd.Series([texto])).iloc[0] == pytest.approx(esperado)
+
+def test_limpiar_moneda_mezcla_numeros_texto_y_vacios():
+    serie = pd.Series([1500, 2.5, "1.000", None, "abc", "", np.nan], dtype=object)
+    resultado = limpiar_moneda(serie)
+    assert resultado.dtype == np.float64
+    assert resultado.iloc[:3].tolist() == [1500.0, 2.5, 1000.0]
+    assert resultado.iloc[3:].isna().all()
+
+def test_limpiar_moneda_columna_numerica_sin_parseo():
+    serie = pd.Series([1, 2, 3], dtype='int64')
+    resultado = limpiar_moneda(serie)
+    assert resultado.dtype == np.float64
+    assert resultado.tolist() == [1.0, 2.0, 3.0]
+
+def test_clean_df_for_analysis_lee_tasas_como_porcentaje():
+    df = pd.DataFrame({
+        'Dinero': ["$ 1.125", "$ 2.000.000,00"],
+        'Interes anual (%)': ["1.125", "12,5%"],
+        'Interes Mensual': ["0,125", "(1,000)"],
+    })
+    limpio = clean_df_for_analysis(df)
+    assert limpio['Dinero'].tolist() == [1125.0, 2000000.0]
+    assert limpio['Interes anual (%)'].tolist() == pytest.approx([1.125, 12.5])
+    assert limpio['Interes Mensual'].tolist() == pytest.approx([0.125, -1000.0])
+
+def test_limpiar_moneda_throughput_1m_filas():
+    formatos = np.array(["$10,510,000.00", "$ 10.510.000,00", "1.000", "10,5", "(1,000)", "0.125", "abc"], dtype=object)
+    serie = pd.Series(formatos[np.arange(FILAS_BENCHMARK) % len(formatos)])
+
+    inicio = time.perf_counter()
+    resultado = limpiar_moneda(serie)
+    duracion = time.perf_counter() - inicio
+
+    print(f"\nlimpiar_moneda: {FILAS_BENCHMARK:,} filas en {duracion:.2f} s "
+          f"({FILAS_BENCHMARK / duracion:,.0f} filas/s)")
+    assert len(resultado) == FILAS_BENCHMARK
+    assert resultado.iloc[:len(formatos)].tolist()[:6] == pytest.approx([10510000.0, 10510000.0, 1000.0, 10.5, -1000.0, 0.125])
+    assert duracion < LIMITE_BENCHMARK
@@ -0,0 +1,70 @@
+# test_valoracion.py
+# Pruebas de la valoración multimoneda del portafolio (tasas con base USD).
+
+import pandas as pd
+import pytest
+
+from valoracion import composicion_por_moneda, convertir_monto, etiquetar_monedas, factores_conversion, valorar_portafolio
+
+# Unidades de cada moneda por 1 USD
+TASAS = {"COP": 4000.0, "EUR": 0.8}
+
+def _portafolio():
+    return pd.DataFrame({
+        'Items': ["CDT", "ETF", "Cuenta", "Bono"],
+        'Dinero': [1_000_000.0, 100.0, 80.0, 500_000.0],
+        'Interes Mensual': [10_000.0, 1.0, 0.4, 0.0],
+        'Moneda': ["COP", "USD", "euros", None],
+    })
+
+def test_factores_conversion():
+    factores = factores_conversion("COP", TASAS)
+    assert factores == pytest.approx({"COP": 1.0, "USD": 4000.0, "EUR": 5000.0})
+    assert factores_conversion("USD", TASAS)["COP"] == pytest.approx(1 / 4000)
+
+def test_factores_sin_tasa_de_reporte():
+    with pytest.raises(ValueError):
+        factores_conversion("GBP", TASAS)
+
+def test_convertir_monto():
+    assert convertir_monto(100.0, "USD", "COP", TASAS) == pytest.approx(400_000.0)
+    assert convertir_monto(400_000.0, "COP", "EUR", TASAS) == pytest.approx(80.0)
+    assert convertir_monto(7.0, "COP", "COP", {}) == 7.0
+    with pytest.raises(ValueError):
+        convertir_monto(1.0, "JPY", "COP", TASAS)
+
+def test_etiquetar_monedas_alias_y_vacios():
+    assert etiquetar_monedas(_portafolio()).tolist() == ["COP", "USD", "EUR", "COP"]
+    assert etiquetar_monedas(pd.DataFrame({'Dinero': [1.0]})).tolist() == ["COP"]
+
+def test_valorar_portafolio_mixto():
+    df = _portafolio()
+    valorado = valorar_portafolio(df, "COP", TASAS)
+    assert valorado['Dinero'].tolist() == pytest.approx([1_000_000.0, 400_000.0, 400_000.0, 500_000.0])
+    assert valorado['Interes Mensual'].tolist() == pytest.approx([10_000.0, 4_000.0, 2_000.0, 0.0])
+    assert (valorado['Moneda'] == "COP").all()
+    # El original no se modifica
+    assert df['Dinero'].tolist() == [1_000_000.0, 100.0, 80.0, 500_000.0]
+
+    en_usd = valorar_portafolio(df, "USD", TASAS)
+    assert en_usd['Dinero'].sum() == pytest.approx(valorado['Dinero'].sum() / 4000)
+
+def test_valorar_portafolio_todo_en_pesos_no_copia():
+    df = _portafolio().assign(Moneda="COP")
+    assert valorar_portafolio(df, "COP", {}) is df
+
+def test_valorar_portafolio_falta_tasa():
+    with pytest.raises(ValueError, match="EUR"):
+        valorar_portafolio(_portafolio(), "COP", {"COP": 4000.0})
+
+def test_valorar_portafolio_moneda_desconocida():
+    df = _portafolio()
+    df.loc[1, 'Moneda'] = "XYZ"
+    with pytest.raises(ValueError, match="XYZ"):
+        valorar_portafolio(df, "COP", TASAS)
+
+def test_composicion_por_moneda():
+    composicion = composicion_por_moneda(_portafolio(), "COP", TASAS).set_index('Moneda')
+    assert composicion.loc["COP", 'Capital original'] == pytest.approx(1_500_000.0)
+    assert composicion.loc["USD", 'Capital (COP)'] == pytest.approx(400_000.0)
+    assert composicion['Participación (%)'].sum() == pytest.approx(100.0)
@@ -1,25 +1,152 @@
 # utils.py
 
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from valoracion import COLUMNA_MONEDA, etiquetar_monedas
+
+# Columnas monetarias/numéricas que la app consume del portafolio cargado
+COLUMNAS_NUMERICAS_PORTAFOLIO = ['Dinero', 'Interes anual (%)', 'Interes Mensual', 'Ingreso Mensual Necesario']
+# Columnas que son tasas (se leen con limpiar_porcentaje, no como montos)
+COLUMNAS_TASA_PORTAFOLIO = ['Interes anual (%)']
+
+def _convertir_texto(serie, normalizar):
+    """
+    Convierte a float64 una columna que puede traer texto; `normalizar` recibe los textos
+    (solo dígitos, separadores y signo) y los devuelve en formato que entiende pd.to_numeric.
+    """
+    if is_numeric_dtype(serie):
+        return serie.astype('float64')
+
+    # Las celdas que ya son números (Excel mezcla tipos) no se pasan por texto
+    try:
+        es_texto = serie.str.len().notna()
+    except AttributeError:
+        return pd.to_numeric(serie, errors='coerce').astype('float64')
+
+    resultado = pd.to_numeric(serie.where(~es_texto), errors='coerce').astype('float64')
+    if not es_texto.any():
+        return resultado
+
+    crudo = serie[es_texto]
+    # Negativos en formato contable: "(1.000)" o "$ (1,000.50)"
+    entre_parentesis = crudo.str.contains(r'\(.*\d.*\)', regex=True)
+    texto = crudo.str.replace(r'[^\d,.\-]', '', regex=True)
+    valores = pd.to_numeric(normalizar(texto), errors='coerce')
+    valores = valores.where(~entre_parentesis, -valores.abs())
+    resultado[es_texto] = valores.to_numpy(dtype=np.float64)
+    return resultado
+
+def _normalizar_moneda(texto):
+    largo = texto.str.len()
+    ult_punto = texto.str.rfind('.')
+    ult_coma = texto.str.rfind(',')
+    n_puntos = texto.str.count(r'\.')
+    n_comas = texto.str.count(',')
+    # "0.125" o "0,125" nunca llevan separador de miles: la parte entera empieza por 0
+    empieza_cero = texto.str.match(r'-?0')
+
+    # Coma decimal (colombiano): la coma va después del último punto, o es la única
+    # coma y no separa un grupo de miles de exactamente 3 dígitos ("10,5" vs "10,510")
+    coma_decimal = (ult_coma > ult_punto) & (
+        (n_puntos > 0) | ((n_comas == 1) & ((largo - ult_coma - 1 != 3) | empieza_cero))
+    )
+    # Punto de miles (colombiano sin decimales): "10.510.000" o "1.000"
+    punto_miles = (n_comas == 0) & ~empieza_cero & (
+        (n_puntos > 1) | ((n_puntos == 1) & (largo - ult_punto - 1 == 3))
+    )
+
+    normalizado = texto.str.replace(',', '', regex=False)
+    if coma_decimal.any():
+        normalizado[coma_decimal] = (
+            texto[coma_decimal].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        )
+    if punto_miles.any():
+        normalizado[punto_miles] = texto[punto_miles].str.replace('.', '', regex=False)
+    return normalizado
+
+def _normalizar_tasa(texto):
+    # En una tasa un separador único es siempre el decimal ("1.125" = 1,125 %; "1,5" = 1,5 %);
+    # solo se lee como de miles si se repite ("1.000.000")
+    n_puntos = texto.str.count(r'\.')
+    coma_decimal = (texto.str.rfind(',') > texto.str.rfind('.')) & (texto.str.count(',') == 1)
+    punto_miles = ~coma_decimal & (n_puntos > 1)
+    normalizado = texto.str.replace(',', '', regex=False)
+    if punto_miles.any():
+        normalizado[punto_miles] = normalizado[punto_miles].str.replace('.', '', regex=False)
+    if coma_decimal.any():
+        normalizado[coma_decimal] = (
+            texto[coma_decimal].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        )
+    return normalizado
+
+def limpiar_moneda(serie):
+    """
+    Convierte una columna completa de montos en texto a float64, sin recorrer fila por fila.
+
+    Acepta formato estadounidense ($10,510,000.00) y colombiano ($ 10.510.000,00),
+    además de símbolos, espacios, espacios no separadores, '%' y negativos entre paréntesis.
+    Un separador único seguido de 3 dígitos se toma como de miles ("1.000"), salvo que la
+    parte entera empiece por 0 ("0.125"). Para tasas y porcentajes usar `limpiar_porcentaje`.
+    Si la columna ya es numérica se devuelve directamente (sin parseo).
+    Los valores que no se pueden interpretar quedan como NaN.
+    """
+    return _convertir_texto(serie, _normalizar_moneda)
+
+def limpiar_porcentaje(serie):
+    """
+    Como `limpiar_moneda`, para tasas y porcentajes ("1.125%", "12,5 %"): el último separador
+    es siempre el decimal, por lo que "1.125" es 1.125 y no 1125.
+    """
+    return _convertir_texto(serie, _normalizar_tasa)
+
+def limpiar_columna(serie, columna):
+    """Aplica el parser que corresponde a la columna del portafolio (tasa o monto)."""
+    if columna in COLUMNAS_TASA_PORTAFOLIO:
+        return limpiar_porcentaje(serie)
+    return limpiar_moneda(serie)
+
 def clean_df_for_analysis(df):
     """
     Limpia y convierte a numérico las columnas relevantes que vienen en formato 
-    de moneda tipo estadounidense ($10,510,000.00) → 10510000.00
+    de moneda estadounidense ($10,510,000.00) o colombiano ($ 10.510.000,00) → 10510000.00
     """
     df_cleaned = df.copy()
-    cols_to_clean = ['Dinero', 'Interes anual (%)', 'Interes Mensual', 'Ingreso Mensual Necesario']
+    cols_to_clean = COLUMNAS_NUMERICAS_PORTAFOLIO
 
     for col in cols_to_clean:
         if col in df_cleaned.columns:
-            df_cleaned[col] = (
-                df_cleaned[col].astype(str)
-                .str.replace(r'[\$,]', '', regex=True)
-                .astype(float)
-            )
+            df_cleaned[col] = limpiar_columna(df_cleaned[col], col)
     return df_cleaned
 
-def formato_pesos(valor):
+def hash_contenido(contenido):
+    """Devuelve el hash SHA-256 (hex) del contenido binario de un archivo subido."""
+    return hashlib.sha256(contenido).hexdigest()
+
+def preparar_portafolio(df):
+    """
+    Construye el portafolio canónico a partir del DataFrame leído del Excel.
+
+    Se limpia una sola vez al momento de la carga: las columnas numéricas quedan
+    en float64 ('Dinero' e 'Interes Mensual' sin NaN) para que todas las páginas
+    lo consuman directamente, sin volver a copiar ni aplicar regex.
+    Las páginas deben tratarlo como solo lectura y copiarlo antes de agregar columnas.
+    """
+    df_portafolio = clean_df_for_analysis(df)
+    for col in ['Dinero', 'Interes Mensual']:
+        if col in df_portafolio.columns:
+            df_portafolio[col] = df_portafolio[col].fillna(0.0)
+    # La moneda de cada fila queda normalizada (COP, USD, EUR...) para valorar el portafolio
+    if COLUMNA_MONEDA in df_portafolio.columns:
+        df_portafolio[COLUMNA_MONEDA] = etiquetar_monedas(df_portafolio)
+    return df_portafolio
+
+def formato_pesos(valor, simbolo="$"):
     try:
-        return "${:,.2f}".format(valor)
+        return "{}{:,.2f}".format(simbolo, valor)
     except:
         return valor
 
@@ -28,9 +155,9 @@ def formato_porcentaje(valor):
         return "{:.2f}%".format(valor)
     except:
         return valor
-def formatear_columnas_para_vista(df, columnas):
+def formatear_columnas_para_vista(df, columnas, simbolo="$"):
     df_vista = df.copy()
     for col in columnas:
         if col in df_vista.columns:
-            df_vista[col] = df_vista[col].apply(formato_pesos)
+            df_vista[col] = df_vista[col].apply(formato_pesos, simbolo=simbolo)
     return df_vista
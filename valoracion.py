@@ -0,0 +1,143 @@
+# valoracion.py
+# Valoración multimoneda del portafolio.
+#
+# Cada fila del portafolio lleva su moneda en la columna 'Moneda' (COP, USD o EUR; si la
+# columna no existe o la celda está vacía se asume COP). Para reportar en otra moneda no se
+# convierte fila por fila: se arma un factor por moneda a partir de la tabla de tasas del
+# proveedor (base USD, la misma que mantiene al día actualizador_tasas.py), se asigna el
+# factor de cada fila con un solo map y se multiplican las columnas monetarias completas.
+
+import pandas as pd
+
+COLUMNA_MONEDA = "Moneda"
+MONEDA_BASE = "COP"
+MONEDAS_REPORTE = ("COP", "USD", "EUR")
+SIMBOLOS_MONEDA = {"COP": "$", "USD": "US$", "EUR": "€"}
+COLUMNAS_MONETARIAS = ['Dinero', 'Interes Mensual', 'Ingreso Mensual Necesario']
+
+# Formas en que suele escribirse la moneda en el Excel (se comparan en mayúsculas)
+ALIAS_MONEDA = {
+    "PESOS": "COP", "PESO": "COP", "COL$": "COP", "$": "COP",
+    "DOLARES": "USD", "DÓLARES": "USD", "DOLAR": "USD", "DÓLAR": "USD", "US$": "USD", "USD$": "USD",
+    "EUROS": "EUR", "EURO": "EUR", "€": "EUR",
+}
+
+def etiquetar_monedas(df):
+    """Devuelve la moneda de cada fila como código (COP, USD, EUR...), con COP por defecto."""
+    if COLUMNA_MONEDA not in df.columns:
+        return pd.Series(MONEDA_BASE, index=df.index, dtype='string')
+    codigos = df[COLUMNA_MONEDA].astype('string').str.strip().str.upper().replace(ALIAS_MONEDA)
+    return codigos.replace("", pd.NA).fillna(MONEDA_BASE)
+
+def tasas_actuales():
+    """
+    Tabla de tasas (base USD) del proveedor. Se usa el último valor conocido sin esperar
+    a la red; solo se consulta la fuente si todavía no hay ninguno.
+    """
+    from proveedor_tasas import obtener_tasas, ultimas_tasas
+
+    resultado = ultimas_tasas()
+    if not resultado['tasas']:
+        resultado = obtener_tasas()
+    return resultado
+
+def factores_conversion(moneda_reporte, tasas):
+    """Factor de cada moneda de origen para llevar sus montos a `moneda_reporte` (tasas con base USD)."""
+    tasas = {**tasas, "USD": 1.0}
+    if not tasas.get(moneda_reporte):
+        raise ValueError(f"No hay tasa de cambio para la moneda de reporte {moneda_reporte}")
+    return {moneda: tasas[moneda_reporte] / valor for moneda, valor in tasas.items() if valor}
+
+def convertir_monto(valor, desde, hacia, tasas):
+    """Convierte un monto (o una Serie completa) de la moneda `desde` a la moneda `hacia`."""
+    if desde == hacia:
+        return valor
+    factores = factores_conversion(hacia, tasas)
+    if desde not in factores:
+        raise ValueError(f"No hay tasa de cambio para {desde}")
+    return valor * factores[desde]
+
+def valorar_portafolio(df, moneda_reporte=MONEDA_BASE, tasas=None):
+    """
+    Devuelve el portafolio con las columnas monetarias expresadas en `moneda_reporte`.
+
+    Si todas las filas ya están en la moneda de reporte se devuelve el mismo DataFrame,
+    sin copiar (el caso habitual de un portafolio solo en pesos). `tasas` es un diccionario
+    con base USD; si no se indica se toma del proveedor. Lanza ValueError si falta la tasa
+    de alguna moneda del portafolio.
+    """
+    monedas = etiquetar_monedas(df)
+    if (monedas == moneda_reporte).all():
+        return df
+
+    if tasas is None:
+        tasas = tasas_actuales()['tasas']
+    factor = monedas.map(factores_conversion(moneda_reporte, tasas)).astype('float64')
+    faltantes = monedas[factor.isna()].unique()
+    if len(faltantes):
+        raise ValueError(f"No hay tasa de cambio para: {', '.join(faltantes)}")
+
+    df_valorado = df.copy()
+    columnas = [col for col in COLUMNAS_MONETARIAS if col in df_valorado.columns]
+    df_valorado[columnas] = df_valorado[columnas].mul(factor.to_numpy(), axis=0)
+    df_valorado[COLUMNA_MONEDA] = moneda_reporte
+    return df_valorado
+
+def composicion_por_moneda(df, moneda_reporte=MONEDA_BASE, tasas=None):
+    """
+    Capital e ingreso mensual por moneda de origen: montos originales y su equivalente
+    en `moneda_reporte`, con la participación de cada moneda en el capital total.
+    """
+    if tasas is None:
+        tasas = tasas_actuales()['tasas']
+    monedas = etiquetar_monedas(df)
+    df_valorado = valorar_portafolio(df, moneda_reporte, tasas)
+    composicion = pd.DataFrame({
+        'Moneda': monedas,
+        'Capital original': df['Dinero'],
+        'Ingreso mensual original': df['Interes Mensual'],
+        f'Capital ({moneda_reporte})': df_valorado['Dinero'],
+        f'Ingreso mensual ({moneda_reporte})': df_valorado['Interes Mensual'],
+    }).groupby('Moneda', as_index=False).sum()
+    total = composicion[f'Capital ({moneda_reporte})'].sum()
+    composicion['Participación (%)'] = composicion[f'Capital ({moneda_reporte})'] / total * 100 if total > 0 else 0.0
+    return composicion
+
+def portafolio_en_moneda_reporte(df):
+    """
+    Portafolio valorado en la moneda de reporte elegida en el sidebar y el código de esa moneda.
+    Si falta una tasa se informa el error y se devuelven los valores sin convertir (en COP).
+    """
+    # streamlit solo se necesita en las páginas; el resto del módulo se usa también fuera de la app
+    import streamlit as st
+
+    moneda = st.session_state.get("moneda_reporte", MONEDA_BASE)
+    monedas = etiquetar_monedas(df)
+    if (monedas == moneda).all():
+        return df, moneda
+
+    resultado = tasas_actuales()
+    try:
+        df_valorado = valorar_portafolio(df, moneda, resultado['tasas'])
+    except ValueError as e:
+        st.error(f"No se pudo valorar el portafolio en {moneda}: {e}. Se muestran los valores sin convertir.")
+        return df, MONEDA_BASE
+
+    origen = ", ".join(sorted(monedas.unique()))
+    st.caption(f"💱 Valores expresados en {moneda} (monedas del portafolio: {origen}; tasas del {resultado['timestamp']}).")
+    return df_valorado, moneda
+
+def portafolio_en_pesos(df):
+    """
+    Portafolio con todas las filas valoradas en la moneda base (COP), para las páginas que
+    suman capital e ingreso en pesos. Si falta una tasa se informa el error y se devuelve None.
+    """
+    import streamlit as st
+
+    if df is None:
+        return None
+    try:
+        return valorar_portafolio(df, MONEDA_BASE)
+    except ValueError as e:
+        st.error(f"No se pudo valorar el portafolio en {MONEDA_BASE}: {e}.")
+        return None